@@ -10,7 +10,11 @@ from ZeMusic.core.tdlib_client import tdlib_manager
 from ZeMusic.core.database import db
 from ZeMusic.core.music_manager import music_manager
 from ZeMusic.core.command_handler import tdlib_command_handler
-from ZeMusic.plugins.owner.owner_panel import owner_panel
+from ZeMusic.core.task_supervisor import task_supervisor
+from ZeMusic.core.instrumentation import loop_monitor
+from ZeMusic.core.metrics import METRICS_CONTENT_TYPE, metrics
+from ZeMusic.core.metrics_server import json_response, metrics_server
+from ZeMusic.plugins import plugin_registry
 
 class ZeMusicBot:
     """البوت الرئيسي لـ ZeMusic مع دعم TDLib"""
@@ -83,7 +87,7 @@ class ZeMusicBot:
             
             # بدء مهام assistants_handler
             try:
-                from ZeMusic.plugins.owner.assistants_handler import assistants_handler
+                assistants_handler = plugin_registry.get('owner.assistants_handler', 'assistants_handler')
                 await assistants_handler.start_auto_leave_task()
             except Exception as e:
                 LOGGER(__name__).warning(f"⚠️ خطأ في مهام المساعدين: {e}")
@@ -92,6 +96,8 @@ class ZeMusicBot:
             self.is_running = True
             
             LOGGER(__name__).info("🎵 تم تشغيل ZeMusic Bot بنجاح!")
+            # تقرير زمن استيراد الإضافات المحمّلة أثناء الإقلاع
+            LOGGER(__name__).info(plugin_registry.report())
             self._show_startup_message()
             
             return True
@@ -131,8 +137,15 @@ class ZeMusicBot:
                     if update.get('@type') == 'updateNewCallbackQuery':
                         asyncio.create_task(tdlib_command_handler.handle_callback_query(update))
                 
+                def chat_member_handler(update):
+                    from ZeMusic.plugins.owner.force_subscribe_handler import force_subscribe_handler
+                    force_subscribe_handler.on_chat_member_update(update)
+                
                 tdlib_manager.bot_client.add_update_handler('updateNewMessage', message_handler)
                 tdlib_manager.bot_client.add_update_handler('updateNewCallbackQuery', callback_handler)
+                # تحديث كاش الاشتراك الإجباري فور انضمام/مغادرة أعضاء القناة
+                tdlib_manager.bot_client.add_update_handler('updateChatMember', chat_member_handler)
+                tdlib_manager.bot_client.add_update_handler('updateNewChatJoinRequest', chat_member_handler)
                 
                 LOGGER(__name__).info("🎛️ تم إعداد معالج الأوامر مع TDLib")
             else:
@@ -145,14 +158,37 @@ class ZeMusicBot:
     async def _start_periodic_tasks(self):
         """بدء المهام الدورية"""
         try:
-            # مهمة تنظيف الجلسات والحسابات الخاملة
-            asyncio.create_task(self._cleanup_task())
+            # كل المهام الدورية تُجدول من مشرف المهام بحلقة واحدة
+            # مهمة تنظيف كاش قاعدة البيانات
+            task_supervisor.add("db_cache_cleanup", self._cleanup_task, 1800)
             
             # مهمة مراقبة صحة النظام
-            asyncio.create_task(self._health_check_task())
+            task_supervisor.add("health_check", self._health_check_task, 300)
             
             # مهمة إحصائيات دورية
-            asyncio.create_task(self._stats_task())
+            task_supervisor.add("stats_log", self._stats_task, 3600)
+            
+            # مهمة تسخين بطاقات المقاطع الأكثر تشغيلاً
+            from ZeMusic.utils.thumbnails import THUMB_WARMUP_INTERVAL, thumb_warmup_job
+            task_supervisor.add("thumb_warmup", thumb_warmup_job, THUMB_WARMUP_INTERVAL)
+            
+            # حفظ طوابير التشغيل دورياً واستعادة المحفوظ منها
+            from ZeMusic.utils.stream.persist import queue_store
+            queue_store.start()
+            asyncio.create_task(queue_store.restore())
+            
+            task_supervisor.start()
+            
+            # قياس تأخر حلقة الأحداث ونقطة التشخيص المحلية
+            loop_monitor.start()
+            metrics_server.add_route("/debug/loop", lambda: json_response(loop_monitor.snapshot()))
+            metrics_server.add_route("/metrics", lambda: (metrics.render(), METRICS_CONTENT_TYPE))
+            await metrics_server.start()
+            
+            # استئناف الإذاعات التي قطعتها إعادة التشغيل (تحميل الوحدة فقط إن وُجدت)
+            if await db.get_unfinished_broadcast_jobs():
+                broadcast_handler = plugin_registry.get('owner.broadcast_handler', 'broadcast_handler')
+                await broadcast_handler.resume_broadcasts()
             
             LOGGER(__name__).info("⏰ تم بدء المهام الدورية")
             
@@ -211,66 +247,32 @@ class ZeMusicBot:
         print(startup_message)
     
     async def _cleanup_task(self):
-        """مهمة تنظيف دورية"""
-        while self.is_running:
-            try:
-                await asyncio.sleep(1800)  # كل 30 دقيقة
-                
-                # تنظيف الجلسات المنتهية
-                await music_manager.cleanup_sessions()
-                
-                # تنظيف الحسابات الخاملة
-                await tdlib_manager.cleanup_idle_assistants()
-                
-                # تنظيف كاش قاعدة البيانات
-                await db.clear_cache()
-                
-                LOGGER(__name__).info("🧹 تم تنظيف النظام")
-                
-            except Exception as e:
-                LOGGER(__name__).error(f"خطأ في مهمة التنظيف: {e}")
+        """تنظيف كاش قاعدة البيانات (الجلسات والحسابات الخاملة في مهمة music_cleanup)"""
+        await db.clear_cache()
+        LOGGER(__name__).info("🧹 تم تنظيف النظام")
     
     async def _health_check_task(self):
         """مهمة فحص صحة النظام"""
-        while self.is_running:
-            try:
-                await asyncio.sleep(300)  # كل 5 دقائق
-                
-                # فحص البوت الرئيسي
-                if not tdlib_manager.bot_client or not tdlib_manager.bot_client.is_connected:
-                    LOGGER(__name__).warning("⚠️ البوت الرئيسي غير متصل - محاولة إعادة الاتصال...")
-                    await tdlib_manager.initialize_bot()
-                
-                # فحص الحسابات المساعدة
-                connected_count = tdlib_manager.get_connected_assistants_count()
-                total_count = tdlib_manager.get_assistants_count()
-                
-                if total_count > 0 and connected_count < total_count * 0.5:  # أقل من 50% متصل
-                    LOGGER(__name__).warning(f"⚠️ عدد الحسابات المتصلة منخفض: {connected_count}/{total_count}")
-                
-            except Exception as e:
-                LOGGER(__name__).error(f"خطأ في فحص صحة النظام: {e}")
+        # فحص الحسابات المساعدة (اتصال البوت الرئيسي تديره مكتبته وتعيد الاتصال بنفسها)
+        connected_count = tdlib_manager.get_connected_assistants_count()
+        total_count = tdlib_manager.get_assistants_count()
+        
+        if total_count > 0 and connected_count < total_count * 0.5:  # أقل من 50% متصل
+            LOGGER(__name__).warning(f"⚠️ عدد الحسابات المتصلة منخفض: {connected_count}/{total_count}")
     
     async def _stats_task(self):
         """مهمة إحصائيات دورية"""
-        while self.is_running:
-            try:
-                await asyncio.sleep(3600)  # كل ساعة
-                
-                stats = await db.get_stats()
-                assistants_count = tdlib_manager.get_assistants_count()
-                connected_count = tdlib_manager.get_connected_assistants_count()
-                active_sessions = len(music_manager.active_sessions)
-                
-                LOGGER(__name__).info(
-                    f"📊 إحصائيات: {stats['users']} مستخدم، "
-                    f"{stats['chats']} مجموعة، "
-                    f"{connected_count}/{assistants_count} مساعد، "
-                    f"{active_sessions} جلسة نشطة"
-                )
-                
-            except Exception as e:
-                LOGGER(__name__).error(f"خطأ في مهمة الإحصائيات: {e}")
+        stats = await db.get_stats()
+        assistants_count = tdlib_manager.get_assistants_count()
+        connected_count = tdlib_manager.get_connected_assistants_count()
+        active_sessions = len(music_manager.active_sessions)
+        
+        LOGGER(__name__).info(
+            f"📊 إحصائيات: {stats['users']} مستخدم، "
+            f"{stats['chats']} مجموعة، "
+            f"{connected_count}/{assistants_count} مساعد، "
+            f"{active_sessions} جلسة نشطة"
+        )
     
     async def handle_no_assistant_request(self, chat_id: int, user_id: int) -> str:
         """التعامل مع طلبات التشغيل عند عدم وجود حسابات مساعدة"""
@@ -295,6 +297,16 @@ class ZeMusicBot:
             LOGGER(__name__).info("🛑 بدء إيقاف البوت...")
             
             self.is_running = False
+            await task_supervisor.stop()
+            await metrics_server.stop()
+            loop_monitor.stop()
+            
+            # حفظ أخير لطوابير التشغيل قبل إيقاف الجلسات
+            try:
+                from ZeMusic.utils.stream.persist import queue_store
+                await queue_store.flush()
+            except Exception as e:
+                LOGGER(__name__).warning(f"⚠️ تعذر حفظ طوابير التشغيل: {e}")
             
             # إيقاف جميع الجلسات النشطة
             LOGGER(__name__).info("🎵 إيقاف الجلسات النشطة...")
@@ -305,6 +317,10 @@ class ZeMusicBot:
             LOGGER(__name__).info("📱 إيقاف العملاء...")
             await tdlib_manager.stop_all()
             
+            # إغلاق جلسة HTTP المشتركة
+            from ZeMusic.core.http_client import http_client
+            await http_client.close()
+            
             LOGGER(__name__).info("✅ تم إيقاف البوت بنجاح")
             
         except Exception as e:
@@ -0,0 +1,330 @@
+"""
+جدولة الحسابات المساعدة: توزيع المحادثات على المساعدين بحسب الحمل الفعلي
+(المكالمات النشطة وعرض النطاق المقدّر من نوع كل بث) والسعة الموزونة لكل مساعد،
+مع تخصيص ثابت للمحادثة وتحويل للمساعد الأقل حملاً عند امتلائه.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import config
+from ZeMusic.logging import LOGGER
+from ZeMusic.core.metrics import metrics
+
+ASSISTANT_SPILLOVER_LOAD = 0.9                 # حمل المساعد الثابت الذي يبدأ بعده التحويل
+ASSISTANT_BANDWIDTH_CAPACITY = 2_500_000       # بايت/ثانية لكل مساعد بوزن 1 (~20 ميجابت)
+ASSISTANT_AUDIO_BITRATE = 16_000               # بايت/ثانية لبث صوتي (HighQualityAudio ~128 كيلوبت)
+ASSISTANT_VIDEO_BITRATE = 160_000              # بايت/ثانية لبث مرئي (MediumQualityVideo ~1.2 ميجابت)
+
+
+def legacy_assistant_id(number: int) -> int:
+    """
+    معرف المساعد لجلسة STRINGn من متغيرات البيئة: أرقام سالبة (-1..-5)
+    حتى لا تتداخل مع معرفات جدول assistants في قاعدة البيانات (تبدأ من 1)
+    """
+    return -int(number)
+
+
+def _parse_profiles(raw: str) -> Dict[int, Tuple[float, Optional[int]]]:
+    """
+    قراءة ASSISTANT_PROFILES بصيغة "id=weight/capacity,..." (السعة اختيارية)
+    مثال: "1=2/20,2=0.5" — المدخلات غير الصالحة تُتجاهل مع تحذير
+    """
+    profiles = {}
+    for entry in filter(None, (part.strip() for part in (raw or "").split(","))):
+        try:
+            assistant_id, spec = entry.split("=", 1)
+            weight, _, capacity = spec.partition("/")
+            profiles[int(assistant_id)] = (
+                float(weight or 1.0), int(capacity) if capacity else None
+            )
+        except ValueError:
+            LOGGER(__name__).warning(f"⚠️ إعداد مساعد غير صالح في ASSISTANT_PROFILES: {entry}")
+    return profiles
+
+
+@dataclass
+class AssistantSlot:
+    """حالة مساعد واحد في الجدولة"""
+    assistant_id: int
+    capacity: int
+    weight: float = 1.0
+    bandwidth_capacity: float = ASSISTANT_BANDWIDTH_CAPACITY
+    healthy: bool = True
+    calls: Set[int] = field(default_factory=set)
+    video_calls: Set[int] = field(default_factory=set)
+
+    @property
+    def share(self) -> float:
+        return max(self.capacity * self.weight, 1e-6)
+
+    @property
+    def bandwidth(self) -> float:
+        """النطاق المقدّر (بايت/ثانية) من أنواع البث الجارية على المساعد"""
+        video = len(self.video_calls)
+        return video * ASSISTANT_VIDEO_BITRATE + (len(self.calls) - video) * ASSISTANT_AUDIO_BITRATE
+
+    def load(self) -> float:
+        """الحمل المطبّع (1.0 = ممتلئ): أعلى قيمة بين عدد المكالمات والنطاق"""
+        return max(
+            len(self.calls) / self.share,
+            self.bandwidth / max(self.bandwidth_capacity * self.weight, 1e-6),
+        )
+
+
+class AssistantScheduler:
+    """اختيار المساعد لكل محادثة وإعادة التوزيع عند انضمام/خروج المساعدين"""
+
+    def __init__(self):
+        self.slots: Dict[int, AssistantSlot] = {}
+        self.assignments: Dict[int, int] = {}   # chat_id -> assistant_id (تخصيص ثابت)
+        self.active: Dict[int, int] = {}        # chat_id -> assistant_id (مكالمة جارية)
+        self._listeners: List[Callable] = []
+        self.profiles = _parse_profiles(config.ASSISTANT_PROFILES)
+        self.stats = Counter()
+
+    # ---- سجل المساعدين ----
+
+    def register(self, assistant_id: int, capacity: int = None, weight: float = None,
+                 bandwidth_capacity: float = None):
+        """تسجيل مساعد أو تحديث سعته؛ الوزن والسعة غير المحددين يُقرآن من ASSISTANT_PROFILES"""
+        assistant_id = int(assistant_id)
+        profile_weight, profile_capacity = self.profiles.get(assistant_id, (None, None))
+        slot = self.slots.get(assistant_id)
+        if slot is None:
+            self.slots[assistant_id] = AssistantSlot(
+                assistant_id=assistant_id,
+                capacity=capacity or profile_capacity or config.ASSISTANT_CALL_CAPACITY,
+                weight=weight if weight is not None else (profile_weight or 1.0),
+                bandwidth_capacity=bandwidth_capacity or ASSISTANT_BANDWIDTH_CAPACITY,
+            )
+            LOGGER(__name__).info(f"➕ تسجيل المساعد {assistant_id} في الجدولة")
+            self.rebalance()
+            return
+        if capacity:
+            slot.capacity = capacity
+        if bandwidth_capacity:
+            slot.bandwidth_capacity = bandwidth_capacity
+        if weight is not None:
+            slot.weight = weight
+        if not slot.healthy:
+            self.set_health(assistant_id, True)
+
+    def unregister(self, assistant_id: int):
+        """إزالة مساعد ونقل محادثاته الخاملة لغيره"""
+        slot = self.slots.pop(int(assistant_id), None)
+        if slot is None:
+            return
+        for chat_id in list(slot.calls):
+            self.active.pop(chat_id, None)
+        LOGGER(__name__).info(f"➖ إزالة المساعد {assistant_id} من الجدولة")
+        self.rebalance()
+
+    def set_health(self, assistant_id: int, healthy: bool):
+        """تعليم المساعد كسليم/معطل؛ المعطل لا يُختار ولا تبقى عليه محادثات خاملة"""
+        slot = self.slots.get(int(assistant_id))
+        if slot is None or slot.healthy == healthy:
+            return
+        slot.healthy = healthy
+        self.rebalance()
+
+    def sync(self, assistant_ids: Iterable[int]):
+        """مواءمة السجل مع قائمة المساعدين المتاحين فعلياً"""
+        wanted = {int(a) for a in assistant_ids}
+        for assistant_id in wanted - set(self.slots):
+            self.register(assistant_id)
+        for assistant_id in set(self.slots) - wanted:
+            self.unregister(assistant_id)
+
+    # ---- المكالمات ----
+
+    def call_started(self, chat_id: int, assistant_id: int, video: bool = False):
+        self.call_ended(chat_id)
+        slot = self.slots.get(int(assistant_id))
+        if slot is None:
+            return
+        slot.calls.add(chat_id)
+        if video:
+            slot.video_calls.add(chat_id)
+        self.active[chat_id] = slot.assistant_id
+        self.assignments[chat_id] = slot.assistant_id
+
+    def stream_changed(self, chat_id: int, video: bool):
+        """تحديث نوع البث الجاري (صوت/فيديو) عند الانتقال للمقطع التالي"""
+        slot = self.slots.get(self.active.get(chat_id))
+        if slot is None:
+            return
+        if video:
+            slot.video_calls.add(chat_id)
+        else:
+            slot.video_calls.discard(chat_id)
+
+    def call_ended(self, chat_id: int):
+        assistant_id = self.active.pop(chat_id, None)
+        slot = self.slots.get(assistant_id)
+        if slot:
+            slot.calls.discard(chat_id)
+            slot.video_calls.discard(chat_id)
+
+    # ---- الاختيار ----
+
+    def _usable(self, assistant_id: Optional[int]) -> Optional[AssistantSlot]:
+        slot = self.slots.get(assistant_id)
+        return slot if slot and slot.healthy else None
+
+    def load(self, assistant_id: int) -> float:
+        slot = self.slots.get(assistant_id)
+        return slot.load() if slot else 1.0
+
+    def assignment(self, chat_id: int) -> Optional[int]:
+        return self.assignments.get(chat_id)
+
+    def assign(self, chat_id: int, assistant_id: int):
+        """تخصيص ثابت يدوي لمحادثة"""
+        self._set_assignment(chat_id, int(assistant_id))
+
+    def release(self, chat_id: int):
+        """إلغاء تخصيص المحادثة"""
+        self.call_ended(chat_id)
+        self.assignments.pop(chat_id, None)
+
+    def pick(self, chat_id: int = None, preferred: int = None, exclude: Iterable[int] = ()) -> Optional[int]:
+        """
+        اختيار المساعد: التخصيص الثابت أولاً ما دام حمله دون حد التحويل،
+        وإلا المساعد الأقل حملاً نسبةً لسعته الموزونة.
+        """
+        exclude = set(exclude)
+        sticky = self.assignments.get(chat_id) if chat_id is not None else None
+        for candidate in (sticky, preferred):
+            slot = self._usable(candidate)
+            if slot and candidate not in exclude and (
+                chat_id in slot.calls or slot.load() < ASSISTANT_SPILLOVER_LOAD
+            ):
+                self.stats['sticky'] += 1
+                if chat_id is not None:
+                    self._set_assignment(chat_id, candidate)
+                return candidate
+
+        candidates = [
+            slot for slot in self.slots.values()
+            if slot.healthy and slot.assistant_id not in exclude and slot.load() < 1.0
+        ]
+        if not candidates:
+            self.stats['exhausted'] += 1
+            return None
+        best = min(candidates, key=lambda s: (s.load(), len(s.calls)))
+        self.stats['spillover' if sticky or preferred else 'placed'] += 1
+        if chat_id is not None:
+            self._set_assignment(chat_id, best.assistant_id)
+        return best.assistant_id
+
+    # ---- إعادة التوزيع ----
+
+    def subscribe(self, callback: Callable):
+        """مستمع يُستدعى بـ (chat_id, assistant_id) عند تغيير تخصيص محادثة"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _set_assignment(self, chat_id: int, assistant_id: Optional[int]):
+        if self.assignments.get(chat_id) == assistant_id:
+            return
+        if assistant_id is None:
+            self.assignments.pop(chat_id, None)
+        else:
+            self.assignments[chat_id] = assistant_id
+        for callback in self._listeners:
+            try:
+                callback(chat_id, assistant_id)
+            except Exception as e:
+                LOGGER(__name__).warning(f"خطأ في مستمع تخصيص المساعد: {e}")
+
+    def rebalance(self) -> int:
+        """
+        نقل المحادثات الخاملة (بلا مكالمة جارية) من المساعدين المفقودين أو المعطلين
+        أو الذين يحملون أكثر من حصتهم، بحيث تبدأ مكالماتها القادمة موزعة بالتساوي.
+        """
+        healthy = {aid: slot for aid, slot in self.slots.items() if slot.healthy}
+        idle = [chat_id for chat_id in self.assignments if chat_id not in self.active]
+        if not idle:
+            return 0
+        if not healthy:
+            for chat_id in idle:
+                self._set_assignment(chat_id, None)
+            return 0
+
+        counts = Counter(self.assignments[chat_id] for chat_id in self.assignments
+                         if self.assignments[chat_id] in healthy)
+        total_share = sum(slot.share for slot in healthy.values())
+        total = sum(counts.values()) + sum(
+            1 for chat_id in idle if self.assignments[chat_id] not in healthy
+        )
+        target = {aid: total * slot.share / total_share for aid, slot in healthy.items()}
+
+        def lightest():
+            return min(healthy, key=lambda aid: (counts[aid] - target[aid], healthy[aid].load()))
+
+        moved = 0
+        for chat_id in idle:
+            current = self.assignments[chat_id]
+            if current in healthy and counts[current] <= target[current] + 1:
+                continue
+            new = lightest()
+            if new == current:
+                continue
+            if current in healthy:
+                counts[current] -= 1
+            counts[new] += 1
+            self._set_assignment(chat_id, new)
+            moved += 1
+
+        if moved:
+            self.stats['rebalanced'] += moved
+            LOGGER(__name__).info(f"⚖️ إعادة توزيع {moved} محادثة خاملة على المساعدين")
+        return moved
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'assistants': {
+                aid: {
+                    'load': round(slot.load(), 3),
+                    'calls': len(slot.calls),
+                    'video_calls': len(slot.video_calls),
+                    'bandwidth': slot.bandwidth,
+                    'capacity': slot.capacity,
+                    'weight': slot.weight,
+                    'healthy': slot.healthy,
+                }
+                for aid, slot in self.slots.items()
+            },
+            'assigned_chats': len(self.assignments),
+            'active_calls': len(self.active),
+        }
+
+
+assistant_scheduler = AssistantScheduler()
+
+ASSISTANT_LOAD = metrics.gauge(
+    "zemusic_assistant_load", "Normalized assistant load (1.0 = full)", ["assistant"])
+ASSISTANT_CALLS = metrics.gauge("zemusic_assistant_calls", "Active calls per assistant", ["assistant"])
+ASSISTANT_HEALTHY = metrics.gauge("zemusic_assistant_healthy", "Assistant health flag", ["assistant"])
+ACTIVE_CALLS = metrics.gauge("zemusic_active_calls", "Voice chats currently streaming")
+SCHEDULER_EVENTS = metrics.counter(
+    "zemusic_assistant_scheduler_events_total", "Assistant placement decisions by kind", ["event"])
+
+
+def _collect_assistants():
+    # المساعدون قد يُزالون أثناء التشغيل، فتُبنى التسميات من جديد في كل جمع
+    for gauge in (ASSISTANT_LOAD, ASSISTANT_CALLS, ASSISTANT_HEALTHY):
+        gauge.clear()
+    for assistant_id, slot in assistant_scheduler.slots.items():
+        ASSISTANT_LOAD.labels(assistant_id).set(slot.load())
+        ASSISTANT_CALLS.labels(assistant_id).set(len(slot.calls))
+        ASSISTANT_HEALTHY.labels(assistant_id).set(1 if slot.healthy else 0)
+    ACTIVE_CALLS.set(len(assistant_scheduler.active))
+    for event, count in assistant_scheduler.stats.items():
+        SCHEDULER_EVENTS.labels(event).set(count)
+
+
+metrics.add_collector(_collect_assistants)
@@ -0,0 +1,199 @@
+"""
+محرك الإذاعة: إرسال متوازٍ بعدد محدود من العمال، مع دلو رموز عام يضبط
+المعدل ضمن حدود تيليجرام، ومعالجة FloodWait توقف المسار المتأثر فقط.
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, Optional, Union
+
+from ZeMusic.logging import LOGGER
+from ZeMusic.core.metrics import metrics
+from ZeMusic.pyrogram_compatibility.errors import FloodWait
+
+BROADCAST_WORKERS = 20          # عدد مسارات الإرسال المتوازية
+BROADCAST_RATE = 25             # رسالة/ثانية للبوت كله (حد تيليجرام ~30)
+BROADCAST_BURST = 25            # أقصى رصيد متراكم في الدلو
+BROADCAST_MAX_FLOOD_WAIT = 300  # انتظار أطول من هذا يُعدّ فشلاً للهدف
+BROADCAST_MAX_RETRIES = 3       # محاولات الهدف بعد FloodWait
+
+_RETRY_AFTER_RE = re.compile(r"retry after (\d+)", re.IGNORECASE)
+
+BROADCAST_MESSAGES = metrics.counter(
+    "zemusic_broadcast_messages_total", "Broadcast deliveries by result", ["result"])
+BROADCAST_FLOOD_WAITS = metrics.counter(
+    "zemusic_broadcast_flood_waits_total", "FloodWait responses during broadcasts")
+BROADCAST_SEND_SECONDS = metrics.histogram(
+    "zemusic_broadcast_send_seconds", "Latency of a single broadcast send call")
+BROADCAST_IN_FLIGHT = metrics.gauge(
+    "zemusic_broadcast_in_flight", "Broadcast sends currently awaiting Telegram")
+BROADCAST_RUNNING = metrics.gauge("zemusic_broadcasts_running", "Broadcasts currently running")
+
+
+def flood_wait_seconds(error: Exception) -> Optional[int]:
+    """مدة FloodWait من خطأ Pyrogram أو من نص خطأ TDLib/Bot API"""
+    if isinstance(error, FloodWait):
+        return int(getattr(error, "value", 0) or 0)
+    match = _RETRY_AFTER_RE.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+class TokenBucket:
+    """دلو رموز بسيط: rate رمز/ثانية برصيد أقصى burst"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class BroadcastStats:
+    """إحصائيات إذاعة تُحدَّث مباشرة أثناء التنفيذ"""
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    flood_waits: int = 0
+    in_flight: int = 0
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> int:
+        return self.sent + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """رسائل مكتملة في الثانية"""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    def eta(self) -> float:
+        remaining = max(self.total - self.done, 0)
+        rate = self.rate or BROADCAST_RATE
+        return remaining / rate
+
+
+# دلو عام مشترك بين كل الإذاعات حتى لا تتجاوز مجتمعةً حد البوت
+broadcast_bucket = TokenBucket(BROADCAST_RATE, BROADCAST_BURST)
+
+
+async def _iterate(targets: Union[Iterable, AsyncIterable]):
+    if hasattr(targets, "__aiter__"):
+        async for target in targets:
+            yield target
+    else:
+        for target in targets:
+            yield target
+
+
+async def run_broadcast(
+    targets: Union[Iterable[int], AsyncIterable[int]],
+    send: Callable[[int], Awaitable[Any]],
+    *,
+    workers: int = BROADCAST_WORKERS,
+    bucket: TokenBucket = None,
+    stats: BroadcastStats = None,
+    is_cancelled: Callable[[], bool] = None,
+    on_result: Callable[[int, bool], Any] = None,
+) -> BroadcastStats:
+    """
+    إرسال send(target) لكل هدف عبر عدد محدود من العمال.
+
+    send تُرجع قيمة صحيحة عند النجاح. FloodWait يؤخر هذا الهدف وحده
+    ثم يعيد المحاولة، وأي خطأ آخر يُحسب فشلاً.
+    """
+    bucket = bucket or broadcast_bucket
+    stats = stats or BroadcastStats()
+    is_cancelled = is_cancelled or (lambda: False)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+
+    def finish(target_id: int, ok: bool):
+        if ok:
+            stats.sent += 1
+        else:
+            stats.failed += 1
+        BROADCAST_MESSAGES.labels("sent" if ok else "failed").inc()
+        if on_result:
+            try:
+                on_result(target_id, ok)
+            except Exception as e:
+                LOGGER(__name__).debug(f"خطأ في تسجيل نتيجة الإذاعة: {e}")
+
+    async def worker():
+        while True:
+            target_id = await queue.get()
+            try:
+                if target_id is None:
+                    return
+                if is_cancelled():
+                    continue
+                for _ in range(BROADCAST_MAX_RETRIES):
+                    await bucket.acquire()
+                    stats.in_flight += 1
+                    BROADCAST_IN_FLIGHT.inc()
+                    started = time.perf_counter()
+                    try:
+                        ok = bool(await send(target_id))
+                        BROADCAST_SEND_SECONDS.observe(time.perf_counter() - started)
+                        finish(target_id, ok)
+                        break
+                    except Exception as e:
+                        wait = flood_wait_seconds(e)
+                        if wait is None or wait > BROADCAST_MAX_FLOOD_WAIT:
+                            finish(target_id, False)
+                            break
+                        # إيقاف هذا المسار فقط؛ بقية العمال يواصلون
+                        stats.flood_waits += 1
+                        BROADCAST_FLOOD_WAITS.inc()
+                        await asyncio.sleep(wait + 1)
+                    finally:
+                        stats.in_flight -= 1
+                        BROADCAST_IN_FLIGHT.dec()
+                else:
+                    finish(target_id, False)
+            finally:
+                queue.task_done()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(max(1, workers))]
+    BROADCAST_RUNNING.inc()
+    try:
+        async for target_id in _iterate(targets):
+            if is_cancelled():
+                break
+            await queue.put(target_id)
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        BROADCAST_RUNNING.dec()
+        stats.finished_at = time.time()
+
+    LOGGER(__name__).info(
+        f"📢 انتهت الإذاعة: {stats.sent} نجاح، {stats.failed} فشل، "
+        f"{stats.rate:.1f} رسالة/ث خلال {stats.elapsed:.0f}ث"
+    )
+    return stats
@@ -2,7 +2,7 @@ import asyncio
 import os
 
 from datetime import datetime, timedelta
-from typing import Union
+from typing import Dict, Union
 
 from ZeMusic.compatibility import CompatibilityClient as Client
 from pytgcalls import PyTgCalls, StreamType
@@ -19,10 +19,14 @@ from pytgcalls.types.stream import StreamAudioEnded
 
 import config
 from ZeMusic import LOGGER, YouTube, app
+from ZeMusic.core.assistant_scheduler import assistant_scheduler, legacy_assistant_id
+from ZeMusic.core.tdlib_client import tdlib_manager
+from ZeMusic.core.metrics import metrics
 from ZeMusic.misc import db
 from ZeMusic.utils.database import (
     add_active_chat,
     add_active_video_chat,
+    get_assistant,
     get_lang,
     get_loop,
     group_assistant,
@@ -35,7 +39,9 @@ from ZeMusic.utils.database import (
 from ZeMusic.utils.exceptions import AssistantErr
 from ZeMusic.utils.formatters import check_duration, seconds_to_min, speed_converter
 from ZeMusic.utils.inline.play import stream_markup
-from ZeMusic.utils.stream.autoclear import auto_clean
+from ZeMusic.utils.media_cache import media_cache
+from ZeMusic.utils.stream.queue import queue_service
+from ZeMusic.utils.stream import clock
 from ZeMusic.utils.thumbnails import get_thumb
 from strings import get_string
 
@@ -45,72 +51,224 @@ counter = {}
 
 
 async def _clear_(chat_id):
-    db[chat_id] = []
+    await queue_service.clear(chat_id)
+    assistant_scheduler.call_ended(chat_id)
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
 
 
 
-class Call(PyTgCalls):
-    def __init__(self):
-        self.userbot1 = Client(
-            name="ZeAss1",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING1),
-        )
-        self.one = PyTgCalls(
-            self.userbot1,
-            cache_duration=100,
-        )
-        self.userbot2 = Client(
-            name="ZeAss2",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING2),
-        )
-        self.two = PyTgCalls(
-            self.userbot2,
-            cache_duration=100,
-        )
-        self.userbot3 = Client(
-            name="ZeAss3",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING3),
-        )
-        self.three = PyTgCalls(
-            self.userbot3,
-            cache_duration=100,
-        )
-        self.userbot4 = Client(
-            name="ZeAss4",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING4),
-        )
-        self.four = PyTgCalls(
-            self.userbot4,
-            cache_duration=100,
-        )
-        self.userbot5 = Client(
-            name="ZeAss5",
+CALL_CACHE_DURATION = 100
+ASSISTANT_MAX_FAILURES = 3  # إخفاقات متتالية قبل تعليم المساعد كمعطل
+
+CALL_JOINS = metrics.counter("zemusic_call_joins_total", "Voice chat join attempts by result", ["result"])
+CALL_JOIN_SECONDS = metrics.histogram("zemusic_call_join_seconds", "Voice chat join latency")
+STREAM_CHANGE_SECONDS = metrics.histogram(
+    "zemusic_stream_change_seconds", "Time to move a chat to its next queued track")
+
+# الجلسات القديمة من متغيرات البيئة بمعرفات سالبة منفصلة عن مساعدي قاعدة البيانات
+LEGACY_SESSIONS = {
+    legacy_assistant_id(1): config.STRING1,
+    legacy_assistant_id(2): config.STRING2,
+    legacy_assistant_id(3): config.STRING3,
+    legacy_assistant_id(4): config.STRING4,
+    legacy_assistant_id(5): config.STRING5,
+}
+
+
+class AssistantCall:
+    """مساعد واحد مع PyTgCalls الخاص به - يُشغّل عند أول حاجة إليه"""
+
+    def __init__(self, assistant_id: int, session_string: str):
+        self.assistant_id = assistant_id
+        self.userbot = Client(
+            name=f"ZeAss{assistant_id}",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
-            session_string=str(config.STRING5),
+            session_string=str(session_string),
         )
-        self.five = PyTgCalls(
-            self.userbot5,
-            cache_duration=100,
+        self.calls = PyTgCalls(
+            self.userbot,
+            cache_duration=CALL_CACHE_DURATION,
         )
+        self.started = False
+        self.failures = 0
+        self.last_error = None
+        self._start_lock = asyncio.Lock()
+
+    async def ensure_started(self):
+        if self.started:
+            return
+        async with self._start_lock:
+            if not self.started:
+                await self.calls.start()
+                self.started = True
+                LOGGER(__name__).info(f"🎙️ تم تشغيل PyTgCalls للمساعد {self.assistant_id}")
+
+    def record(self, ok: bool, error: Exception = None) -> bool:
+        """تسجيل نتيجة عملية؛ يُرجع حالة الصحة الجديدة"""
+        if ok:
+            self.failures = 0
+            self.last_error = None
+        else:
+            self.failures += 1
+            self.last_error = str(error) if error else None
+        return self.failures < ASSISTANT_MAX_FAILURES
+
+    async def stop(self):
+        if self.started:
+            try:
+                await self.userbot.stop()
+            except Exception:
+                pass
+            self.started = False
+
+    # ---- واجهة فهرس tdlib_manager و MusicManager ----
+
+    @property
+    def is_connected(self) -> bool:
+        """متاح للاختيار: يُشغّل عند أول حاجة إليه ما لم تتكرر إخفاقاته"""
+        return self.failures < ASSISTANT_MAX_FAILURES
+
+    def get_active_calls_count(self) -> int:
+        slot = assistant_scheduler.slots.get(self.assistant_id)
+        return len(slot.calls) if slot else 0
+
+    async def join_group_call(self, chat_id: int) -> bool:
+        """تجهيز المساعد للمكالمة؛ الانضمام الفعلي يتم مع أول بث في stream_audio"""
+        try:
+            await self.ensure_started()
+        except Exception as e:
+            if not self.record(False, e):
+                tdlib_manager.set_connected(self.assistant_id, False)
+            return False
+        return True
+
+    async def stream_audio(self, chat_id: int, link: str) -> bool:
+        try:
+            await self.calls.join_group_call(
+                chat_id,
+                AudioPiped(link, audio_parameters=HighQualityAudio()),
+                stream_type=StreamType().pulse_stream,
+            )
+        except AlreadyJoinedError:
+            await self.calls.change_stream(
+                chat_id, AudioPiped(link, audio_parameters=HighQualityAudio())
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"تعذر بث الصوت عبر المساعد {self.assistant_id}: {e}")
+            return False
+        return True
+
+    async def leave_group_call(self, chat_id: int):
+        try:
+            await self.calls.leave_group_call(chat_id)
+        except Exception:
+            pass
+
+
+class Call(PyTgCalls):
+    def __init__(self):
+        self.pool: Dict[int, AssistantCall] = {}
+        self._decorated = False
+        for assistant_id, session in LEGACY_SESSIONS.items():
+            if session:
+                self._add(assistant_id, session)
+
+    def _add(self, assistant_id: int, session_string: str) -> AssistantCall:
+        entry = AssistantCall(assistant_id, session_string)
+        self.pool[assistant_id] = entry
+        if self._decorated:
+            self._install_handlers(entry.calls)
+        tdlib_manager.register_assistant(entry)
+        return entry
+
+    async def add_assistant(self, assistant_id: int, session_string: str) -> bool:
+        """إضافة مساعد للمجموعة أثناء التشغيل دون إعادة تشغيل البوت"""
+        assistant_id = int(assistant_id)
+        if assistant_id in self.pool:
+            return False
+        self._add(assistant_id, session_string)
+        LOGGER(__name__).info(f"➕ أُضيف المساعد {assistant_id} لمجموعة المكالمات")
+        return True
+
+    async def remove_assistant(self, assistant_id: int) -> bool:
+        """إزالة مساعد من المجموعة ونقل محادثاته لغيره"""
+        entry = self.pool.pop(int(assistant_id), None)
+        if entry is None:
+            return False
+        tdlib_manager.unregister_assistant(entry.assistant_id)
+        await entry.stop()
+        LOGGER(__name__).info(f"➖ أُزيل المساعد {assistant_id} من مجموعة المكالمات")
+        return True
+
+    async def load_assistants(self):
+        """تحميل المساعدين المسجلين في قاعدة البيانات"""
+        from ZeMusic.core.database import db as database
+
+        try:
+            rows = await database.get_all_assistants()
+        except Exception as e:
+            LOGGER(__name__).warning(f"تعذر تحميل المساعدين من قاعدة البيانات: {e}")
+            return
+        for row in rows:
+            assistant_id = int(row['assistant_id'])
+            if assistant_id not in self.pool:
+                self._add(assistant_id, row['session_string'])
+
+    async def get_tgcalls(self, assistant_id) -> PyTgCalls:
+        """PyTgCalls الخاص بالمساعد مع تشغيله عند أول استخدام"""
+        entry = self.pool.get(int(assistant_id)) if assistant_id else None
+        if entry is None:
+            if not self.pool:
+                raise AssistantErr("لا توجد حسابات مساعدة")
+            if assistant_scheduler.slots:
+                # الجدولة لم تجد مساعداً سليماً دون سعته؛ لا يُتجاوز حد السعة بأول مساعد
+                raise AssistantErr("جميع الحسابات المساعدة مشغولة حالياً، يرجى المحاولة بعد قليل")
+            entry = next(iter(self.pool.values()))
+        try:
+            await entry.ensure_started()
+        except Exception as e:
+            if not entry.record(False, e):
+                tdlib_manager.set_connected(entry.assistant_id, False)
+            raise
+        return entry.calls
+
+    def _install_handlers(self, calls: PyTgCalls):
+        async def stream_services_handler(_, chat_id: int):
+            await self.stop_stream(chat_id)
+
+        async def stream_end_handler(client, update: Update):
+            if not isinstance(update, StreamAudioEnded):
+                return
+            await self.change_stream(client, update.chat_id)
+
+        calls.on_kicked()(stream_services_handler)
+        calls.on_closed_voice_chat()(stream_services_handler)
+        calls.on_left()(stream_services_handler)
+        calls.on_stream_end()(stream_end_handler)
+
+    def get_health(self) -> Dict[int, Dict]:
+        return {
+            assistant_id: {
+                'started': entry.started,
+                'failures': entry.failures,
+                'last_error': entry.last_error,
+            }
+            for assistant_id, entry in self.pool.items()
+        }
 
     async def pause_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.pause_stream(chat_id)
+        if db.get(chat_id):
+            clock.pause(db[chat_id][0])
 
     async def resume_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.resume_stream(chat_id)
+        if db.get(chat_id):
+            clock.resume(db[chat_id][0])
 
     async def stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
@@ -121,31 +279,13 @@ class Call(PyTgCalls):
             pass
 
     async def stop_stream_force(self, chat_id: int):
-        try:
-            if config.STRING1:
-                await self.one.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING2:
-                await self.two.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING3:
-                await self.three.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING4:
-                await self.four.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING5:
-                await self.five.leave_group_call(chat_id)
-        except:
-            pass
+        for entry in list(self.pool.values()):
+            if not entry.started:
+                continue
+            try:
+                await entry.calls.leave_group_call(chat_id)
+            except:
+                pass
         try:
             await _clear_(chat_id)
         except:
@@ -189,7 +329,7 @@ class Call(PyTgCalls):
             out = file_path
         dur = await asyncio.get_event_loop().run_in_executor(None, check_duration, out)
         dur = int(dur)
-        played, con_seconds = speed_converter(playing[0]["played"], speed)
+        played, con_seconds = speed_converter(clock.played(playing[0]), speed)
         duration = seconds_to_min(dur)
         stream = (
             AudioVideoPiped(
@@ -214,7 +354,7 @@ class Call(PyTgCalls):
             if not exis:
                 db[chat_id][0]["old_dur"] = db[chat_id][0]["dur"]
                 db[chat_id][0]["old_second"] = db[chat_id][0]["seconds"]
-            db[chat_id][0]["played"] = con_seconds
+            clock.seek(db[chat_id][0], con_seconds)
             db[chat_id][0]["dur"] = duration
             db[chat_id][0]["seconds"] = dur
             db[chat_id][0]["speed_path"] = out
@@ -223,8 +363,7 @@ class Call(PyTgCalls):
     async def force_stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         try:
-            check = db.get(chat_id)
-            check.pop(0)
+            await queue_service.dequeue(chat_id)
         except:
             pass
         await remove_active_video_chat(chat_id)
@@ -254,6 +393,7 @@ class Call(PyTgCalls):
             chat_id,
             stream,
         )
+        assistant_scheduler.stream_changed(chat_id, bool(video))
 
     async def seek_stream(self, chat_id, file_path, to_seek, duration, mode):
         assistant = await group_assistant(self, chat_id)
@@ -283,6 +423,7 @@ class Call(PyTgCalls):
         await asyncio.sleep(0.2)
         await assistant.leave_group_call(config.LOGGER_ID)
 
+    @CALL_JOIN_SECONDS.time()
     async def join_call(
         self,
         chat_id: int,
@@ -317,13 +458,20 @@ class Call(PyTgCalls):
                 stream_type=StreamType().pulse_stream,
             )
         except NoActiveGroupCall:
+            CALL_JOINS.labels("no_active_call").inc()
             raise AssistantErr(_["call_8"])
         except AlreadyJoinedError:
+            CALL_JOINS.labels("already_joined").inc()
             raise AssistantErr(_["call_9"])
         except TelegramServerError:
+            CALL_JOINS.labels("server_error").inc()
             raise AssistantErr(_["call_10"])
+        CALL_JOINS.labels("joined").inc()
         await add_active_chat(chat_id)
         await music_on(chat_id)
+        assistant_id = await get_assistant(chat_id)
+        if assistant_id:
+            assistant_scheduler.call_started(chat_id, assistant_id, video=bool(video))
         if video:
             await add_active_video_chat(chat_id)
         if await is_autoend():
@@ -333,17 +481,16 @@ class Call(PyTgCalls):
                 autoend[chat_id] = datetime.now() + timedelta(minutes=1)
 
     
+    @STREAM_CHANGE_SECONDS.time()
     async def change_stream(self, client, chat_id):
         check = db.get(chat_id)
-        popped = None
         loop = await get_loop(chat_id)
         try:
             if loop == 0:
-                popped = check.pop(0)
+                await queue_service.dequeue(chat_id)
             else:
                 loop = loop - 1
                 await set_loop(chat_id, loop)
-            await auto_clean(popped)
             if not check:
                 await _clear_(chat_id)
                 return await client.leave_group_call(chat_id)
@@ -362,7 +509,7 @@ class Call(PyTgCalls):
             original_chat_id = check[0]["chat_id"]
             streamtype = check[0]["streamtype"]
             videoid = check[0]["vidid"]
-            db[chat_id][0]["played"] = 0
+            clock.start(db[chat_id][0])
             exis = (check[0]).get("old_dur")
             if exis:
                 db[chat_id][0]["dur"] = exis
@@ -370,6 +517,7 @@ class Call(PyTgCalls):
                 db[chat_id][0]["speed_path"] = None
                 db[chat_id][0]["speed"] = 1.0
             video = True if str(streamtype) == "video" else False
+            assistant_scheduler.stream_changed(chat_id, video)
             if "live_" in queued:
                 n, link = await YouTube.video(videoid, True)
                 if n == 0:
@@ -395,9 +543,10 @@ class Call(PyTgCalls):
                         original_chat_id,
                         text=_["call_6"],
                     )
-                img = await get_thumb(videoid)
+                img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
                 button = stream_markup(_, chat_id)
-                run = await app.send_photo(
+                run = await media_cache.send_photo(
+                    app,
                     chat_id=original_chat_id,
                     photo=img,
                     caption=_["stream_1"].format(
@@ -441,10 +590,11 @@ class Call(PyTgCalls):
                         original_chat_id,
                         text=_["call_6"],
                     )
-                img = await get_thumb(videoid)
+                img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
                 button = stream_markup(_, chat_id)
                 await mystic.delete()
-                run = await app.send_photo(
+                run = await media_cache.send_photo(
+                    app,
                     chat_id=original_chat_id,
                     photo=img,
                     caption=_["stream_1"].format(
@@ -475,7 +625,8 @@ class Call(PyTgCalls):
                         text=_["call_6"],
                     )
                 button = stream_markup(_, chat_id)
-                run = await app.send_photo(
+                run = await media_cache.send_photo(
+                    app,
                     chat_id=original_chat_id,
                     photo=config.STREAM_IMG_URL,
                     caption=_["stream_2"].format(user),
@@ -504,7 +655,8 @@ class Call(PyTgCalls):
                     )
                 if videoid == "telegram":
                     button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
+                    run = await media_cache.send_photo(
+                        app,
                         chat_id=original_chat_id,
                         photo=config.TELEGRAM_AUDIO_URL
                         if str(streamtype) == "audio"
@@ -518,7 +670,8 @@ class Call(PyTgCalls):
                     db[chat_id][0]["markup"] = "tg"
                 elif videoid == "soundcloud":
                     button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
+                    run = await media_cache.send_photo(
+                        app,
                         chat_id=original_chat_id,
                         photo=config.SOUNCLOUD_IMG_URL,
                         caption=_["stream_1"].format(
@@ -529,9 +682,10 @@ class Call(PyTgCalls):
                     db[chat_id][0]["mystic"] = run
                     db[chat_id][0]["markup"] = "tg"
                 else:
-                    img = await get_thumb(videoid)
+                    img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
                     button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
+                    run = await media_cache.send_photo(
+                        app,
                         chat_id=original_chat_id,
                         photo=img,
                         caption=_["stream_1"].format(
@@ -548,62 +702,29 @@ class Call(PyTgCalls):
     
     async def ping(self):
         pings = []
-        if config.STRING1:
-            pings.append(await self.one.ping)
-        if config.STRING2:
-            pings.append(await self.two.ping)
-        if config.STRING3:
-            pings.append(await self.three.ping)
-        if config.STRING4:
-            pings.append(await self.four.ping)
-        if config.STRING5:
-            pings.append(await self.five.ping)
+        for entry in list(self.pool.values()):
+            if not entry.started:
+                continue
+            try:
+                pings.append(await entry.calls.ping)
+                healthy = entry.record(True)
+            except Exception as e:
+                healthy = entry.record(False, e)
+            tdlib_manager.set_connected(entry.assistant_id, healthy)
+        if not pings:
+            return "0"
         return str(round(sum(pings) / len(pings), 3))
 
     async def start(self):
         LOGGER(__name__).info("Starting PyTgCalls Client...\n")
-        if config.STRING1:
-            await self.one.start()
-        if config.STRING2:
-            await self.two.start()
-        if config.STRING3:
-            await self.three.start()
-        if config.STRING4:
-            await self.four.start()
-        if config.STRING5:
-            await self.five.start()
+        # التشغيل الفعلي لكل مساعد مؤجل حتى أول مكالمة عليه
+        await self.load_assistants()
+        LOGGER(__name__).info(f"🎙️ {len(self.pool)} مساعد جاهز في مجموعة المكالمات")
 
-    
     async def decorators(self):
-        @self.one.on_kicked()
-        @self.two.on_kicked()
-        @self.three.on_kicked()
-        @self.four.on_kicked()
-        @self.five.on_kicked()
-        @self.one.on_closed_voice_chat()
-        @self.two.on_closed_voice_chat()
-        @self.three.on_closed_voice_chat()
-        @self.four.on_closed_voice_chat()
-        @self.five.on_closed_voice_chat()
-        @self.one.on_left()
-        @self.two.on_left()
-        @self.three.on_left()
-        @self.four.on_left()
-        @self.five.on_left()
-        
-        async def stream_services_handler(_, chat_id: int):
-            await self.stop_stream(chat_id)
-
-        @self.one.on_stream_end()
-        @self.two.on_stream_end()
-        @self.three.on_stream_end()
-        @self.four.on_stream_end()
-        @self.five.on_stream_end()
-        
-        async def stream_end_handler1(client, update: Update):
-            if not isinstance(update, StreamAudioEnded):
-                return
-            await self.change_stream(client, update.chat_id)
+        self._decorated = True
+        for entry in self.pool.values():
+            self._install_handlers(entry.calls)
 
 
 Mody = Call()
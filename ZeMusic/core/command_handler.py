@@ -1,15 +1,149 @@
 import asyncio
 import json
+import re
 from typing import Dict, Any, Callable, Optional
 
 import config
 from ZeMusic.logging import LOGGER
 from ZeMusic.core.tdlib_client import tdlib_manager
-from ZeMusic.plugins.bot.basic_commands import command_handler as basic_commands
-from ZeMusic.plugins.owner.admin_panel import admin_panel
-from ZeMusic.plugins.owner.stats_handler import stats_handler
-from ZeMusic.plugins.owner.broadcast_handler import broadcast_handler
-from ZeMusic.plugins.owner.owner_panel import owner_panel
+from ZeMusic.core.instrumentation import loop_monitor
+from ZeMusic.plugins import plugin_registry
+
+# وحدات الأوامر تُحمّل عند أول أمر يحتاجها لا عند الإقلاع
+basic_commands = plugin_registry.lazy('bot.basic_commands', 'command_handler')
+broadcast_handler = plugin_registry.lazy('owner.broadcast_handler', 'broadcast_handler')
+
+# كلمات تدل على استخدام البوت في المجموعات (تُطابق كجزء من النص كما هي)
+BOT_TRIGGER_WORDS = (
+    'شغل', 'تشغيل', 'play', 'ايقاف', 'وقف', 'stop', 'pause', 'resume',
+    'تخطي', 'skip', 'next', 'تالي', 'قائمة', 'queue', 'موسيقى', 'music',
+    'صوت', 'audio', 'video', 'فيديو', 'بحث', 'search'
+)
+
+
+def _convert_keyboard_to_tdlib(keyboard):
+    """تحويل keyboard للتنسيق المناسب لـ TDLib"""
+    if not keyboard:
+        return None
+    
+    rows = []
+    for row in keyboard:
+        buttons = []
+        for button in row:
+            if len(button) >= 2:
+                buttons.append({
+                    '@type': 'inlineKeyboardButton',
+                    'text': button[0],
+                    'type': {
+                        '@type': 'inlineKeyboardButtonTypeCallback',
+                        'data': button[1]
+                    }
+                })
+        if buttons:
+            rows.append(buttons)
+    
+    return {
+        '@type': 'replyMarkupInlineKeyboard',
+        'rows': rows
+    } if rows else None
+
+
+# كائنات update خفيفة متوافقة مع الأوامر الموجودة (معرّفة مرة واحدة بدل كل رسالة)
+class MockChat:
+    __slots__ = ('id',)
+    
+    def __init__(self, chat_id):
+        self.id = chat_id
+
+
+class MockUser:
+    __slots__ = ('id', 'first_name')
+    
+    def __init__(self, user_id, first_name="User"):
+        self.id = user_id
+        self.first_name = first_name
+
+
+class MockMessage:
+    __slots__ = ('text', 'message_id', 'original', 'chat', 'from_user')
+    
+    def __init__(self, text, chat_id, user_id, message_id, original):
+        self.text = text
+        self.message_id = message_id
+        self.original = original
+        self.chat = MockChat(chat_id)
+        self.from_user = MockUser(user_id)
+    
+    async def reply_text(self, text, **kwargs):
+        """إرسال رد"""
+        bot_client = tdlib_manager.bot_client
+        if bot_client and bot_client.is_connected:
+            await bot_client.send_message(self.chat.id, text)
+
+
+class MockUpdate:
+    __slots__ = ('message', 'effective_user', 'effective_chat')
+    
+    def __init__(self, message):
+        self.message = message
+        self.effective_user = message.from_user
+        self.effective_chat = message.chat
+
+
+class MockCallbackMessage:
+    __slots__ = ('message_id', 'chat_id')
+    
+    def __init__(self, message_id, chat_id):
+        self.message_id = message_id
+        self.chat_id = chat_id
+    
+    async def reply_text(self, text, **kwargs):
+        """إرسال رد"""
+        bot_client = tdlib_manager.bot_client
+        if bot_client and bot_client.is_connected:
+            await bot_client.send_message(self.chat_id, text)
+
+
+class MockCallbackQuery:
+    __slots__ = ('data', 'from_user', 'message', 'original')
+    
+    def __init__(self, data, user_id, message_id, chat_id, original):
+        self.data = data
+        self.from_user = MockUser(user_id)
+        self.message = MockCallbackMessage(message_id, chat_id)
+        self.original = original
+    
+    async def answer(self, text=None, show_alert=False):
+        """الرد على الcallback query"""
+        await tdlib_manager.bot_client.client.call_method('answerCallbackQuery', {
+            'callback_query_id': self.original.get('id'),
+            'text': text or '',
+            'show_alert': show_alert
+        })
+    
+    async def edit_message_text(self, text, **kwargs):
+        """تعديل نص الرسالة"""
+        bot_client = tdlib_manager.bot_client
+        if bot_client and bot_client.is_connected:
+            # تحويل keyboard إذا وجد
+            reply_markup = kwargs.get('reply_markup')
+            keyboard = None
+            if reply_markup:
+                keyboard = _convert_keyboard_to_tdlib(reply_markup)
+            
+            await bot_client.client.call_method('editMessageText', {
+                'chat_id': self.message.chat_id,
+                'message_id': self.message.message_id,
+                'input_message_content': {
+                    '@type': 'inputMessageText',
+                    'text': {
+                        '@type': 'formattedText',
+                        'text': text
+                    }
+                },
+                'reply_markup': keyboard
+            })
+
 
 class TDLibCommandHandler:
     """معالج الأوامر والcallbacks مع TDLib"""
@@ -33,9 +167,11 @@ class TDLibCommandHandler:
             '/skip': self.handle_skip,
             '/current': self.handle_current,
             '/queue': self.handle_queue,
+            '/progress': self.handle_progress,
             '/owner': self.handle_owner,
             '/stats': self.handle_stats,
             '/admin': self.handle_admin,  # أمر لوحة المطور الجديد
+            '/metrics': self.handle_metrics,  # قياسات حلقة الأحداث (للمطور)
         }
         
         # تسجيل معالجات الcallbacks
@@ -45,6 +181,50 @@ class TDLibCommandHandler:
             'owner_': self.handle_owner_callback,
             'stats_': self.handle_stats_callback,
         }
+        self._compile_routes()
+    
+    def _compile_routes(self):
+        """
+        بناء جدول التوجيه: تعبير واحد لكل الأوامر المسجلة (مع لاحقة @اسم_بوت تُقارن عند المطابقة)
+        وتعبير واحد لكلمات التشغيل، فيُرفض الكلام العادي في المجموعات دون تحليل.
+        """
+        names = sorted((cmd.lstrip('/') for cmd in self.commands), key=len, reverse=True)
+        self._command_re = re.compile(
+            r'/(%s)(?:@(\w+))?(?=\s|$)' % '|'.join(map(re.escape, names)), re.IGNORECASE
+        )
+        self._trigger_re = re.compile(
+            '|'.join(map(re.escape, BOT_TRIGGER_WORDS)), re.IGNORECASE
+        )
+    
+    def match_command(self, text: str) -> Optional[Callable]:
+        """معالج الأمر في بداية النص، أو None"""
+        if not text.startswith('/'):
+            return None
+        match = self._command_re.match(text)
+        if not match:
+            return None
+        # /play@OtherBot في المجموعات موجه لبوت آخر
+        addressed = match.group(2)
+        if addressed and addressed.lower() != (self._bot_username() or '').lower():
+            return None
+        return self.commands['/' + match.group(1).lower()]
+    
+    @staticmethod
+    def _bot_username() -> Optional[str]:
+        bot_client = getattr(tdlib_manager, 'bot_client', None)
+        username = getattr(bot_client, 'username', None) if bot_client else None
+        return (username or config.BOT_USERNAME or '').lstrip('@') or None
+    
+    def _is_bot_directed(self, text: str, message: Dict) -> bool:
+        """هل الرسالة موجهة للبوت في مجموعة (أمر، إشارة، رد، أو كلمة تشغيل)"""
+        if text.startswith('/'):
+            return True
+        username = self._bot_username()
+        if username and f"@{username}" in text:
+            return True
+        if message.get('reply_to_message_id') and message.get('reply_to_message', {}).get('sender_id', {}).get('user_id') == int(config.BOT_ID):
+            return True
+        return self._trigger_re.search(text) is not None
     
     async def handle_message(self, update: Dict[str, Any]):
         """معالج الرسائل الواردة"""
@@ -59,16 +239,16 @@ class TDLibCommandHandler:
                 sender_id = message.get('sender_id', {}).get('user_id')
                 message_id = message.get('id')
                 
-                # تحويل للتنسيق المتوافق مع الأوامر الموجودة
-                mock_update = self._create_mock_update(text, chat_id, sender_id, message_id, message)
+                is_private_chat = chat_id > 0  # المحادثات الخاصة لها معرف موجب
+                is_bot_directed = is_private_chat or self._is_bot_directed(text, message)
                 
-                # فحص الاشتراك الإجباري بناءً على نوع المحادثة
-                should_check_subscription = False
+                # المسار السريع: كلام عادي في مجموعة لا يخص البوت ولا ينتظره أي معالج
+                if (not is_bot_directed and sender_id != config.OWNER_ID
+                        and not (broadcast_handler.loaded and sender_id in broadcast_handler.pending_sessions)):
+                    return
                 
-                # الحصول على نوع المحادثة
-                chat_type = message.get('chat_id', 0)
-                is_private_chat = chat_id > 0  # المحادثات الخاصة لها معرف موجب
-                is_group_or_channel = chat_id < 0  # المجموعات والقنوات لها معرف سالب
+                # تحويل للتنسيق المتوافق مع الأوامر الموجودة
+                mock_update = MockUpdate(MockMessage(text, chat_id, sender_id, message_id, message))
                 
                 # قواعد فحص الاشتراك:
                 if sender_id == config.OWNER_ID:
@@ -80,25 +260,9 @@ class TDLibCommandHandler:
                 elif text == '/start':
                     # أمر البدء معفي دائماً للترحيب
                     should_check_subscription = False
-                elif is_private_chat:
-                    # في المحادثات الخاصة: فحص جميع الرسائل
-                    should_check_subscription = True
-                elif is_group_or_channel:
-                    # في المجموعات والقنوات: فحص فقط عند استخدام البوت
-                    is_bot_command = text.startswith('/')
-                    is_bot_mention = f"@{tdlib_manager.bot_client.username}" in text if tdlib_manager.bot_client and hasattr(tdlib_manager.bot_client, 'username') else False
-                    is_reply_to_bot = message.get('reply_to_message_id') and message.get('reply_to_message', {}).get('sender_id', {}).get('user_id') == int(config.BOT_ID)
-                    
-                    # كلمات مفتاحية تدل على استخدام البوت
-                    bot_keywords = [
-                        'شغل', 'تشغيل', 'play', 'ايقاف', 'وقف', 'stop', 'pause', 'resume',
-                        'تخطي', 'skip', 'next', 'تالي', 'قائمة', 'queue', 'موسيقى', 'music',
-                        'صوت', 'audio', 'video', 'فيديو', 'بحث', 'search'
-                    ]
-                    is_using_bot_keywords = any(keyword in text.lower() for keyword in bot_keywords)
-                    
-                    # فحص الاشتراك فقط إذا كان المستخدم يتفاعل مع البوت
-                    should_check_subscription = is_bot_command or is_bot_mention or is_reply_to_bot or is_using_bot_keywords
+                else:
+                    # في الخاص: فحص جميع الرسائل، وفي المجموعات: فقط عند استخدام البوت
+                    should_check_subscription = is_bot_directed
                 
                 # تنفيذ فحص الاشتراك إذا كان مطلوباً
                 if should_check_subscription:
@@ -140,9 +304,10 @@ class TDLibCommandHandler:
                 
                 # التحقق من الأوامر
                 if text.startswith('/'):
-                    command = text.split()[0].lower()
-                    if command in self.commands:
-                        await self.commands[command](mock_update, None)
+                    handler = self.match_command(text)
+                    if handler:
+                        async with loop_monitor.track(f"command:{handler.__name__[7:]}"):
+                            await handler(mock_update, None)
                         return
                 
                 # معالجة session strings والأسماء للحسابات المساعدة
@@ -279,7 +444,8 @@ class TDLibCommandHandler:
             handled = False
             for prefix, handler in self.callback_handlers.items():
                 if data.startswith(prefix):
-                    await handler(mock_query)
+                    async with loop_monitor.track(f"callback:{prefix.rstrip('_')}"):
+                        await handler(mock_query)
                     handled = True
                     break
             
@@ -363,6 +529,10 @@ class TDLibCommandHandler:
         """معالج أمر /queue"""
         await basic_commands.queue_command(update, context)
     
+    async def handle_progress(self, update, context):
+        """معالج أمر /progress"""
+        await basic_commands.progress_command(update, context)
+    
     async def handle_owner(self, update, context):
         """معالج أمر /owner"""
         await basic_commands.owner_command(update, context)
@@ -375,6 +545,12 @@ class TDLibCommandHandler:
         """معالج أمر /admin - لوحة المطور"""
         await basic_commands.admin_command(update, context)
     
+    async def handle_metrics(self, update, context):
+        """معالج أمر /metrics - تأخر الحلقة وزمن المعالجات"""
+        if update.effective_user.id != config.OWNER_ID:
+            return
+        await update.message.reply_text(loop_monitor.report())
+    
     # معالجات الcallbacks
     async def handle_admin_callback(self, query):
         """معالج callbacks لوحة المطور"""
@@ -395,121 +571,10 @@ class TDLibCommandHandler:
     # الدوال المساعدة
     def _create_mock_update(self, text: str, chat_id: int, sender_id: int, message_id: int, original_message: Dict):
         """إنشاء كائن update وهمي متوافق مع الأوامر الموجودة"""
-        class MockMessage:
-            def __init__(self, text, chat_id, user_id, message_id, original):
-                self.text = text
-                self.message_id = message_id
-                self.original = original
-                
-                # Mock chat
-                class MockChat:
-                    def __init__(self, chat_id):
-                        self.id = chat_id
-                self.chat = MockChat(chat_id)
-                
-                # Mock user
-                class MockUser:
-                    def __init__(self, user_id):
-                        self.id = user_id
-                        self.first_name = "User"
-                self.from_user = MockUser(user_id)
-                
-            async def reply_text(self, text, **kwargs):
-                """إرسال رد"""
-                bot_client = tdlib_manager.bot_client
-                if bot_client and bot_client.is_connected:
-                    await bot_client.send_message(self.chat.id, text)
-        
-        class MockUpdate:
-            def __init__(self, message):
-                self.message = message
-                self.effective_user = message.from_user
-                self.effective_chat = message.chat
-        
-        mock_message = MockMessage(text, chat_id, sender_id, message_id, original_message)
-        return MockUpdate(mock_message)
+        return MockUpdate(MockMessage(text, chat_id, sender_id, message_id, original_message))
     
     def _create_mock_callback_query(self, data: str, user_id: int, message_id: int, chat_id: int, original_query: Dict):
         """إنشاء كائن callback query وهمي"""
-        class MockMessage:
-            def __init__(self, message_id, chat_id):
-                self.message_id = message_id
-                self.chat_id = chat_id
-                
-            async def reply_text(self, text, **kwargs):
-                """إرسال رد"""
-                bot_client = tdlib_manager.bot_client
-                if bot_client and bot_client.is_connected:
-                    await bot_client.send_message(self.chat_id, text)
-        
-        class MockUser:
-            def __init__(self, user_id):
-                self.id = user_id
-        
-        class MockCallbackQuery:
-            def __init__(self, data, user_id, message_id, chat_id, original):
-                self.data = data
-                self.from_user = MockUser(user_id)
-                self.message = MockMessage(message_id, chat_id)
-                self.original = original
-                
-            async def answer(self, text=None, show_alert=False):
-                """الرد على الcallback query"""
-                await tdlib_manager.bot_client.client.call_method('answerCallbackQuery', {
-                    'callback_query_id': self.original.get('id'),
-                    'text': text or '',
-                    'show_alert': show_alert
-                })
-                
-            async def edit_message_text(self, text, **kwargs):
-                """تعديل نص الرسالة"""
-                bot_client = tdlib_manager.bot_client
-                if bot_client and bot_client.is_connected:
-                    # تحويل keyboard إذا وجد
-                    reply_markup = kwargs.get('reply_markup')
-                    keyboard = None
-                    if reply_markup:
-                        keyboard = self._convert_keyboard_to_tdlib(reply_markup)
-                    
-                    await bot_client.client.call_method('editMessageText', {
-                        'chat_id': self.message.chat_id,
-                        'message_id': self.message.message_id,
-                        'input_message_content': {
-                            '@type': 'inputMessageText',
-                            'text': {
-                                '@type': 'formattedText',
-                                'text': text
-                            }
-                        },
-                        'reply_markup': keyboard
-                    })
-            
-            def _convert_keyboard_to_tdlib(self, keyboard):
-                """تحويل keyboard للتنسيق المناسب لـ TDLib"""
-                if not keyboard:
-                    return None
-                
-                rows = []
-                for row in keyboard:
-                    buttons = []
-                    for button in row:
-                        if len(button) >= 2:
-                            buttons.append({
-                                '@type': 'inlineKeyboardButton',
-                                'text': button[0],
-                                'type': {
-                                    '@type': 'inlineKeyboardButtonTypeCallback',
-                                    'data': button[1]
-                                }
-                            })
-                    if buttons:
-                        rows.append(buttons)
-                
-                return {
-                    '@type': 'replyMarkupInlineKeyboard',
-                    'rows': rows
-                } if rows else None
-        
         return MockCallbackQuery(data, user_id, message_id, chat_id, original_query)
     
     def _convert_message_for_broadcast(self, message: Dict) -> Dict:
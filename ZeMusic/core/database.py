@@ -10,9 +10,19 @@ from datetime import datetime
 import logging
 
 from config import DATABASE_PATH, ENABLE_DATABASE_CACHE
+from ZeMusic.core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+DB_LOCK_WAIT_SECONDS = metrics.histogram(
+    "zemusic_db_lock_wait_seconds", "Time spent waiting for the database connection lock")
+DB_HOLD_SECONDS = metrics.histogram(
+    "zemusic_db_connection_seconds", "Time a database connection was held per operation")
+DB_CACHE = metrics.counter(
+    "zemusic_db_cache_total", "Database memory-cache lookups", ["kind", "result"])
+DB_CACHE_ENTRIES = metrics.gauge(
+    "zemusic_db_cache_entries", "Entries held in the database memory cache", ["kind"])
+
 @dataclass
 class ChatSettings:
     """إعدادات المجموعة"""
@@ -74,7 +84,8 @@ class DatabaseManager:
                 'users': {},
                 'chats': {},
                 'assistants': {},
-                'temp': {}
+                'temp': {},
+                'temp_missing': set()
             }
         else:
             self.cache = {}
@@ -174,6 +185,43 @@ class DatabaseManager:
                 )
             ''')
             
+            # جدول معرفات الوسائط المرفوعة (لإعادة استخدام file_id)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS media_cache (
+                    media_key TEXT PRIMARY KEY,
+                    file_id TEXT NOT NULL,
+                    media_type TEXT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # جدول لقطات طوابير التشغيل (للاستعادة بعد إعادة التشغيل)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS playback_queues (
+                    chat_id INTEGER PRIMARY KEY,
+                    items TEXT NOT NULL,
+                    position INTEGER DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # جدول مهام الإذاعة (للاستئناف بعد إعادة التشغيل)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS broadcast_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    target_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT DEFAULT 'running',
+                    last_target_id INTEGER,
+                    sent_count INTEGER DEFAULT 0,
+                    failed_count INTEGER DEFAULT 0,
+                    total_targets INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
             # إنشاء فهارس للأداء
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_settings_chat_id ON chat_settings(chat_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_user_id ON users(user_id)')
@@ -190,13 +238,17 @@ class DatabaseManager:
     @contextmanager
     def _get_connection(self):
         """الحصول على اتصال آمن بقاعدة البيانات"""
+        waited = time.perf_counter()
         with self._lock:
+            acquired = time.perf_counter()
+            DB_LOCK_WAIT_SECONDS.observe(acquired - waited)
             conn = sqlite3.connect(self.db_path, timeout=30.0)
             conn.row_factory = sqlite3.Row
             try:
                 yield conn
             finally:
                 conn.close()
+                DB_HOLD_SECONDS.observe(time.perf_counter() - acquired)
 
     # ========================================
     # وظائف إدارة الحسابات المساعدة (جديد)
@@ -253,7 +305,9 @@ class DatabaseManager:
         """الحصول على معلومات المساعد"""
         # التحقق من الكاش أولاً
         if self.cache_enabled and assistant_id in self.cache.get('assistants', {}):
+            DB_CACHE.labels("assistants", "hit").inc()
             return self.cache['assistants'][assistant_id]
+        DB_CACHE.labels("assistants", "miss").inc()
         
         def _get():
             with self._get_connection() as conn:
@@ -371,50 +425,90 @@ class DatabaseManager:
     # وظائف إعدادات المجموعات
     # ========================================
     
+    def _load_chat_settings(self, conn, chat_id: int) -> ChatSettings:
+        """قراءة إعدادات المجموعة (وإنشاء الافتراضية) ضمن اتصال مفتوح"""
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM chat_settings WHERE chat_id = ?', (chat_id,))
+        row = cursor.fetchone()
+        
+        if row:
+            settings = ChatSettings(
+                chat_id=row['chat_id'],
+                language=row['language'],
+                play_mode=row['play_mode'],
+                play_type=row['play_type'],
+                assistant_id=row['assistant_id'],
+                auto_end=bool(row['auto_end']),
+                auth_enabled=bool(row['auth_enabled']),
+                welcome_enabled=bool(row['welcome_enabled']),
+                log_enabled=bool(row['log_enabled']),
+                search_enabled=bool(row['search_enabled']),
+                upvote_count=row['upvote_count']
+            )
+        else:
+            # إعدادات افتراضية
+            settings = ChatSettings(chat_id=chat_id)
+            # حفظ الإعدادات الافتراضية
+            cursor.execute('''
+                INSERT OR REPLACE INTO chat_settings 
+                (chat_id, language, play_mode, play_type, upvote_count) 
+                VALUES (?, ?, ?, ?, ?)
+            ''', (chat_id, settings.language, settings.play_mode, 
+                  settings.play_type, settings.upvote_count))
+            conn.commit()
+        
+        # حفظ في الكاش
+        if self.cache_enabled:
+            self.cache.setdefault('settings', {})[chat_id] = settings
+        
+        return settings
+
     async def get_chat_settings(self, chat_id: int) -> ChatSettings:
         """الحصول على إعدادات المجموعة"""
         # التحقق من الكاش أولاً
         if self.cache_enabled and chat_id in self.cache.get('settings', {}):
+            DB_CACHE.labels("settings", "hit").inc()
             return self.cache['settings'][chat_id]
+        DB_CACHE.labels("settings", "miss").inc()
             
         def _get():
             with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM chat_settings WHERE chat_id = ?', (chat_id,))
-                row = cursor.fetchone()
-                
-                if row:
-                    settings = ChatSettings(
-                        chat_id=row['chat_id'],
-                        language=row['language'],
-                        play_mode=row['play_mode'],
-                        play_type=row['play_type'],
-                        assistant_id=row['assistant_id'],
-                        auto_end=bool(row['auto_end']),
-                        auth_enabled=bool(row['auth_enabled']),
-                        welcome_enabled=bool(row['welcome_enabled']),
-                        log_enabled=bool(row['log_enabled']),
-                        search_enabled=bool(row['search_enabled']),
-                        upvote_count=row['upvote_count']
+                return self._load_chat_settings(conn, chat_id)
+        
+        return await asyncio.get_event_loop().run_in_executor(None, _get)
+
+    async def get_chat_snapshot(self, chat_id: int, keys: List[str]):
+        """
+        إعدادات المجموعة مع مجموعة حالات مؤقتة في رحلة واحدة لقاعدة البيانات.
+        يُرجع (ChatSettings, {key: value}) ويحوي القاموس المفاتيح الموجودة فقط.
+        """
+        if self.cache_enabled:
+            settings = self.cache.get('settings', {}).get(chat_id)
+            temp = self.cache.get('temp', {})
+            missing = self.cache.get('temp_missing', set())
+            if settings is not None and all(k in temp or k in missing for k in keys):
+                DB_CACHE.labels("snapshot", "hit").inc()
+                return settings, {k: temp[k] for k in keys if k in temp}
+        DB_CACHE.labels("snapshot", "miss").inc()
+
+        def _get():
+            with self._get_connection() as conn:
+                settings = self._load_chat_settings(conn, chat_id)
+                values = {}
+                if keys:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        f"SELECT key, value FROM temp_states WHERE key IN ({', '.join('?' * len(keys))})",
+                        list(keys),
                     )
-                else:
-                    # إعدادات افتراضية
-                    settings = ChatSettings(chat_id=chat_id)
-                    # حفظ الإعدادات الافتراضية
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO chat_settings 
-                        (chat_id, language, play_mode, play_type, upvote_count) 
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (chat_id, settings.language, settings.play_mode, 
-                          settings.play_type, settings.upvote_count))
-                    conn.commit()
-                
-                # حفظ في الكاش
+                    values = {row['key']: json.loads(row['value']) for row in cursor.fetchall()}
                 if self.cache_enabled:
-                    self.cache.setdefault('settings', {})[chat_id] = settings
-                
-                return settings
-        
+                    self.cache.setdefault('temp', {}).update(values)
+                    self.cache.setdefault('temp_missing', set()).update(
+                        k for k in keys if k not in values
+                    )
+                return settings, values
+
         return await asyncio.get_event_loop().run_in_executor(None, _get)
 
     async def update_chat_setting(self, chat_id: int, **kwargs):
@@ -629,6 +723,7 @@ class DatabaseManager:
         """حفظ حالة مؤقتة"""
         if self.cache_enabled:
             self.cache.setdefault('temp', {})[key] = value
+            self.cache.get('temp_missing', set()).discard(key)
         
         def _save():
             with self._get_connection() as conn:
@@ -645,7 +740,13 @@ class DatabaseManager:
         """الحصول على حالة مؤقتة"""
         # التحقق من الكاش أولاً
         if self.cache_enabled and 'temp' in self.cache and key in self.cache['temp']:
+            DB_CACHE.labels("temp", "hit").inc()
             return self.cache['temp'][key]
+        # مفتاح معروف أنه غير محفوظ: لا داعي لسؤال قاعدة البيانات مجدداً
+        if self.cache_enabled and key in self.cache.get('temp_missing', ()):
+            DB_CACHE.labels("temp", "hit").inc()
+            return default
+        DB_CACHE.labels("temp", "miss").inc()
             
         def _get():
             with self._get_connection() as conn:
@@ -657,10 +758,150 @@ class DatabaseManager:
                     if self.cache_enabled:
                         self.cache.setdefault('temp', {})[key] = value
                     return value
+                if self.cache_enabled:
+                    self.cache.setdefault('temp_missing', set()).add(key)
                 return default
         
         return await asyncio.get_event_loop().run_in_executor(None, _get)
 
+    # وظائف معرفات الوسائط المرفوعة
+    async def get_media_file_ids(self) -> Dict[str, str]:
+        """الحصول على جميع معرفات الوسائط المحفوظة"""
+        def _get():
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT media_key, file_id FROM media_cache')
+                return {row['media_key']: row['file_id'] for row in cursor.fetchall()}
+        
+        return await asyncio.get_event_loop().run_in_executor(None, _get)
+
+    async def set_media_file_id(self, media_key: str, file_id: str, media_type: str = "photo"):
+        """حفظ file_id لوسائط تم رفعها"""
+        def _save():
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO media_cache (media_key, file_id, media_type, updated_at)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (media_key, file_id, media_type))
+                conn.commit()
+        
+        await asyncio.get_event_loop().run_in_executor(None, _save)
+
+    async def delete_media_file_id(self, media_key: str):
+        """حذف file_id غير صالح"""
+        def _delete():
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM media_cache WHERE media_key = ?', (media_key,))
+                conn.commit()
+        
+        await asyncio.get_event_loop().run_in_executor(None, _delete)
+
+    # وظائف لقطات طوابير التشغيل
+    async def save_queue_snapshots(self, snapshots: Dict[int, tuple], removed: List[int] = None):
+        """حفظ لقطات عدة طوابير وحذف المنتهية في معاملة واحدة"""
+        def _save():
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                if snapshots:
+                    cursor.executemany('''
+                        INSERT OR REPLACE INTO playback_queues (chat_id, items, position, updated_at)
+                        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                    ''', [
+                        (chat_id, json.dumps(items, ensure_ascii=False, default=str), position)
+                        for chat_id, (items, position) in snapshots.items()
+                    ])
+                if removed:
+                    cursor.executemany(
+                        'DELETE FROM playback_queues WHERE chat_id = ?',
+                        [(chat_id,) for chat_id in removed]
+                    )
+                conn.commit()
+        
+        await asyncio.get_event_loop().run_in_executor(None, _save)
+
+    async def get_queue_snapshots(self) -> Dict[int, tuple]:
+        """الحصول على جميع لقطات الطوابير المحفوظة"""
+        def _get():
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT chat_id, items, position FROM playback_queues ORDER BY updated_at DESC')
+                return {
+                    row['chat_id']: (json.loads(row['items']), row['position'])
+                    for row in cursor.fetchall()
+                }
+        
+        return await asyncio.get_event_loop().run_in_executor(None, _get)
+
+    # وظائف مهام الإذاعة
+    _BROADCAST_TARGET_QUERIES = {
+        'users': "SELECT user_id FROM users WHERE is_banned = 0 AND user_id > ? ORDER BY user_id LIMIT ?",
+        'groups': "SELECT chat_id FROM chats WHERE chat_type IN ('group', 'supergroup') AND is_blacklisted = 0 AND chat_id > ? ORDER BY chat_id LIMIT ?",
+        'channels': "SELECT chat_id FROM chats WHERE chat_type = 'channel' AND is_blacklisted = 0 AND chat_id > ? ORDER BY chat_id LIMIT ?",
+    }
+
+    async def get_broadcast_targets_page(self, target_type: str, after_id: Optional[int], limit: int) -> List[int]:
+        """صفحة من أهداف الإذاعة بعد المعرف after_id (ترقيم بالمفتاح)"""
+        query = self._BROADCAST_TARGET_QUERIES.get(target_type)
+        if not query:
+            return []
+
+        def _get():
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                # المعرفات قد تكون سالبة (المجموعات والقنوات) فنبدأ من أصغر قيمة ممكنة
+                cursor.execute(query, (after_id if after_id is not None else -(2 ** 63), limit))
+                return [row[0] for row in cursor.fetchall()]
+
+        return await asyncio.get_event_loop().run_in_executor(None, _get)
+
+    async def create_broadcast_job(self, job_id: str, user_id: int, target_type: str,
+                                   payload: Dict, total_targets: int):
+        """تسجيل مهمة إذاعة جديدة"""
+        def _create():
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO broadcast_jobs
+                    (job_id, user_id, target_type, payload, status, total_targets)
+                    VALUES (?, ?, ?, ?, 'running', ?)
+                ''', (job_id, user_id, target_type, json.dumps(payload, ensure_ascii=False, default=str), total_targets))
+                conn.commit()
+
+        await asyncio.get_event_loop().run_in_executor(None, _create)
+
+    async def checkpoint_broadcast_job(self, job_id: str, last_target_id: Optional[int],
+                                       sent_count: int, failed_count: int, status: str = 'running'):
+        """حفظ نقطة تقدم مهمة إذاعة"""
+        def _update():
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    UPDATE broadcast_jobs
+                    SET last_target_id = ?, sent_count = ?, failed_count = ?, status = ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE job_id = ?
+                ''', (last_target_id, sent_count, failed_count, status, job_id))
+                conn.commit()
+
+        await asyncio.get_event_loop().run_in_executor(None, _update)
+
+    async def get_unfinished_broadcast_jobs(self) -> List[Dict]:
+        """مهام الإذاعة التي لم تكتمل"""
+        def _get():
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT * FROM broadcast_jobs WHERE status = 'running' ORDER BY created_at")
+                jobs = []
+                for row in cursor.fetchall():
+                    job = dict(row)
+                    job['payload'] = json.loads(job['payload'])
+                    jobs.append(job)
+                return jobs
+
+        return await asyncio.get_event_loop().run_in_executor(None, _get)
+
     async def clear_cache(self):
         """مسح الكاش"""
         if self.cache_enabled:
@@ -750,4 +991,12 @@ class DatabaseManager:
 # إنشاء مثيل مدير قاعدة البيانات
 db = DatabaseManager()
 
+
+def _collect_db_cache():
+    for kind, entries in db.cache.items():
+        DB_CACHE_ENTRIES.labels(kind).set(len(entries))
+
+
+metrics.add_collector(_collect_db_cache)
+
 logger.info("✅ نظام قاعدة البيانات TDLib جاهز للاستخدام")
\ No newline at end of file
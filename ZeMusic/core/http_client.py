@@ -0,0 +1,153 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Any
+from urllib.parse import urlsplit
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    aiohttp = None
+    AIOHTTP_AVAILABLE = False
+
+from ZeMusic.logging import LOGGER
+
+# --- إعدادات عميل HTTP المشترك ---
+HTTP_TOTAL_LIMIT = 200          # الحد الأقصى لجميع الاتصالات المفتوحة
+HTTP_LIMIT_PER_HOST = 20        # الحد الأقصى للاتصالات لكل مضيف
+HTTP_DNS_CACHE_TTL = 300        # مدة تخزين نتائج DNS (ثانية)
+HTTP_KEEPALIVE_TIMEOUT = 60     # مدة إبقاء الاتصال مفتوحاً بعد الاستخدام
+HTTP_REQUEST_TIMEOUT = 15       # المهلة الافتراضية للطلب
+HTTP_USER_AGENT = "ZeMusic/2.0 (+https://github.com/saud552/NHAY7)"
+
+
+class HostStats:
+    """إحصائيات الطلبات لمضيف واحد"""
+
+    __slots__ = ("requests", "errors", "total_time", "last_status")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.last_status = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        avg = self.total_time / self.requests if self.requests else 0.0
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'avg_time': round(avg, 3),
+            'last_status': self.last_status,
+        }
+
+
+class HTTPClientManager:
+    """عميل HTTP موحد على مستوى العملية: جلسة واحدة واتصالات مُعاد استخدامها"""
+
+    def __init__(self):
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._lock = asyncio.Lock()
+        self.host_stats: Dict[str, HostStats] = {}
+        self.created_at: Optional[float] = None
+
+    @property
+    def is_available(self) -> bool:
+        return AIOHTTP_AVAILABLE
+
+    async def get_session(self) -> "aiohttp.ClientSession":
+        """الحصول على الجلسة المشتركة (تُنشأ عند أول استخدام)"""
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp غير مثبت")
+
+        if self._session is not None and not self._session.closed:
+            return self._session
+
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                # ملاحظة: aiohttp لا يدعم HTTP/2، لذا نعتمد على keep-alive
+                # وإعادة استخدام اتصالات TLS بدلاً من فتح اتصال لكل طلب
+                connector = aiohttp.TCPConnector(
+                    limit=HTTP_TOTAL_LIMIT,
+                    limit_per_host=HTTP_LIMIT_PER_HOST,
+                    ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+                    use_dns_cache=True,
+                    keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                    enable_cleanup_closed=True
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT),
+                    headers={'User-Agent': HTTP_USER_AGENT}
+                )
+                self.created_at = time.time()
+                LOGGER(__name__).info("🌐 تم إنشاء جلسة HTTP المشتركة")
+
+        return self._session
+
+    def _record(self, url: str, started: float, status: Optional[int], failed: bool):
+        host = urlsplit(str(url)).netloc or "unknown"
+        stats = self.host_stats.get(host)
+        if stats is None:
+            stats = self.host_stats[host] = HostStats()
+        stats.requests += 1
+        stats.total_time += time.monotonic() - started
+        stats.last_status = status
+        if failed:
+            stats.errors += 1
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs):
+        """تنفيذ طلب عبر الجلسة المشتركة مع تسجيل الإحصائيات"""
+        session = await self.get_session()
+        started = time.monotonic()
+        status = None
+        failed = False
+        try:
+            async with session.request(method, url, **kwargs) as resp:
+                status = resp.status
+                failed = status >= 400
+                yield resp
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._record(url, started, status, failed)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    async def fetch_bytes(self, url: str, **kwargs) -> Optional[bytes]:
+        """تحميل محتوى رابط كبايتات (None عند الفشل)"""
+        async with self.get(url, **kwargs) as resp:
+            if resp.status != 200:
+                return None
+            return await resp.read()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """إحصائيات العميل المشترك لكل مضيف"""
+        connector = self._session.connector if self._session and not self._session.closed else None
+        return {
+            'session_open': connector is not None,
+            'uptime': round(time.time() - self.created_at, 1) if self.created_at else 0,
+            'total_requests': sum(s.requests for s in self.host_stats.values()),
+            'total_errors': sum(s.errors for s in self.host_stats.values()),
+            'hosts': {host: s.to_dict() for host, s in self.host_stats.items()},
+        }
+
+    async def close(self):
+        """إغلاق الجلسة المشتركة"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# عميل HTTP العالمي
+http_client = HTTPClientManager()
@@ -0,0 +1,240 @@
+"""
+قياس حلقة الأحداث والمسار الساخن: تأخر الحلقة، كشف توقفها مع لقطة من مكدس
+الكود الذي أوقفها، توزيع زمن المعالجات (تشغيل، تخطي، أزرار)، وعمق طوابير الـ executors.
+"""
+
+import asyncio
+import bisect
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from functools import wraps
+from typing import Dict, List, Optional
+
+import config
+from ZeMusic.logging import LOGGER
+from ZeMusic.core.metrics import LATENCY_BUCKETS, metrics
+
+LOOP_LAG_INTERVAL = 0.5   # الفاصل بين عينات تأخر الحلقة
+LOOP_STALL_KEEP = 20      # عدد التوقفات المحفوظة مع مكدساتها
+LOOP_STACK_LIMIT = 15     # عمق المكدس المحفوظ لكل توقف
+
+HANDLER_SECONDS = metrics.histogram(
+    "zemusic_handler_seconds", "Command and callback handler latency", ["handler"])
+
+
+class LatencyHistogram:
+    """توزيع أزمنة بحدود ثابتة (بالثواني)"""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """الحد الأعلى للشريحة التي تقع فيها النسبة q"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.sum / self.count * 1000, 1) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.5) * 1000, 1),
+            'p95_ms': round(self.quantile(0.95) * 1000, 1),
+            'p99_ms': round(self.quantile(0.99) * 1000, 1),
+            'max_ms': round(self.max * 1000, 1),
+        }
+
+
+class LoopMonitor:
+    """مراقبة حلقة الأحداث وزمن المعالجات"""
+
+    def __init__(self):
+        self.lag = LatencyHistogram()
+        self.last_lag = 0.0
+        self.stalls = deque(maxlen=LOOP_STALL_KEEP)
+        self.handlers: Dict[str, LatencyHistogram] = {}
+        self.executors: Dict[str, Executor] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat = 0.0
+        self._stopped = threading.Event()
+
+    # ---- تأخر الحلقة ----
+
+    def start(self):
+        """بدء أخذ العينات من داخل الحلقة، وخيط مراقب يلتقط مكدس أي توقف"""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._loop.call_later(LOOP_LAG_INTERVAL, self._sample, self._heartbeat + LOOP_LAG_INTERVAL)
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+        self.watch_executor("default", None)
+
+    def stop(self):
+        self._stopped.set()
+        self._loop = None
+
+    def _sample(self, expected: float):
+        now = time.monotonic()
+        lag = max(0.0, now - expected)
+        self.last_lag = lag
+        self.lag.observe(lag)
+        # تحديث مدة التوقف الذي التقطه المراقب بمدته الكاملة
+        if self.stalls and self.stalls[-1]['heartbeat'] == self._heartbeat:
+            self.stalls[-1]['blocked_ms'] = round(lag * 1000, 1)
+        self._heartbeat = now
+        if self._loop is not None and not self._stopped.is_set():
+            self._loop.call_later(LOOP_LAG_INTERVAL, self._sample, now + LOOP_LAG_INTERVAL)
+
+    def _watch(self):
+        threshold = config.LOOP_STALL_THRESHOLD
+        reported = None
+        while not self._stopped.wait(max(threshold / 2, 0.05)):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - LOOP_LAG_INTERVAL
+            if blocked < threshold or reported == heartbeat:
+                continue
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = traceback.format_stack(frame, limit=LOOP_STACK_LIMIT) if frame else []
+            where = stack[-1].strip().splitlines()[0] if stack else "?"
+            self.stalls.append({
+                'at': time.time(),
+                'heartbeat': heartbeat,
+                'blocked_ms': round(blocked * 1000, 1),
+                'where': where,
+                'stack': "".join(stack),
+            })
+            LOGGER(__name__).warning(f"🐢 حلقة الأحداث متوقفة منذ {blocked * 1000:.0f}ms عند: {where}")
+
+    # ---- زمن المعالجات ----
+
+    def observe(self, name: str, seconds: float):
+        histogram = self.handlers.get(name)
+        if histogram is None:
+            histogram = self.handlers[name] = LatencyHistogram()
+        histogram.observe(seconds)
+        HANDLER_SECONDS.labels(name).observe(seconds)
+
+    @asynccontextmanager
+    async def track(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def timed(self, name: str):
+        """مزخرف لقياس زمن دالة غير متزامنة"""
+        def decorator(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    # ---- الـ executors ----
+
+    def watch_executor(self, name: str, executor: Optional[Executor]):
+        """تسجيل executor لمراقبة عمق طابوره (None = الافتراضي للحلقة)"""
+        self.executors[name] = executor
+
+    def executor_depths(self) -> Dict[str, int]:
+        depths = {}
+        for name, executor in self.executors.items():
+            if executor is None and self._loop is not None:
+                executor = getattr(self._loop, "_default_executor", None)
+            queue = getattr(executor, "_work_queue", None)
+            depths[name] = queue.qsize() if queue is not None else 0
+        return depths
+
+    # ---- العرض ----
+
+    def snapshot(self) -> Dict:
+        return {
+            'loop': {
+                'last_lag_ms': round(self.last_lag * 1000, 1),
+                **self.lag.snapshot(),
+                'tasks': len(asyncio.all_tasks(self._loop)) if self._loop else 0,
+            },
+            'stalls': [
+                {k: v for k, v in stall.items() if k != 'heartbeat'} for stall in self.stalls
+            ],
+            'handlers': {name: h.snapshot() for name, h in self.handlers.items()},
+            'executors': self.executor_depths(),
+        }
+
+    def report(self) -> str:
+        """ملخص نصي لأمر المطور"""
+        snap = self.snapshot()
+        loop = snap['loop']
+        lines = [
+            "🩺 **حالة حلقة الأحداث**",
+            f"⏱️ التأخر الحالي: `{loop['last_lag_ms']}ms` | p95: `{loop['p95_ms']}ms` | أقصى: `{loop['max_ms']}ms`",
+            f"🧵 المهام: `{loop['tasks']}` | التوقفات المسجلة: `{len(snap['stalls'])}`",
+        ]
+        if snap['executors']:
+            depths = "، ".join(f"{k}: {v}" for k, v in snap['executors'].items())
+            lines.append(f"📥 طوابير الـ executors: `{depths}`")
+        if snap['handlers']:
+            lines.append("\n📊 **زمن المعالجات** (p50 / p95 / أقصى):")
+            for name, h in sorted(snap['handlers'].items()):
+                lines.append(
+                    f"• {name}: `{h['p50_ms']}` / `{h['p95_ms']}` / `{h['max_ms']}`ms ({h['count']})"
+                )
+        if self.stalls:
+            last = self.stalls[-1]
+            lines.append(f"\n🐢 آخر توقف: `{last['blocked_ms']}ms`\n`{last['where']}`")
+        return "\n".join(lines)
+
+    def slowest_stalls(self, top: int = 5) -> List[Dict]:
+        return sorted(self.stalls, key=lambda s: s['blocked_ms'], reverse=True)[:top]
+
+
+loop_monitor = LoopMonitor()
+
+LOOP_LAG = metrics.gauge("zemusic_event_loop_lag_seconds", "Latest event-loop lag sample")
+LOOP_STALLS = metrics.gauge("zemusic_event_loop_stalls", "Recorded event-loop stalls (bounded)")
+EXECUTOR_DEPTH = metrics.gauge(
+    "zemusic_executor_queue_depth", "Pending work items per executor", ["executor"])
+
+
+def _collect_loop():
+    LOOP_LAG.set(loop_monitor.last_lag)
+    LOOP_STALLS.set(len(loop_monitor.stalls))
+    for name, depth in loop_monitor.executor_depths().items():
+        EXECUTOR_DEPTH.labels(name).set(depth)
+
+
+metrics.add_collector(_collect_loop)
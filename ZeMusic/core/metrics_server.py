@@ -0,0 +1,79 @@
+"""
+نقطة HTTP محلية لعرض المقاييس والتشخيص (مقيدة افتراضياً بـ 127.0.0.1).
+كل نظام يسجل مساره الخاص بدالة تُرجع (النص، نوع المحتوى).
+"""
+
+import json
+from typing import Awaitable, Callable, Dict, Tuple, Union
+
+try:
+    from aiohttp import web
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    web = None
+    AIOHTTP_AVAILABLE = False
+
+import config
+from ZeMusic.logging import LOGGER
+
+RouteHandler = Callable[[], Union[Tuple[str, str], Awaitable[Tuple[str, str]]]]
+
+
+def json_response(data) -> Tuple[str, str]:
+    return json.dumps(data, ensure_ascii=False, default=str), "application/json"
+
+
+class MetricsServer:
+    """خادم aiohttp صغير لمسارات القراءة فقط"""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteHandler] = {}
+        self._runner = None
+
+    def add_route(self, path: str, handler: RouteHandler):
+        self.routes[path] = handler
+
+    async def _handle(self, request):
+        handler = self.routes.get(request.path)
+        if handler is None:
+            return web.Response(status=404, text="not found")
+        try:
+            result = handler()
+            if hasattr(result, "__await__"):
+                result = await result
+            body, content_type = result
+        except Exception as e:
+            LOGGER(__name__).warning(f"خطأ في مسار المقاييس {request.path}: {e}")
+            return web.Response(status=500, text=str(e))
+        return web.Response(text=body, content_type=content_type.split(";")[0], charset="utf-8")
+
+    async def start(self) -> bool:
+        if self._runner or not config.METRICS_PORT:
+            return False
+        if not AIOHTTP_AVAILABLE:
+            LOGGER(__name__).warning("⚠️ aiohttp غير متاح - نقطة المقاييس معطلة")
+            return False
+        app = web.Application()
+        app.router.add_route("GET", "/{tail:.*}", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, config.METRICS_HOST, config.METRICS_PORT).start()
+        except OSError as e:
+            await runner.cleanup()
+            LOGGER(__name__).warning(f"⚠️ تعذر فتح نقطة المقاييس على {config.METRICS_PORT}: {e}")
+            return False
+        self._runner = runner
+        LOGGER(__name__).info(
+            f"📈 نقطة المقاييس: http://{config.METRICS_HOST}:{config.METRICS_PORT} "
+            f"({', '.join(sorted(self.routes))})"
+        )
+        return True
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+metrics_server = MetricsServer()
@@ -7,6 +7,7 @@ from dataclasses import dataclass
 import config
 from ZeMusic.logging import LOGGER
 from ZeMusic.core.tdlib_client import tdlib_manager
+from ZeMusic.core.assistant_scheduler import assistant_scheduler
 from ZeMusic.core.database import db
 
 @dataclass
@@ -98,6 +99,7 @@ class MusicManager:
             )
             
             self.active_sessions[chat_id] = session
+            assistant_scheduler.call_started(chat_id, assistant.assistant_id)
             
             # تحديث إحصائيات المساعد
             await db.update_assistant_usage(assistant.assistant_id)
@@ -178,7 +180,7 @@ class MusicManager:
             # تشغيل التالية من القائمة
             next_song = await self.queue_manager.get_next(chat_id)
             if next_song:
-                return await self.play_music(chat_id, next_song['query'], next_song['user_id'])
+                return await self.play_music(chat_id, next_song['title'], next_song['user_id'])
             
             return True
             
@@ -226,6 +228,7 @@ class MusicManager:
             
             # إزالة الجلسة
             del self.active_sessions[chat_id]
+            assistant_scheduler.call_ended(chat_id)
             return True
             
         except Exception as e:
@@ -234,10 +237,7 @@ class MusicManager:
     
     def _get_assistant_by_id(self, assistant_id: int) -> Optional[Any]:
         """الحصول على المساعد بالمعرف"""
-        for assistant in tdlib_manager.assistants:
-            if assistant.assistant_id == assistant_id:
-                return assistant
-        return None
+        return tdlib_manager.get_assistant(assistant_id)
     
     async def cleanup_sessions(self):
         """تنظيف الجلسات المنتهية"""
@@ -258,64 +258,49 @@ class MusicManager:
 
 
 class QueueManager:
-    """مدير قوائم انتظار الموسيقى"""
+    """واجهة قوائم الانتظار فوق خدمة الطوابير الموحدة (utils.stream.queue)"""
     
-    def __init__(self):
-        self.queues: Dict[int, List[Dict]] = {}
-    
-    async def add_to_queue(self, chat_id: int, song_info: Dict):
-        """إضافة أغنية لقائمة الانتظار"""
-        if chat_id not in self.queues:
-            self.queues[chat_id] = []
-        
-        self.queues[chat_id].append(song_info)
+    @property
+    def queues(self) -> Dict[int, Any]:
+        from ZeMusic.misc import db as queues
+        return queues
     
-    async def get_next(self, chat_id: int) -> Optional[Dict]:
-        """الحصول على الأغنية التالية"""
-        if chat_id in self.queues and self.queues[chat_id]:
-            return self.queues[chat_id].pop(0)
-        return None
+    async def get_next(self, chat_id: int) -> Optional[Any]:
+        """
+        الحصول على الأغنية التالية: رأس الطابور هو المقطع الجاري، فيُخرج
+        ثم يُعاد الرأس الجديد دون إخراجه (كما في Call.change_stream)
+        """
+        from ZeMusic.utils.stream.queue import queue_service
+        await queue_service.dequeue(chat_id)
+        upcoming = await queue_service.peek(chat_id)
+        return upcoming[0] if upcoming else None
     
-    async def get_queue(self, chat_id: int) -> List[Dict]:
+    async def get_queue(self, chat_id: int) -> List[Any]:
         """الحصول على قائمة الانتظار"""
-        return self.queues.get(chat_id, [])
+        return list(self.queues.get(chat_id) or [])
     
     async def clear_queue(self, chat_id: int):
         """مسح قائمة الانتظار"""
-        if chat_id in self.queues:
-            self.queues[chat_id].clear()
+        from ZeMusic.utils.stream.queue import queue_service
+        await queue_service.clear(chat_id)
 
 
 class AssistantAllocator:
     """مخصص الحسابات المساعدة"""
     
     async def get_best_assistant(self, chat_id: int = None) -> Optional[Any]:
-        """الحصول على أفضل مساعد متاح"""
+        """الحصول على أفضل مساعد متاح بحسب الحمل والسعة"""
         try:
-            # الحصول على المساعد من إعدادات المجموعة أولاً
+            # المساعد المحدد في إعدادات المجموعة هو التخصيص الثابت
+            preferred = None
             if chat_id:
                 settings = await db.get_chat_settings(chat_id)
-                if settings.assistant_id:
-                    specific_assistant = self._get_assistant_by_id(settings.assistant_id)
-                    if specific_assistant and specific_assistant.is_connected:
-                        return specific_assistant
-            
-            # البحث عن أفضل مساعد متاح
-            available_assistants = [
-                a for a in tdlib_manager.assistants 
-                if a.is_connected and a.get_active_calls_count() < 10
-            ]
-            
-            if not available_assistants:
-                return None
+                preferred = settings.assistant_id
             
-            # اختيار الأقل استخداماً
-            best_assistant = min(
-                available_assistants,
-                key=lambda a: a.get_active_calls_count()
-            )
-            
-            return best_assistant
+            assistant_id = assistant_scheduler.pick(chat_id, preferred=preferred)
+            if assistant_id is None:
+                return None
+            return self._get_assistant_by_id(assistant_id)
             
         except Exception as e:
             LOGGER(__name__).error(f"خطأ في اختيار المساعد: {e}")
@@ -323,10 +308,7 @@ class AssistantAllocator:
     
     def _get_assistant_by_id(self, assistant_id: int) -> Optional[Any]:
         """الحصول على المساعد بالمعرف"""
-        for assistant in tdlib_manager.assistants:
-            if assistant.assistant_id == assistant_id:
-                return assistant
-        return None
+        return tdlib_manager.get_assistant(assistant_id)
     
     async def assign_assistant_to_chat(self, chat_id: int, assistant_id: int) -> bool:
         """تخصيص مساعد لمجموعة معينة"""
@@ -334,6 +316,7 @@ class AssistantAllocator:
             assistant = self._get_assistant_by_id(assistant_id)
             if assistant and assistant.is_connected:
                 await db.update_chat_setting(chat_id, assistant_id=assistant_id)
+                assistant_scheduler.assign(chat_id, assistant_id)
                 return True
             return False
         except Exception as e:
@@ -344,6 +327,7 @@ class AssistantAllocator:
         """إلغاء تخصيص المساعد من المجموعة"""
         try:
             await db.update_chat_setting(chat_id, assistant_id=None)
+            assistant_scheduler.release(chat_id)
             return True
         except Exception as e:
             LOGGER(__name__).error(f"خطأ في إلغاء تخصيص المساعد: {e}")
@@ -402,21 +386,14 @@ music_manager = MusicManager()
 
 # مهمة تنظيف دورية
 async def cleanup_task():
-    """مهمة تنظيف دورية"""
-    while True:
-        try:
-            await asyncio.sleep(1800)  # كل 30 دقيقة
-            await music_manager.cleanup_sessions()
-            await tdlib_manager.cleanup_idle_assistants()
-        except Exception as e:
-            LOGGER(__name__).error(f"خطأ في مهمة التنظيف: {e}")
+    """تنظيف الجلسات المنتهية والحسابات الخاملة (دورة واحدة)"""
+    await music_manager.cleanup_sessions()
+    await tdlib_manager.cleanup_idle_assistants()
 
 # دالة لبدء مهمة التنظيف (سيتم استدعاؤها من __main__)
 def start_cleanup_task():
-    """بدء مهمة التنظيف"""
-    try:
-        asyncio.create_task(cleanup_task())
-        LOGGER(__name__).info("🧹 تم بدء مهمة التنظيف الدورية")
-    except RuntimeError:
-        # سيتم بدؤها لاحقاً من __main__
-        LOGGER(__name__).info("🧹 سيتم بدء مهمة التنظيف لاحقاً")
\ No newline at end of file
+    """تسجيل مهمة التنظيف لدى مشرف المهام (كل 30 دقيقة)"""
+    from ZeMusic.core.task_supervisor import task_supervisor
+
+    task_supervisor.add("music_cleanup", cleanup_task, 1800)
+    LOGGER(__name__).info("🧹 تم بدء مهمة التنظيف الدورية")
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+مشرف المهام الخلفية: كل عمل دوري يُسجَّل كمهمة مسماة بفاصل زمني مع إزاحة
+عشوائية، وتُجدول كلها من حلقة واحدة (كومة توقيتات مشتركة) بدلاً من حلقات
+نوم مستقلة، مع منع التداخل وقياس زمن كل تشغيل.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ZeMusic.logging import LOGGER
+from ZeMusic.core.metrics import metrics
+
+SUPERVISOR_MAX_SLEEP = 60       # أقصى نوم للحلقة حتى دون مهام مستحقة
+SUPERVISOR_DEFAULT_JITTER = 0.1  # نسبة الإزاحة العشوائية الافتراضية من الفاصل
+
+
+@dataclass
+class Job:
+    """مهمة دورية مسجلة لدى المشرف"""
+    name: str
+    func: Callable[[], Awaitable]
+    interval: float
+    jitter: float = SUPERVISOR_DEFAULT_JITTER
+    next_run: float = 0.0
+    running: bool = False
+    runs: int = 0
+    failures: int = 0
+    overlaps: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    last_time: float = 0.0
+    last_error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def schedule(self, now: float, delay: float = None):
+        delay = self.interval if delay is None else delay
+        spread = delay * self.jitter
+        self.next_run = now + max(0.0, delay + random.uniform(-spread, spread))
+
+
+class TaskSupervisor:
+    """جدولة المهام الدورية المسماة من حلقة واحدة"""
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    # ---- التسجيل ----
+
+    def add(self, name: str, func: Callable[[], Awaitable], interval: float, *,
+            jitter: float = SUPERVISOR_DEFAULT_JITTER, delay: float = None):
+        """
+        تسجيل مهمة (أو استبدال مهمة بنفس الاسم). أول تشغيل بعد delay
+        (افتراضياً بعد فاصل كامل)، ويمكن التسجيل قبل تشغيل الحلقة.
+        """
+        job = Job(name=name, func=func, interval=interval, jitter=jitter)
+        job.schedule(time.monotonic(), delay)
+        self.jobs[name] = job
+        self._push(job)
+
+    def remove(self, name: str):
+        """إلغاء تسجيل مهمة؛ التشغيل الجاري يكتمل دون إعادة جدولة"""
+        self.jobs.pop(name, None)
+
+    def _push(self, job: Job):
+        heapq.heappush(self._heap, (job.next_run, next(self._seq), job.name))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ---- الحلقة ----
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            LOGGER(__name__).info(f"⏰ بدء مشرف المهام ({len(self.jobs)} مهمة)")
+
+    async def stop(self):
+        """إيقاف الحلقة وإلغاء التشغيلات الجارية"""
+        if self._task:
+            self._task.cancel()
+        running = [job.task for job in self.jobs.values() if job.task and not job.task.done()]
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                due, _, name = heapq.heappop(self._heap)
+                job = self.jobs.get(name)
+                # مدخل قديم لمهمة أُعيد تسجيلها أو أُزيلت
+                if job is None or job.next_run != due:
+                    continue
+                self._dispatch(job, now)
+
+            timeout = SUPERVISOR_MAX_SLEEP
+            if self._heap:
+                timeout = min(timeout, max(0.0, self._heap[0][0] - time.monotonic()))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch(self, job: Job, now: float):
+        job.schedule(now)
+        self._push(job)
+        if job.running:
+            # التشغيل السابق لم ينتهِ: تخطي هذه الدورة بدل التكديس
+            job.overlaps += 1
+            return
+        job.running = True
+        job.task = asyncio.create_task(self._execute(job), name=f"job:{job.name}")
+
+    async def _execute(self, job: Job):
+        started = time.perf_counter()
+        try:
+            await job.func()
+            job.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            LOGGER(__name__).warning(f"خطأ في المهمة الدورية {job.name}: {e}")
+        finally:
+            elapsed = time.perf_counter() - started
+            job.running = False
+            job.runs += 1
+            job.total_time += elapsed
+            job.last_time = elapsed
+            job.max_time = max(job.max_time, elapsed)
+
+    # ---- الإحصائيات ----
+
+    def get_stats(self) -> Dict[str, Dict]:
+        now = time.monotonic()
+        return {
+            name: {
+                'interval': job.interval,
+                'runs': job.runs,
+                'failures': job.failures,
+                'overlaps': job.overlaps,
+                'running': job.running,
+                'avg_ms': round(job.total_time / job.runs * 1000, 1) if job.runs else 0.0,
+                'max_ms': round(job.max_time * 1000, 1),
+                'total_s': round(job.total_time, 2),
+                'next_in': round(max(0.0, job.next_run - now), 1),
+                'last_error': job.last_error,
+            }
+            for name, job in self.jobs.items()
+        }
+
+
+task_supervisor = TaskSupervisor()
+
+JOB_RUNS = metrics.counter("zemusic_job_runs_total", "Periodic job runs", ["job"])
+JOB_FAILURES = metrics.counter("zemusic_job_failures_total", "Periodic job failures", ["job"])
+JOB_OVERLAPS = metrics.counter("zemusic_job_overlaps_total", "Periodic job runs skipped due to overlap", ["job"])
+JOB_SECONDS = metrics.counter("zemusic_job_seconds_total", "Wall time spent in periodic jobs", ["job"])
+
+
+def _collect_jobs():
+    for name, job in task_supervisor.jobs.items():
+        JOB_RUNS.labels(name).set(job.runs)
+        JOB_FAILURES.labels(name).set(job.failures)
+        JOB_OVERLAPS.labels(name).set(job.overlaps)
+        JOB_SECONDS.labels(name).set(job.total_time)
+
+
+metrics.add_collector(_collect_jobs)
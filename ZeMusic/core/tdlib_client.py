@@ -5,6 +5,8 @@ import logging
 import asyncio
 import os
 
+from ZeMusic.core.assistant_scheduler import assistant_scheduler
+
 # Define TDLIB_IMPORTED first
 TDLIB_IMPORTED = False
 
@@ -36,15 +38,27 @@ class TDLibManager:
     """إدارة TDLib مع دعم الأوضاع المختلفة"""
     
     def __init__(self):
-        self.assistants_count = 0
-        self.connected_assistants = 0
         self.logger = logging.getLogger(__name__)
         
+        # فهرس المساعدين: يُحدَّث تدريجياً عند الإضافة/الاتصال/الانقطاع
+        # (الحمل والاختيار من مسؤولية assistant_scheduler)
+        self.assistants = []                 # بترتيب الإضافة (للعرض والتكرار)
+        self._by_id = {}                     # assistant_id -> assistant
+        self._connected = {}                 # assistant_id -> assistant (المتصلون فقط)
+        
         if TDLIB_IMPORTED:
             self.logger.info("🔥 TDLib Manager initialized with real TDLib support")
         else:
             self.logger.info("⚠️ TDLib Manager initialized in compatibility mode")
     
+    @property
+    def assistants_count(self) -> int:
+        return len(self._by_id)
+    
+    @property
+    def connected_assistants(self) -> int:
+        return len(self._connected)
+    
     def get_assistants_count(self) -> int:
         """الحصول على عدد الحسابات المساعدة"""
         return self.assistants_count
@@ -53,6 +67,93 @@ class TDLibManager:
         """الحصول على عدد الحسابات المتصلة"""
         return self.connected_assistants
     
+    # ---- فهرس المساعدين ----
+    
+    def register_assistant(self, assistant):
+        """إضافة مساعد للفهرس"""
+        assistant_id = int(assistant.assistant_id)
+        if assistant_id in self._by_id:
+            self.unregister_assistant(assistant_id)
+        self.assistants.append(assistant)
+        self._by_id[assistant_id] = assistant
+        self.set_connected(assistant_id, bool(getattr(assistant, 'is_connected', False)))
+    
+    def unregister_assistant(self, assistant_id: int):
+        """إزالة مساعد من الفهرس"""
+        assistant = self._by_id.pop(int(assistant_id), None)
+        if assistant is None:
+            return None
+        self.assistants.remove(assistant)
+        self._connected.pop(int(assistant_id), None)
+        assistant_scheduler.unregister(assistant_id)
+        return assistant
+    
+    async def add_assistant(self, assistant_id: int, session_string: str, name: str = None) -> bool:
+        """إضافة مساعد أثناء التشغيل ومحاولة الاتصال به؛ يُرجع حالة الاتصال"""
+        from ZeMusic.core.call import Mody
+        
+        assistant_id = int(assistant_id)
+        if not await Mody.add_assistant(assistant_id, session_string):
+            self.logger.warning(f"⚠️ المعرف {assistant_id} مستخدم لمساعد آخر - لم تُضف الجلسة")
+            return False
+        assistant = self._by_id.get(assistant_id)
+        if assistant is None:
+            return False
+        try:
+            await Mody.get_tgcalls(assistant_id)
+        except Exception as e:
+            self.logger.warning(f"⚠️ تعذر الاتصال بالمساعد {name or assistant_id}: {e}")
+        return bool(getattr(assistant, 'started', False))
+    
+    async def remove_assistant(self, assistant_id: int) -> bool:
+        """إزالة مساعد وقطع اتصاله"""
+        from ZeMusic.core.call import Mody
+        
+        return await Mody.remove_assistant(assistant_id)
+    
+    def set_connected(self, assistant_id: int, connected: bool):
+        """تحديث حالة اتصال مساعد في الفهرس"""
+        assistant_id = int(assistant_id)
+        assistant = self._by_id.get(assistant_id)
+        if assistant is None:
+            return
+        if connected:
+            self._connected[assistant_id] = assistant
+            assistant_scheduler.register(assistant_id)
+            assistant_scheduler.set_health(assistant_id, True)
+        else:
+            self._connected.pop(assistant_id, None)
+            assistant_scheduler.set_health(assistant_id, False)
+    
+    def is_assistant_connected(self, assistant_id) -> bool:
+        try:
+            return int(assistant_id) in self._connected
+        except (TypeError, ValueError):
+            return False
+    
+    def get_assistant(self, assistant_id):
+        """الحصول على المساعد بالمعرف"""
+        try:
+            return self._by_id.get(int(assistant_id))
+        except (TypeError, ValueError):
+            return None
+    
+    def get_connected_assistants(self) -> list:
+        """المساعدون المتصلون"""
+        return list(self._connected.values())
+    
+    def get_first_assistant(self):
+        """أول مساعد متصل (أو أول مساعد مسجل)"""
+        for assistant in self._connected.values():
+            return assistant
+        return self.assistants[0] if self.assistants else None
+    
+    def get_assistant_calls_count(self, assistant_id: int) -> int:
+        assistant = self.get_assistant(assistant_id)
+        if assistant is None or not hasattr(assistant, 'get_active_calls_count'):
+            return 0
+        return assistant.get_active_calls_count()
+    
     async def start_client(self) -> bool:
         """تشغيل العميل"""
         try:
@@ -1,6 +1,7 @@
 from ZeMusic.compatibility import CompatibilityClient as Client
 
 import config
+from ZeMusic.core.assistant_scheduler import assistant_scheduler, legacy_assistant_id
 
 from ..logging import LOGGER
 
@@ -55,7 +56,8 @@ class Userbot(Client):
                 await self.one.join_chat("jnssghb")
             except:
                 pass
-            assistants.append(1)
+            assistants.append(legacy_assistant_id(1))
+            assistant_scheduler.register(legacy_assistant_id(1))
             try:
                 await self.one.send_message(config.LOGGER_ID, "『 تم تشغيل البوت على سورس الملك 』")
             except:
@@ -76,7 +78,8 @@ class Userbot(Client):
                 await self.two.join_chat("jnssghb")
             except:
                 pass
-            assistants.append(2)
+            assistants.append(legacy_assistant_id(2))
+            assistant_scheduler.register(legacy_assistant_id(2))
             try:
                 await self.two.send_message(config.LOGGER_ID, "『 تم تشغيل البوت على سورس الملك 』")
             except:
@@ -97,7 +100,8 @@ class Userbot(Client):
                 await self.three.join_chat("jnssghb")
             except:
                 pass
-            assistants.append(3)
+            assistants.append(legacy_assistant_id(3))
+            assistant_scheduler.register(legacy_assistant_id(3))
             try:
                 await self.three.send_message(config.LOGGER_ID, "『 تم تشغيل البوت على سورس الملك 』")
             except:
@@ -118,7 +122,8 @@ class Userbot(Client):
                 await self.four.join_chat("jnssghb")
             except:
                 pass
-            assistants.append(4)
+            assistants.append(legacy_assistant_id(4))
+            assistant_scheduler.register(legacy_assistant_id(4))
             try:
                 await self.four.send_message(config.LOGGER_ID, "『 تم تشغيل البوت على سورس الملك 』")
             except:
@@ -139,7 +144,8 @@ class Userbot(Client):
                 await self.five.join_chat("jnssghb")
             except:
                 pass
-            assistants.append(5)
+            assistants.append(legacy_assistant_id(5))
+            assistant_scheduler.register(legacy_assistant_id(5))
             try:
                 await self.five.send_message(config.LOGGER_ID, "『 تم تشغيل البوت على سورس الملك 』")
             except:
@@ -14,6 +14,9 @@ SUDOERS = filters.user()
 HAPP = None
 _boot_ = time.time()
 
+# طوابير التشغيل في الذاكرة: chat_id -> ChatQueue
+db = {}
+
 
 def is_heroku():
     return "heroku" in socket.getfqdn()
@@ -42,8 +45,8 @@ def dbb():
     تهيئة قاعدة بيانات محلية (في الذاكرة) للمسارات المؤقتة.
     تم استبدالها بنظام SQLite الجديد.
     """
-    global db
-    db = {}
+    # التفريغ في المكان حتى تبقى المراجع المستوردة من الوحدات الأخرى صالحة
+    db.clear()
     LOGGER(__name__).info("Local Database Initialized.")
 
 
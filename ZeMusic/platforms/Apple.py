@@ -15,6 +15,8 @@ except ImportError:
     BeautifulSoup = None
 from youtubesearchpython.__future__ import VideosSearch
 
+from ZeMusic.core.http_client import http_client
+
 
 class AppleAPI:
     def __init__(self):
@@ -34,11 +36,10 @@ class AppleAPI:
         if not AIOHTTP_AVAILABLE or not BS4_AVAILABLE:
             return False  # لا يمكن معالجة Apple Music بدون aiohttp أو bs4
             
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
+        async with http_client.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
         soup = BeautifulSoup(html, "html.parser")
         search = None
         for tag in soup.find_all("meta"):
@@ -66,11 +67,10 @@ class AppleAPI:
         if playid:
             url = self.base + url
         playlist_id = url.split("playlist/")[1]
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
+        async with http_client.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
         soup = BeautifulSoup(html, "html.parser")
         applelinks = soup.find_all("meta", attrs={"property": "music:song"})
         results = []
@@ -15,6 +15,8 @@ except ImportError:
     BeautifulSoup = None
 from youtubesearchpython.__future__ import VideosSearch
 
+from ZeMusic.core.http_client import http_client
+
 
 class RessoAPI:
     def __init__(self):
@@ -34,11 +36,10 @@ class RessoAPI:
         if not AIOHTTP_AVAILABLE or not BS4_AVAILABLE:
             return False  # لا يمكن معالجة Resso بدون aiohttp أو bs4
             
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
+        async with http_client.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
         soup = BeautifulSoup(html, "html.parser")
         for tag in soup.find_all("meta"):
             if tag.get("property", None) == "og:title":
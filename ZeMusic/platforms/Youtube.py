@@ -33,6 +33,9 @@ from yt_dlp import YoutubeDL
 
 import config
 from ZeMusic import app
+from ZeMusic.core.http_client import http_client
+from ZeMusic.core.metrics import DOWNLOAD_BUCKETS, metrics
+from ZeMusic.core.task_supervisor import task_supervisor
 from ZeMusic.utils.database import is_on_off
 from ZeMusic.utils.formatters import time_to_seconds, seconds_to_min
 from ZeMusic.utils.decorators import asyncify
@@ -75,6 +78,19 @@ performance_stats = {
     'last_reset': time.time()
 }
 
+# المقاييس المصدّرة على /metrics (لا تُصفّر مع reset_performance_stats)
+YT_DOWNLOADS = metrics.counter(
+    "zemusic_youtube_downloads_total", "YouTube downloads by result", ["result"])
+YT_DOWNLOAD_SECONDS = metrics.histogram(
+    "zemusic_youtube_download_seconds", "YouTube download duration including queueing",
+    buckets=DOWNLOAD_BUCKETS)
+YT_DOWNLOADS_ACTIVE = metrics.gauge(
+    "zemusic_youtube_downloads_in_progress", "YouTube downloads holding the download semaphore")
+YT_CACHE_HITS = metrics.counter(
+    "zemusic_youtube_cache_hits_total", "YouTube metadata served from the local cache")
+YT_API_CALLS = metrics.counter(
+    "zemusic_youtube_api_calls_total", "YouTube metadata fetched from the network")
+
 @dataclass
 class VideoInfo:
     """كلاس لمعلومات الفيديو"""
@@ -150,6 +166,7 @@ async def get_from_cache(cache_key: str) -> Optional[Dict]:
         with open(cache_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
             performance_stats['cache_hits'] += 1
+            YT_CACHE_HITS.inc()
             logger.debug(f"📦 تم استخدام الكاش: {cache_key}")
             return data
             
@@ -309,15 +326,14 @@ class YouTubeAPI:
                 return False
             
             # فحص صلاحية الرابط
-            try:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    async with session.head(self.status + link, timeout=5) as response:
-                        return response.status == 200
-            except ImportError:
+            if not http_client.is_available:
                 # aiohttp غير متوفر، نفترض أن الرابط صالح
                 logger.debug("aiohttp غير متوفر، تخطي فحص صلاحية الرابط")
                 return True
+            try:
+                import aiohttp
+                async with http_client.head(self.status + link, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    return response.status == 200
             except:
                 # إذا فشل الفحص، نفترض أنه صالح
                 return True
@@ -417,6 +433,7 @@ class YouTubeAPI:
                     await save_to_cache(cache_key, cache_data)
                     
                     performance_stats['api_calls'] += 1
+                    YT_API_CALLS.inc()
                     return title, duration_min, duration_sec, thumbnail, vidid
             
             return None, None, None, None, None
@@ -726,18 +743,22 @@ class YouTubeAPI:
         performance_stats['total_downloads'] += 1
         
         async with DOWNLOAD_SEMAPHORE:
+            YT_DOWNLOADS_ACTIVE.inc()
             try:
                 result = await self._download_internal(
                     link, mystic, video, videoid, songaudio, songvideo, format_id, title
                 )
                 
                 download_time = time.time() - download_start_time
+                YT_DOWNLOAD_SECONDS.observe(download_time)
                 
                 if result.success:
                     performance_stats['successful_downloads'] += 1
+                    YT_DOWNLOADS.labels(result="success").inc()
                     logger.info(f"✅ تم التحميل بنجاح في {download_time:.2f}ث: {result.file_path}")
                 else:
                     performance_stats['failed_downloads'] += 1
+                    YT_DOWNLOADS.labels(result="failed").inc()
                     logger.error(f"❌ فشل التحميل: {result.error_message}")
                 
                 result.download_time = download_time
@@ -745,6 +766,7 @@ class YouTubeAPI:
                 
             except Exception as e:
                 performance_stats['failed_downloads'] += 1
+                YT_DOWNLOADS.labels(result="error").inc()
                 logger.error(f"❌ خطأ في التحميل: {str(e)}")
                 return DownloadResult(
                     success=False,
@@ -752,6 +774,8 @@ class YouTubeAPI:
                     error_message=str(e),
                     download_time=time.time() - download_start_time
                 )
+            finally:
+                YT_DOWNLOADS_ACTIVE.dec()
 
     async def _download_internal(self, link: str, mystic, video: bool, videoid: Union[bool, str],
                                 songaudio: bool, songvideo: bool, format_id: str, title: str) -> DownloadResult:
@@ -1003,21 +1027,12 @@ YoutubeAPI = YouTubeAPI  # للتوافق
 
 # إعداد مهمة تنظيف دورية
 async def periodic_cleanup():
-    """مهمة تنظيف دورية"""
-    while True:
-        try:
-            await asyncio.sleep(3600)  # كل ساعة
-            await youtube.cleanup_cache(24)  # حذف الكاش أقدم من 24 ساعة
-            await youtube.cleanup_downloads(2)  # حذف التحميلات أقدم من ساعتين
-        except Exception as e:
-            logger.error(f"❌ خطأ في التنظيف الدوري: {str(e)}")
-
-# بدء مهمة التنظيف
-try:
-    asyncio.create_task(periodic_cleanup())
-    logger.info("🚀 تم تشغيل نظام YouTube المحسن مع التنظيف التلقائي")
-except Exception as e:
-    logger.error(f"❌ خطأ في بدء النظام: {str(e)}")
+    """دورة تنظيف واحدة (تُجدول كل ساعة عبر مشرف المهام)"""
+    await youtube.cleanup_cache(24)  # حذف الكاش أقدم من 24 ساعة
+    await youtube.cleanup_downloads(2)  # حذف التحميلات أقدم من ساعتين
+
+# تسجيل مهمة التنظيف
+task_supervisor.add("youtube_cleanup", periodic_cleanup, 3600)
 
 # رسالة ترحيب
 logger.info("🎵 YouTube Platform Handler - Enhanced Edition تم تحميله بنجاح!")
@@ -1,7 +1,7 @@
 import random
 import time
-import requests
 from ZeMusic import app
+from ZeMusic.core.http_client import http_client
 
 from ZeMusic.pyrogram_compatibility.enums import ChatAction, ParseMode
 from ZeMusic.pyrogram_compatibility import filters
@@ -18,12 +18,13 @@ async def chat_gpt(bot, message):
             )
         else:
             a = message.text.split(' ', 1)[1]
-            response = requests.get(f'https://chatgpt.apinepdev.workers.dev/?question={a}')
+            async with http_client.get('https://chatgpt.apinepdev.workers.dev/', params={'question': a}) as response:
+                result = await response.json(content_type=None)
 
             try:
                 # Check if "results" key is present in the JSON response
-                if "answer" in response.json():
-                    x = response.json()["answer"]
+                if "answer" in result:
+                    x = result["answer"]
                     end_time = time.time()
                     telegram_ping = str(round((end_time - start_time) * 1000, 3)) + " ms"
                     await message.reply_text(
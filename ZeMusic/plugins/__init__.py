@@ -1,5 +1,9 @@
 import glob
+import importlib
+import sys
+import time
 from os.path import dirname, isfile
+from typing import Dict, List, Tuple
 
 
 def __list_all_modules():
@@ -16,4 +20,74 @@ def __list_all_modules():
 
 
 ALL_MODULES = sorted(__list_all_modules())
-__all__ = ALL_MODULES + ["ALL_MODULES"]
+__all__ = ALL_MODULES + ["ALL_MODULES", "plugin_registry"]
+
+
+class PluginRegistry:
+    """
+    تحميل وحدات الإضافات عند أول استخدام بدلاً من استيرادها كلها عند الإقلاع،
+    مع تسجيل زمن استيراد كل وحدة لتقرير الإقلاع.
+    """
+
+    def __init__(self):
+        self.import_times: Dict[str, float] = {}
+
+    @staticmethod
+    def _qualified(module: str) -> str:
+        return f"{__name__}.{module.lstrip('.')}"
+
+    def is_loaded(self, module: str) -> bool:
+        return self._qualified(module) in sys.modules
+
+    def load(self, module: str):
+        """استيراد الوحدة (مثل "bot.basic_commands") مرة واحدة وقياس زمنها"""
+        name = self._qualified(module)
+        loaded = sys.modules.get(name)
+        if loaded is not None:
+            return loaded
+        started = time.perf_counter()
+        loaded = importlib.import_module(name)
+        self.import_times[module.lstrip('.')] = time.perf_counter() - started
+        return loaded
+
+    def get(self, module: str, attr: str):
+        """كائن من وحدة إضافة، مع تحميل الوحدة عند الحاجة"""
+        return getattr(self.load(module), attr)
+
+    def lazy(self, module: str, attr: str) -> "LazyPlugin":
+        """وكيل يُحمّل الوحدة عند أول وصول لأي خاصية من الكائن"""
+        return LazyPlugin(self, module, attr)
+
+    def slowest(self, top: int = 10) -> List[Tuple[str, float]]:
+        return sorted(self.import_times.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+    def report(self, top: int = 10) -> str:
+        """تقرير نصي بأبطأ الوحدات المحمّلة (الزمن يشمل تبعياتها غير المحمّلة سابقاً)"""
+        lines = [
+            f"📦 الإضافات المحمّلة: {len(self.import_times)}/{len(ALL_MODULES)} "
+            f"({sum(self.import_times.values()) * 1000:.0f}ms)"
+        ]
+        for module, seconds in self.slowest(top):
+            lines.append(f"  • {module}: {seconds * 1000:.1f}ms")
+        return "\n".join(lines)
+
+
+class LazyPlugin:
+    """وكيل لكائن داخل وحدة إضافة لم تُحمّل بعد"""
+
+    __slots__ = ("_registry", "_module", "_attr")
+
+    def __init__(self, registry: PluginRegistry, module: str, attr: str):
+        self._registry = registry
+        self._module = module
+        self._attr = attr
+
+    @property
+    def loaded(self) -> bool:
+        return self._registry.is_loaded(self._module)
+
+    def __getattr__(self, name):
+        return getattr(self._registry.get(self._module, self._attr), name)
+
+
+plugin_registry = PluginRegistry()
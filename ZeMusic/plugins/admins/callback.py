@@ -11,7 +11,6 @@ from ZeMusic import YouTube, app
 from ZeMusic.core.call import Mody
 from ZeMusic.misc import SUDOERS, db
 from ZeMusic.utils.database import (
-    get_active_chats,
     get_lang,
     get_upvote_count,
     is_active_chat,
@@ -22,9 +21,11 @@ from ZeMusic.utils.database import (
     set_loop,
 )
 from ZeMusic.utils.decorators.language import languageCB
-from ZeMusic.utils.formatters import seconds_to_min
-from ZeMusic.utils.inline import close_markup, stream_markup, stream_markup_timer
-from ZeMusic.utils.stream.autoclear import auto_clean
+from ZeMusic.utils.inline import close_markup, stream_markup
+from ZeMusic.utils.stream.queue import queue_service
+from ZeMusic.utils.media_cache import media_cache
+from ZeMusic.utils.stream import clock
+from ZeMusic.utils.stream.progress import progress_updater
 from ZeMusic.utils.thumbnails import get_thumb
 from config import (
     BANNED_USERS,
@@ -36,7 +37,6 @@ from config import (
     confirmer,
     votemode,
 )
-from strings import get_string
 
 checker = {}
 upvoters = {}
@@ -164,11 +164,8 @@ async def del_back_playlist(client, CallbackQuery, _):
         check = db.get(chat_id)
         if command == "Skip":
             txt = f"⟡ تم التخطي \n\n⟡ بواسطة : {mention} "
-            popped = None
             try:
-                popped = check.pop(0)
-                if popped:
-                    await auto_clean(popped)
+                await queue_service.dequeue(chat_id)
                 if not check:
                     await CallbackQuery.edit_message_text(
                         f"⟡ تم التخطي \n\n⟡ بواسطة : {mention} "
@@ -207,7 +204,7 @@ async def del_back_playlist(client, CallbackQuery, _):
         streamtype = check[0]["streamtype"]
         videoid = check[0]["vidid"]
         status = True if str(streamtype) == "video" else None
-        db[chat_id][0]["played"] = 0
+        clock.start(db[chat_id][0])
         exis = (check[0]).get("old_dur")
         if exis:
             db[chat_id][0]["dur"] = exis
@@ -230,8 +227,9 @@ async def del_back_playlist(client, CallbackQuery, _):
             except:
                 return await CallbackQuery.message.reply_text(_["call_6"])
             button = stream_markup(_, chat_id)
-            img = await get_thumb(videoid)
-            run = await CallbackQuery.message.reply_photo(
+            img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
+            run = await media_cache.reply_photo(
+                CallbackQuery.message,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
@@ -266,8 +264,9 @@ async def del_back_playlist(client, CallbackQuery, _):
             except:
                 return await mystic.edit_text(_["call_6"])
             button = stream_markup(_, chat_id)
-            img = await get_thumb(videoid)
-            run = await CallbackQuery.message.reply_photo(
+            img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
+            run = await media_cache.reply_photo(
+                CallbackQuery.message,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
@@ -287,7 +286,8 @@ async def del_back_playlist(client, CallbackQuery, _):
             except:
                 return await CallbackQuery.message.reply_text(_["call_6"])
             button = stream_markup(_, chat_id)
-            run = await CallbackQuery.message.reply_photo(
+            run = await media_cache.reply_photo(
+                CallbackQuery.message,
                 photo=STREAM_IMG_URL,
                 caption=_["stream_2"].format(user),
                 reply_markup=InlineKeyboardMarkup(button),
@@ -311,7 +311,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 return await CallbackQuery.message.reply_text(_["call_6"])
             if videoid == "telegram":
                 button = stream_markup(_, chat_id)
-                run = await CallbackQuery.message.reply_photo(
+                run = await media_cache.reply_photo(
+                    CallbackQuery.message,
                     photo=TELEGRAM_AUDIO_URL
                     if str(streamtype) == "audio"
                     else TELEGRAM_VIDEO_URL,
@@ -324,7 +325,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 db[chat_id][0]["markup"] = "tg"
             elif videoid == "soundcloud":
                 button = stream_markup(_, chat_id)
-                run = await CallbackQuery.message.reply_photo(
+                run = await media_cache.reply_photo(
+                    CallbackQuery.message,
                     photo=SOUNCLOUD_IMG_URL
                     if str(streamtype) == "audio"
                     else TELEGRAM_VIDEO_URL,
@@ -337,8 +339,9 @@ async def del_back_playlist(client, CallbackQuery, _):
                 db[chat_id][0]["markup"] = "tg"
             else:
                 button = stream_markup(_, chat_id)
-                img = await get_thumb(videoid)
-                run = await CallbackQuery.message.reply_photo(
+                img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
+                run = await media_cache.reply_photo(
+                    CallbackQuery.message,
                     photo=img,
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
@@ -353,48 +356,5 @@ async def del_back_playlist(client, CallbackQuery, _):
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
 
 
-async def markup_timer():
-    while not await asyncio.sleep(7):
-        active_chats = await get_active_chats()
-        for chat_id in active_chats:
-            try:
-                if not await is_music_playing(chat_id):
-                    continue
-                playing = db.get(chat_id)
-                if not playing:
-                    continue
-                duration_seconds = int(playing[0]["seconds"])
-                if duration_seconds == 0:
-                    continue
-                try:
-                    mystic = playing[0]["mystic"]
-                except:
-                    continue
-                try:
-                    check = checker[chat_id][mystic.id]
-                    if check is False:
-                        continue
-                except:
-                    pass
-                try:
-                    language = await get_lang(chat_id)
-                    _ = get_string(language)
-                except:
-                    _ = get_string("en")
-                try:
-                    buttons = stream_markup_timer(
-                        _,
-                        chat_id,
-                        seconds_to_min(playing[0]["played"]),
-                        playing[0]["dur"],
-                    )
-                    await mystic.edit_reply_markup(
-                        reply_markup=InlineKeyboardMarkup(buttons)
-                    )
-                except:
-                    continue
-            except:
-                continue
-
-
-asyncio.create_task(markup_timer())
+# تحديث أشرطة التقدم يتم عبر مُجدول موحد يحترم حدود تيليجرام
+progress_updater.start()
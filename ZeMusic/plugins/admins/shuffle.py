@@ -1,5 +1,3 @@
-import random
-
 from ZeMusic.pyrogram_compatibility import filters
 from ZeMusic.pyrogram_compatibility.types import Message
 
@@ -7,6 +5,7 @@ from ZeMusic import app
 from ZeMusic.misc import db
 from ZeMusic.utils.decorators import AdminRightsCheck
 from ZeMusic.utils.inline import close_markup
+from ZeMusic.utils.stream.queue import queue_service
 from config import BANNED_USERS
 
 
@@ -18,16 +17,8 @@ async def admins(Client, message: Message, _, chat_id):
     check = db.get(chat_id)
     if not check:
         return await message.reply_text(_["queue_2"])
-    try:
-        popped = check.pop(0)
-    except:
-        return await message.reply_text(_["admin_15"], reply_markup=close_markup(_))
-    check = db.get(chat_id)
-    if not check:
-        check.insert(0, popped)
+    if not await queue_service.shuffle(chat_id):
         return await message.reply_text(_["admin_15"], reply_markup=close_markup(_))
-    random.shuffle(check)
-    check.insert(0, popped)
     await message.reply_text(
         _["admin_16"].format(message.from_user.mention), reply_markup=close_markup(_)
     )
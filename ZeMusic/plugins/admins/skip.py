@@ -12,7 +12,9 @@ from ZeMusic.misc import db
 from ZeMusic.utils.database import get_loop
 from ZeMusic.utils.decorators import AdminRightsCheck
 from ZeMusic.utils.inline import close_markup, stream_markup
-from ZeMusic.utils.stream.autoclear import auto_clean
+from ZeMusic.utils.stream.queue import queue_service
+from ZeMusic.utils.media_cache import media_cache
+from ZeMusic.utils.stream import clock
 from ZeMusic.utils.thumbnails import get_thumb
 from config import BANNED_USERS
 from strings import get_string
@@ -40,13 +42,10 @@ async def skip(cli, message: Message, _, chat_id):
                     count = int(count - 1)
                     if 1 <= state <= count:
                         for x in range(state):
-                            popped = None
                             try:
-                                popped = check.pop(0)
+                                await queue_service.dequeue(chat_id)
                             except:
                                 return await message.reply_text(_["admin_12"])
-                            if popped:
-                                await auto_clean(popped)
                             if not check:
                                 try:
                                     await message.reply_text(
@@ -70,11 +69,8 @@ async def skip(cli, message: Message, _, chat_id):
             return await message.reply_text(_["admin_9"])
     else:
         check = db.get(chat_id)
-        popped = None
         try:
-            popped = check.pop(0)
-            if popped:
-                await auto_clean(popped)
+            await queue_service.dequeue(chat_id)
             if not check:
                 await message.reply_text(
                     text=_["admin_6"].format(
@@ -103,7 +99,7 @@ async def skip(cli, message: Message, _, chat_id):
     streamtype = check[0]["streamtype"]
     videoid = check[0]["vidid"]
     status = True if str(streamtype) == "video" else None
-    db[chat_id][0]["played"] = 0
+    clock.start(db[chat_id][0])
     exis = (check[0]).get("old_dur")
     if exis:
         db[chat_id][0]["dur"] = exis
@@ -123,8 +119,9 @@ async def skip(cli, message: Message, _, chat_id):
         except:
             return await message.reply_text(_["call_6"])
         button = stream_markup(_, chat_id)
-        img = await get_thumb(videoid)
-        run = await message.reply_photo(
+        img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
+        run = await media_cache.reply_photo(
+            message,
             photo=img,
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
@@ -156,8 +153,9 @@ async def skip(cli, message: Message, _, chat_id):
         except:
             return await mystic.edit_text(_["call_6"])
         button = stream_markup(_, chat_id)
-        img = await get_thumb(videoid)
-        run = await message.reply_photo(
+        img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
+        run = await media_cache.reply_photo(
+            message,
             photo=img,
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
@@ -176,7 +174,8 @@ async def skip(cli, message: Message, _, chat_id):
         except:
             return await message.reply_text(_["call_6"])
         button = stream_markup(_, chat_id)
-        run = await message.reply_photo(
+        run = await media_cache.reply_photo(
+            message,
             photo=config.STREAM_IMG_URL,
             caption=_["stream_2"].format(user),
             reply_markup=InlineKeyboardMarkup(button),
@@ -199,7 +198,8 @@ async def skip(cli, message: Message, _, chat_id):
             return await message.reply_text(_["call_6"])
         if videoid == "telegram":
             button = stream_markup(_, chat_id)
-            run = await message.reply_photo(
+            run = await media_cache.reply_photo(
+                message,
                 photo=config.TELEGRAM_AUDIO_URL
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
@@ -212,7 +212,8 @@ async def skip(cli, message: Message, _, chat_id):
             db[chat_id][0]["markup"] = "tg"
         elif videoid == "soundcloud":
             button = stream_markup(_, chat_id)
-            run = await message.reply_photo(
+            run = await media_cache.reply_photo(
+                message,
                 photo=config.SOUNCLOUD_IMG_URL
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
@@ -225,8 +226,9 @@ async def skip(cli, message: Message, _, chat_id):
             db[chat_id][0]["markup"] = "tg"
         else:
             button = stream_markup(_, chat_id)
-            img = await get_thumb(videoid)
-            run = await message.reply_photo(
+            img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
+            run = await media_cache.reply_photo(
+                message,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
@@ -279,13 +281,10 @@ async def skip(cli, message: Message):
                     count = int(count - 1)
                     if 1 <= state <= count:
                         for x in range(state):
-                            popped = None
                             try:
-                                popped = check.pop(0)
+                                await queue_service.dequeue(chat_id)
                             except:
                                 return await message.reply_text(_["admin_12"])
-                            if popped:
-                                await auto_clean(popped)
                             if not check:
                                 try:
                                     await message.reply_text(
@@ -309,11 +308,8 @@ async def skip(cli, message: Message):
             return await message.reply_text(_["admin_9"])
     else:
         check = db.get(chat_id)
-        popped = None
         try:
-            popped = check.pop(0)
-            if popped:
-                await auto_clean(popped)
+            await queue_service.dequeue(chat_id)
             if not check:
                 await message.reply_text(
                     text=_["admin_6"].format(
@@ -342,7 +338,7 @@ async def skip(cli, message: Message):
     streamtype = check[0]["streamtype"]
     videoid = check[0]["vidid"]
     status = True if str(streamtype) == "video" else None
-    db[chat_id][0]["played"] = 0
+    clock.start(db[chat_id][0])
     exis = (check[0]).get("old_dur")
     if exis:
         db[chat_id][0]["dur"] = exis
@@ -362,8 +358,9 @@ async def skip(cli, message: Message):
         except:
             return await message.reply_text(_["call_6"])
         button = stream_markup(_, chat_id)
-        img = await get_thumb(videoid)
-        run = await message.reply_photo(
+        img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
+        run = await media_cache.reply_photo(
+            message,
             photo=img,
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
@@ -395,8 +392,9 @@ async def skip(cli, message: Message):
         except:
             return await mystic.edit_text(_["call_6"])
         button = stream_markup(_, chat_id)
-        img = await get_thumb(videoid)
-        run = await message.reply_photo(
+        img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
+        run = await media_cache.reply_photo(
+            message,
             photo=img,
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
@@ -415,7 +413,8 @@ async def skip(cli, message: Message):
         except:
             return await message.reply_text(_["call_6"])
         button = stream_markup(_, chat_id)
-        run = await message.reply_photo(
+        run = await media_cache.reply_photo(
+            message,
             photo=config.STREAM_IMG_URL,
             caption=_["stream_2"].format(user),
             reply_markup=InlineKeyboardMarkup(button),
@@ -438,7 +437,8 @@ async def skip(cli, message: Message):
             return await message.reply_text(_["call_6"])
         if videoid == "telegram":
             button = stream_markup(_, chat_id)
-            run = await message.reply_photo(
+            run = await media_cache.reply_photo(
+                message,
                 photo=config.TELEGRAM_AUDIO_URL
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
@@ -451,7 +451,8 @@ async def skip(cli, message: Message):
             db[chat_id][0]["markup"] = "tg"
         elif videoid == "soundcloud":
             button = stream_markup(_, chat_id)
-            run = await message.reply_photo(
+            run = await media_cache.reply_photo(
+                message,
                 photo=config.SOUNCLOUD_IMG_URL
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
@@ -464,8 +465,9 @@ async def skip(cli, message: Message):
             db[chat_id][0]["markup"] = "tg"
         else:
             button = stream_markup(_, chat_id)
-            img = await get_thumb(videoid)
-            run = await message.reply_photo(
+            img = await get_thumb(videoid, title=title, duration=check[0]["dur"])
+            run = await media_cache.reply_photo(
+                message,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
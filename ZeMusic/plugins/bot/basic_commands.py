@@ -276,6 +276,34 @@ class BasicCommandHandler:
             LOGGER(__name__).error(f"خطأ في أمر current: {e}")
             await update.message.reply_text("❌ حدث خطأ")
     
+    @staticmethod
+    async def progress_command(update, context):
+        """معالج أمر /progress - تفعيل أو تعطيل شريط التقدم في المحادثة"""
+        try:
+            from ZeMusic.utils.database import is_progress_enabled
+            from ZeMusic.utils.stream.progress import progress_updater
+
+            chat_id = update.effective_chat.id
+            parts = update.message.text.split(None, 1)
+            state = parts[1].strip().lower() if len(parts) > 1 else ""
+
+            if state in ("on", "enable", "تفعيل"):
+                await progress_updater.enable(chat_id)
+                await update.message.reply_text("✅ **تم تفعيل شريط التقدم**")
+            elif state in ("off", "disable", "تعطيل"):
+                await progress_updater.disable(chat_id)
+                await update.message.reply_text("⏹️ **تم تعطيل شريط التقدم**")
+            else:
+                enabled = await is_progress_enabled(chat_id)
+                await update.message.reply_text(
+                    f"📊 شريط التقدم: {'مفعل ✅' if enabled else 'معطل ⏹️'}\n"
+                    f"الاستخدام: `/progress on` أو `/progress off`"
+                )
+
+        except Exception as e:
+            LOGGER(__name__).error(f"خطأ في أمر progress: {e}")
+            await update.message.reply_text("❌ حدث خطأ")
+    
     @staticmethod
     async def queue_command(update, context):
         """معالج أمر /queue"""
@@ -1,4 +1,3 @@
-import asyncio
 from datetime import datetime
 
 from ZeMusic.pyrogram_compatibility.enums import ChatType
@@ -6,39 +5,40 @@ from ZeMusic.pyrogram_compatibility.enums import ChatType
 import config
 from ZeMusic import app
 from ZeMusic.core.call import Mody, autoend
+from ZeMusic.core.task_supervisor import task_supervisor
 from ZeMusic.utils.database import get_client, is_active_chat, is_autoend
 
 
 async def auto_leave():
-    if config.AUTO_LEAVING_ASSISTANT == str(True):
-        while not await asyncio.sleep(1500):
-            from ZeMusic.core.userbot import assistants
+    """مغادرة المساعدين للمحادثات غير النشطة (20 محادثة كحد أقصى لكل مساعد في الدورة)"""
+    from ZeMusic.core.userbot import assistants
 
-            for num in assistants:
-                client = await get_client(num)
-                left = 0
-                try:
-                    async for i in client.get_dialogs():
-                        if i.chat.type in [
-                            ChatType.SUPERGROUP,
-                            ChatType.GROUP,
-                            ChatType.CHANNEL,
-                        ]:
-                            if (
-                                i.chat.id != config.LOGGER_ID
-                                and i.chat.id != -1001426097254
-                                and i.chat.id != -1001583360745
-                            ):
-                                if left == 20:
-                                    continue
-                                if not await is_active_chat(i.chat.id):
-                                    try:
-                                        await client.leave_chat(i.chat.id)
-                                        left += 1
-                                    except:
-                                        continue
-                except:
-                    pass
+    for num in assistants:
+        client = await get_client(num)
+        left = 0
+        try:
+            async for i in client.get_dialogs():
+                if i.chat.type in [
+                    ChatType.SUPERGROUP,
+                    ChatType.GROUP,
+                    ChatType.CHANNEL,
+                ]:
+                    if (
+                        i.chat.id != config.LOGGER_ID
+                        and i.chat.id != -1001426097254
+                        and i.chat.id != -1001583360745
+                    ):
+                        if left == 20:
+                            continue
+                        if not await is_active_chat(i.chat.id):
+                            try:
+                                await client.leave_chat(i.chat.id)
+                                left += 1
+                            except:
+                                continue
+        except:
+            pass
 
 
-asyncio.create_task(auto_leave())
+if config.AUTO_LEAVING_ASSISTANT == str(True):
+    task_supervisor.add("assistant_autoleave", auto_leave, 1500)
@@ -5,6 +5,8 @@ from ZeMusic.pyrogram_compatibility.enums import ChatMembersFilter
 from ZeMusic.pyrogram_compatibility.errors import FloodWait
 
 from ZeMusic import app
+from ZeMusic.core.broadcast_engine import run_broadcast
+from ZeMusic.core.task_supervisor import task_supervisor
 from ZeMusic.misc import SUDOERS
 from ZeMusic.utils.database import (
     get_active_chats,
@@ -28,10 +30,10 @@ async def send_broadcast(
     pin_silent: bool = False,
     pin_loud: bool = False,
     forward: bool = True,
-    delay: float = 0.2,
 ):
     """
-    دالة مساعدة لإرسال/إعادة توجيه الرسائل إلى قائمة من القنوات/المجموعات/الأشخاص.
+    دالة مساعدة لإرسال/إعادة توجيه الرسائل إلى قائمة من القنوات/المجموعات/الأشخاص
+    عبر محرك الإذاعة (إرسال متوازٍ بمعدل محكوم ومعالجة FloodWait لكل هدف).
 
     المعاملات:
     - target_ids (list): قائمة بمعرفات الدردشات أو المستخدمين المراد الإرسال لهم.
@@ -41,53 +43,37 @@ async def send_broadcast(
     - pin_silent (bool): إذا كان True، يتم تثبيت الرسالة بصمت (دون إشعار الأعضاء).
     - pin_loud (bool): إذا كان True، يتم تثبيت الرسالة مع إشعار الأعضاء.
     - forward (bool): إذا كان True، يتم إعادة توجيه الرسالة بدلاً من إرسال نص جديد.
-    - delay (float): مدة الانتظار (بالثواني) بين كل إرسال لتفادي FloodWait.
 
     تعيد الدالة Tuple مكونة من قيمتين:
     1) عدد الرسائل المرسلة/المعاد توجيهها بنجاح.
     2) عدد الرسائل المثبتة بنجاح.
     """
-    sent_count = 0
     pinned_count = 0
 
-    for target_id in target_ids:
-        try:
-            # إذا كنا نرغب في إعادة توجيه رسالة مقتبسة
-            if reply_chat_id and reply_message_id and forward:
-                msg = await app.forward_messages(
-                    chat_id=target_id,
-                    from_chat_id=reply_chat_id,
-                    message_ids=reply_message_id,
-                )
-            else:
-                # إرسال نص فقط في حال عدم تفعيل إعادة التوجيه
-                msg = await app.send_message(chat_id=target_id, text=query)
-
-            sent_count += 1
-
-            # عملية تثبيت الرسالة إن طُلب ذلك
-            if pin_silent or pin_loud:
-                try:
-                    await msg.pin(disable_notification=pin_silent)
-                    pinned_count += 1
-                except Exception:
-                    pass
-
-            # تأخير بسيط لتجنّب الـFloodWait الكبير
-            await asyncio.sleep(delay)
-
-        except FloodWait as fw:
-            # إذا كان الانتظار كبيرًا جدًا، نتجاهل هذه الجهة ونكمل مع البقية
-            if fw.value > 200:
-                continue
-            # ننتظر الوقت المطلوب ثم نكمل
-            await asyncio.sleep(fw.value)
-
-        except Exception:
-            # تجاوز أي خطأ آخر والاستمرار
-            continue
-
-    return sent_count, pinned_count
+    async def send(target_id):
+        nonlocal pinned_count
+        # إذا كنا نرغب في إعادة توجيه رسالة مقتبسة
+        if reply_chat_id and reply_message_id and forward:
+            msg = await app.forward_messages(
+                chat_id=target_id,
+                from_chat_id=reply_chat_id,
+                message_ids=reply_message_id,
+            )
+        else:
+            # إرسال نص فقط في حال عدم تفعيل إعادة التوجيه
+            msg = await app.send_message(chat_id=target_id, text=query)
+
+        # عملية تثبيت الرسالة إن طُلب ذلك
+        if pin_silent or pin_loud:
+            try:
+                await msg.pin(disable_notification=pin_silent)
+                pinned_count += 1
+            except Exception:
+                pass
+        return True
+
+    stats = await run_broadcast(target_ids, send)
+    return stats.sent, pinned_count
 
 
 @app.on_message(filters.command(["اذاعة", "بث"]) & SUDOERS)
@@ -276,34 +262,33 @@ async def broadcast_message(client, message, _):
 
 async def auto_clean():
     """
-    دالة تعمل تلقائياً كل 10 ثوانٍ،
+    دالة تعمل تلقائياً كل 10 ثوانٍ (عبر مشرف المهام)،
     تقوم بتحديث قائمة المشرفين في الدردشات التي يديرها البوت
     وفقاً لصلاحيات إدارة الدردشة الصوتية أو عبر قاعدة البيانات (authuser).
     """
-    while not await asyncio.sleep(10):
-        try:
-            active_chats = await get_active_chats()
-            for chat_id in active_chats:
-                if chat_id not in adminlist:
-                    adminlist[chat_id] = []
-
-                    # جلب جميع الإداريين/المديرين
-                    async for user in app.get_chat_members(
-                        chat_id,
-                        filter=ChatMembersFilter.ADMINISTRATORS
-                    ):
-                        if user.privileges.can_manage_video_chats:
-                            adminlist[chat_id].append(user.user.id)
-
-                    # جلب المستخدمين المخوّلين من قاعدة البيانات
-                    authusers = await get_authuser_names(chat_id)
-                    for authuser in authusers:
-                        user_id = await alpha_to_int(authuser)
-                        adminlist[chat_id].append(user_id)
-
-        except:
-            continue
-
-
-# إطلاق مهمة تحديث قائمة المشرفين في الخلفية
-asyncio.create_task(auto_clean())
+    try:
+        active_chats = await get_active_chats()
+        for chat_id in active_chats:
+            if chat_id not in adminlist:
+                adminlist[chat_id] = []
+
+                # جلب جميع الإداريين/المديرين
+                async for user in app.get_chat_members(
+                    chat_id,
+                    filter=ChatMembersFilter.ADMINISTRATORS
+                ):
+                    if user.privileges.can_manage_video_chats:
+                        adminlist[chat_id].append(user.user.id)
+
+                # جلب المستخدمين المخوّلين من قاعدة البيانات
+                authusers = await get_authuser_names(chat_id)
+                for authuser in authusers:
+                    user_id = await alpha_to_int(authuser)
+                    adminlist[chat_id].append(user_id)
+
+    except:
+        pass
+
+
+# تسجيل مهمة تحديث قائمة المشرفين في الخلفية
+task_supervisor.add("adminlist_refresh", auto_clean, 10)
@@ -24,7 +24,8 @@ class AssistantsHandler:
         """بدء مهمة المغادرة التلقائية"""
         if not self._auto_leave_task_started:
             self._auto_leave_task_started = True
-            asyncio.create_task(self._auto_leave_task())
+            from ZeMusic.core.task_supervisor import task_supervisor
+            task_supervisor.add("assistant_idle_leave", self._auto_leave_task, 60)
     
     def load_auto_leave_settings(self):
         """تحميل إعدادات المغادرة التلقائية"""
@@ -305,11 +306,16 @@ class AssistantsHandler:
                 session['assistant_name']
             )
             
-            # محاولة الاتصال بالحساب
-            connection_result = await tdlib_manager.add_assistant(
-                session['session_string'],
-                session['assistant_name']
-            )
+            # إضافته لمجموعة المكالمات فوراً دون إعادة تشغيل ومحاولة الاتصال به
+            try:
+                connection_result = await tdlib_manager.add_assistant(
+                    assistant_id,
+                    session['session_string'],
+                    session['assistant_name']
+                )
+            except Exception as e:
+                LOGGER(__name__).warning(f"تعذر إضافة المساعد لمجموعة المكالمات: {e}")
+                connection_result = False
             
             # إنهاء الجلسة
             del self.pending_sessions[user_id]
@@ -446,8 +452,11 @@ class AssistantsHandler:
             # حذف الحساب من قاعدة البيانات
             await db.remove_assistant(assistant_id)
             
-            # إيقاف الحساب في tdlib_manager
-            await tdlib_manager.remove_assistant(assistant_id)
+            # إيقافه وإزالته من مجموعة المكالمات ونقل محادثاته لغيره
+            try:
+                await tdlib_manager.remove_assistant(assistant_id)
+            except Exception as e:
+                LOGGER(__name__).warning(f"تعذر إزالة المساعد من مجموعة المكالمات: {e}")
             
             # إنهاء الجلسة
             if user_id in self.pending_sessions:
@@ -794,18 +803,9 @@ class AssistantsHandler:
             return False
     
     async def _auto_leave_task(self):
-        """مهمة المغادرة التلقائية"""
-        while True:
-            try:
-                if self.auto_leave_enabled:
-                    await self._check_and_leave_inactive_chats()
-                
-                # فحص كل دقيقة
-                await asyncio.sleep(60)
-                
-            except Exception as e:
-                LOGGER(__name__).error(f"خطأ في مهمة المغادرة التلقائية: {e}")
-                await asyncio.sleep(60)
+        """مهمة المغادرة التلقائية (تُجدول كل دقيقة)"""
+        if self.auto_leave_enabled:
+            await self._check_and_leave_inactive_chats()
     
     async def _check_and_leave_inactive_chats(self):
         """فحص ومغادرة المحادثات غير النشطة"""
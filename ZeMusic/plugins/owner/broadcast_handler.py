@@ -1,6 +1,7 @@
 import asyncio
 import time
 import sqlite3
+from collections import deque
 from typing import Dict, List, Optional, Union, Any
 from dataclasses import dataclass
 from datetime import datetime
@@ -9,6 +10,15 @@ import config
 from ZeMusic.logging import LOGGER
 from ZeMusic.core.tdlib_client import tdlib_manager
 from ZeMusic.core.database import db
+from ZeMusic.core.broadcast_engine import (
+    BROADCAST_RATE,
+    BroadcastStats,
+    flood_wait_seconds,
+    run_broadcast,
+)
+
+BROADCAST_PAGE_SIZE = 500           # حجم صفحة الأهداف المقروءة من قاعدة البيانات
+BROADCAST_CHECKPOINT_INTERVAL = 2   # الفاصل بين نقاط حفظ التقدم بالثواني
 
 @dataclass
 class BroadcastSession:
@@ -25,6 +35,8 @@ class BroadcastSession:
     sent_count: int = 0
     failed_count: int = 0
     total_targets: int = 0
+    stats: Optional[BroadcastStats] = None
+    last_target_id: Optional[int] = None  # كل الأهداف حتى هذا المعرف اكتملت
 
 class BroadcastHandler:
     """معالج الإذاعة الشامل والاحترافي"""
@@ -338,6 +350,19 @@ class BroadcastHandler:
                 total_targets=target_count
             )
             
+            # تسجيل المهمة في قاعدة البيانات لتُستأنف بعد إعادة التشغيل
+            await db.create_broadcast_job(
+                broadcast_session.session_id,
+                user_id,
+                broadcast_session.target_type,
+                {
+                    'pin_message': broadcast_session.pin_message,
+                    'forward_mode': broadcast_session.forward_mode,
+                    'message_content': broadcast_session.message_content,
+                },
+                target_count,
+            )
+            
             # نقل الجلسة للنشطة
             self.active_broadcasts[user_id] = broadcast_session
             del self.pending_sessions[user_id]
@@ -446,8 +471,11 @@ class BroadcastHandler:
         progress_percent = (broadcast_session.sent_count / broadcast_session.total_targets * 100) if broadcast_session.total_targets > 0 else 0
         success_rate = (broadcast_session.sent_count / (broadcast_session.sent_count + broadcast_session.failed_count) * 100) if (broadcast_session.sent_count + broadcast_session.failed_count) > 0 else 100
         
-        # تقدير الوقت المتبقي
-        if broadcast_session.sent_count > 0:
+        # تقدير الوقت المتبقي من معدل الإرسال الفعلي
+        stats = broadcast_session.stats
+        if stats:
+            estimated_remaining = stats.eta()
+        elif broadcast_session.sent_count > 0:
             avg_time_per_message = elapsed_time / (broadcast_session.sent_count + broadcast_session.failed_count)
             remaining_messages = broadcast_session.total_targets - (broadcast_session.sent_count + broadcast_session.failed_count)
             estimated_remaining = avg_time_per_message * remaining_messages
@@ -483,7 +511,9 @@ class BroadcastHandler:
             f"⚡ **الأداء:**\n"
             f"📊 معدل النجاح: `{success_rate:.1f}%`\n"
             f"⏱️ الوقت المنقضي: `{self._format_duration(elapsed_time)}`\n"
-            f"⏳ الوقت المتوقع المتبقي: `{self._format_duration(estimated_remaining)}`\n\n"
+            f"⏳ الوقت المتوقع المتبقي: `{self._format_duration(estimated_remaining)}`\n"
+            f"🚀 السرعة: `{stats.rate if stats else 0:.1f}` رسالة/ث\n"
+            f"🧊 انتظار FloodWait: `{stats.flood_waits if stats else 0}`\n\n"
             
             f"🔄 **الحالة:** `{'نشطة' if broadcast_session.is_active else 'متوقفة'}`"
         )
@@ -503,55 +533,128 @@ class BroadcastHandler:
         return await self.show_broadcast_menu(user_id)
     
     async def _execute_broadcast(self, broadcast_session: BroadcastSession):
-        """تنفيذ الإذاعة الفعلية"""
+        """تنفيذ الإذاعة الفعلية مع حفظ نقاط التقدم في قاعدة البيانات"""
         try:
             broadcast_session.is_active = True
+            job_id = broadcast_session.session_id
             
-            # الحصول على قائمة الأهداف
-            targets = await self._get_broadcast_targets(broadcast_session.target_type)
-            
-            LOGGER(__name__).info(f"بدء إذاعة إلى {len(targets)} هدف من نوع {broadcast_session.target_type}")
+            LOGGER(__name__).info(
+                f"بدء إذاعة إلى {broadcast_session.total_targets} هدف من نوع {broadcast_session.target_type}"
+                + (f" (استئناف بعد {broadcast_session.last_target_id})" if broadcast_session.last_target_id is not None else "")
+            )
             
-            # إرسال الرسائل بشكل تدريجي
-            for target_id in targets:
-                if broadcast_session.is_cancelled:
-                    break
-                
+            # الأهداف بترتيب الإرسال والمكتمل منها - لتحديد آخر هدف اكتمل كل ما قبله
+            issued = deque()
+            completed = set()
+            last_checkpoint = time.monotonic()
+            checkpoint_task = None  # نقطة حفظ واحدة جارية على الأكثر
+            
+            async def targets():
+                async for target_id in self._iter_broadcast_targets(
+                    broadcast_session.target_type, broadcast_session.last_target_id
+                ):
+                    issued.append(target_id)
+                    yield target_id
+            
+            async def checkpoint(status: str = 'running'):
+                await db.checkpoint_broadcast_job(
+                    job_id,
+                    broadcast_session.last_target_id,
+                    broadcast_session.sent_count,
+                    broadcast_session.failed_count,
+                    status,
+                )
+            
+            async def periodic_checkpoint():
                 try:
-                    # إرسال الرسالة
-                    success = await self._send_broadcast_message(
-                        target_id,
-                        broadcast_session.message_content,
-                        broadcast_session.forward_mode,
-                        broadcast_session.pin_message
-                    )
-                    
-                    if success:
-                        broadcast_session.sent_count += 1
-                    else:
-                        broadcast_session.failed_count += 1
-                    
-                    # تأخير لتجنب القيود
-                    await asyncio.sleep(0.5)  # نصف ثانية بين كل رسالة
-                    
+                    await checkpoint()
                 except Exception as e:
-                    LOGGER(__name__).error(f"خطأ في إرسال رسالة إلى {target_id}: {e}")
+                    LOGGER(__name__).warning(f"تعذر حفظ نقطة تقدم الإذاعة: {e}")
+            
+            def on_result(target_id: int, ok: bool):
+                nonlocal last_checkpoint, checkpoint_task
+                if ok:
+                    broadcast_session.sent_count += 1
+                else:
                     broadcast_session.failed_count += 1
+                completed.add(target_id)
+                while issued and issued[0] in completed:
+                    completed.discard(issued[0])
+                    broadcast_session.last_target_id = issued.popleft()
+                now = time.monotonic()
+                if now - last_checkpoint >= BROADCAST_CHECKPOINT_INTERVAL and (
+                    checkpoint_task is None or checkpoint_task.done()
+                ):
+                    last_checkpoint = now
+                    checkpoint_task = asyncio.create_task(periodic_checkpoint())
+            
+            # إرسال متوازٍ بمعدل محكوم مع معالجة FloodWait لكل هدف
+            broadcast_session.stats = BroadcastStats(
+                total=max(broadcast_session.total_targets - broadcast_session.sent_count - broadcast_session.failed_count, 0)
+            )
+            await run_broadcast(
+                targets(),
+                lambda target_id: self._send_broadcast_message(
+                    target_id,
+                    broadcast_session.message_content,
+                    broadcast_session.forward_mode,
+                    broadcast_session.pin_message
+                ),
+                stats=broadcast_session.stats,
+                is_cancelled=lambda: broadcast_session.is_cancelled,
+                on_result=on_result,
+            )
             
-            # إنهاء الإذاعة
+            # إنهاء الإذاعة: انتظار نقطة الحفظ الجارية حتى لا تعيد الحالة إلى running
             broadcast_session.is_active = False
+            if checkpoint_task is not None:
+                await checkpoint_task
+            await checkpoint('cancelled' if broadcast_session.is_cancelled else 'done')
             
             # إرسال تقرير نهائي
             await self._send_broadcast_completion_report(broadcast_session)
             
             # إزالة الجلسة
-            if broadcast_session.user_id in self.active_broadcasts:
+            if self.active_broadcasts.get(broadcast_session.user_id) is broadcast_session:
                 del self.active_broadcasts[broadcast_session.user_id]
             
         except Exception as e:
             LOGGER(__name__).error(f"خطأ في تنفيذ الإذاعة: {e}")
             broadcast_session.is_active = False
     
+    async def resume_broadcasts(self):
+        """
+        استئناف مهام الإذاعة التي قطعتها إعادة التشغيل من آخر نقطة محفوظة.
+        التسليم مرة واحدة على الأقل: الأهداف التي اكتملت بعد آخر last_target_id
+        متصل (أو بعد آخر نقطة حفظ) تُرسل مجدداً.
+        """
+        try:
+            jobs = await db.get_unfinished_broadcast_jobs()
+        except Exception as e:
+            LOGGER(__name__).warning(f"تعذر تحميل مهام الإذاعة: {e}")
+            return
+        
+        for job in jobs:
+            payload = job['payload']
+            broadcast_session = BroadcastSession(
+                user_id=job['user_id'],
+                session_id=job['job_id'],
+                target_type=job['target_type'],
+                pin_message=payload.get('pin_message', False),
+                forward_mode=payload.get('forward_mode', False),
+                message_content=payload.get('message_content', {}),
+                start_time=time.time(),
+                sent_count=job['sent_count'] or 0,
+                failed_count=job['failed_count'] or 0,
+                total_targets=job['total_targets'] or 0,
+                last_target_id=job['last_target_id'],
+            )
+            self.active_broadcasts[broadcast_session.user_id] = broadcast_session
+            asyncio.create_task(self._execute_broadcast(broadcast_session))
+        
+        if jobs:
+            LOGGER(__name__).info(f"📢 استئناف {len(jobs)} إذاعة غير مكتملة")
+    
     async def _send_broadcast_message(self, target_id: int, message_content: Dict, 
                                     forward_mode: bool, pin_message: bool) -> bool:
         """إرسال رسالة الإذاعة لهدف محدد"""
@@ -590,6 +693,9 @@ class BroadcastHandler:
             return bool(result)
             
         except Exception as e:
+            if flood_wait_seconds(e) is not None:
+                # يُعالَج في محرك الإذاعة بإيقاف هذا المسار فقط
+                raise
             LOGGER(__name__).debug(f"فشل إرسال رسالة إلى {target_id}: {e}")
             return False
     
@@ -681,27 +787,19 @@ class BroadcastHandler:
         counts = await self._get_broadcast_targets_count()
         return counts.get(target_type, 0)
     
-    async def _get_broadcast_targets(self, target_type: str) -> List[int]:
-        """الحصول على قائمة أهداف الإذاعة"""
-        try:
-            with sqlite3.connect(config.DATABASE_PATH) as conn:
-                cursor = conn.cursor()
-                
-                if target_type == 'users':
-                    cursor.execute("SELECT user_id FROM users WHERE is_banned = 0")
-                elif target_type == 'groups':
-                    cursor.execute("SELECT chat_id FROM chats WHERE chat_type IN ('group', 'supergroup') AND is_blacklisted = 0")
-                elif target_type == 'channels':
-                    cursor.execute("SELECT chat_id FROM chats WHERE chat_type = 'channel' AND is_blacklisted = 0")
-                else:
-                    return []
-                
-                results = cursor.fetchall()
-                return [row[0] for row in results]
-                
-        except Exception as e:
-            LOGGER(__name__).error(f"خطأ في الحصول على أهداف الإذاعة: {e}")
-            return []
+    async def _iter_broadcast_targets(self, target_type: str, after_id: Optional[int] = None):
+        """أهداف الإذاعة على دفعات بترقيم المفتاح - الذاكرة ثابتة مهما كان العدد"""
+        while True:
+            try:
+                page = await db.get_broadcast_targets_page(target_type, after_id, BROADCAST_PAGE_SIZE)
+            except Exception as e:
+                LOGGER(__name__).error(f"خطأ في الحصول على أهداف الإذاعة: {e}")
+                return
+            if not page:
+                return
+            for target_id in page:
+                yield target_id
+            after_id = page[-1]
     
     def _get_target_type_name(self, target_type: str) -> str:
         """الحصول على اسم نوع الهدف"""
@@ -714,8 +812,7 @@ class BroadcastHandler:
     
     def _calculate_estimated_time(self, target_count: int) -> str:
         """حساب الوقت المتوقع للإذاعة"""
-        # متوسط نصف ثانية لكل رسالة
-        estimated_seconds = target_count * 0.5
+        estimated_seconds = target_count / BROADCAST_RATE
         return self._format_duration(estimated_seconds)
     
     def _format_duration(self, seconds: float) -> str:
@@ -1,7 +1,9 @@
 import asyncio
 import sqlite3
 import re
-from typing import Dict, Optional, Union
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 import config
@@ -9,6 +11,71 @@ from ZeMusic.logging import LOGGER
 from ZeMusic.core.tdlib_client import tdlib_manager
 from ZeMusic.core.database import db
 
+FS_CACHE_MAX_ENTRIES = 10000  # أقصى عدد مستخدمين في كاش العضوية
+FS_MEMBER_TTL = 600           # مدة صلاحية نتيجة "مشترك"
+FS_NON_MEMBER_TTL = 30        # نتيجة "غير مشترك" تنتهي سريعاً ليُقبل المشترك الجديد فوراً
+
+_MEMBER_STATUSES = frozenset((
+    'chatMemberStatusMember',
+    'chatMemberStatusAdministrator',
+    'chatMemberStatusCreator',
+    'chatMemberStatusRestricted',  # عضو محدود لكن لا يزال عضو
+))
+
+
+class MembershipCache:
+    """كاش عضوية محدود الحجم (LRU) بمدة صلاحية منفصلة للنتائج الإيجابية والسلبية"""
+
+    def __init__(self, max_entries: int = FS_CACHE_MAX_ENTRIES,
+                 member_ttl: float = FS_MEMBER_TTL, non_member_ttl: float = FS_NON_MEMBER_TTL):
+        self.max_entries = max_entries
+        self.member_ttl = member_ttl
+        self.non_member_ttl = non_member_ttl
+        self._entries: "OrderedDict[int, Tuple[bool, float]]" = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0, 'invalidated': 0}
+
+    def get(self, user_id: int) -> Optional[bool]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        is_member, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[user_id]
+            self.stats['misses'] += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.stats['hits'] += 1
+        return is_member
+
+    def set(self, user_id: int, is_member: bool):
+        ttl = self.member_ttl if is_member else self.non_member_ttl
+        self._entries[user_id] = (is_member, time.monotonic() + ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evicted'] += 1
+
+    def invalidate(self, user_id: int):
+        if self._entries.pop(user_id, None) is not None:
+            self.stats['invalidated'] += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        now = time.monotonic()
+        valid = members = 0
+        for is_member, expires_at in self._entries.values():
+            if expires_at > now:
+                valid += 1
+                members += is_member
+        return {**self.stats, 'total': len(self._entries), 'valid': valid, 'members': members}
+
+
 class ForceSubscribeHandler:
     """معالج الاشتراك الإجباري المتطور"""
     
@@ -18,8 +85,8 @@ class ForceSubscribeHandler:
         self.channel_username = None
         self.channel_link = None
         self.bot_is_admin = False
-        self.cache_duration = 300  # 5 دقائق كاش للعضوية
-        self.membership_cache = {}
+        self.membership_cache = MembershipCache()
+        self._inflight: Dict[int, asyncio.Future] = {}  # فحص واحد جارٍ لكل مستخدم
         self.load_settings()
     
     def load_settings(self):
@@ -380,13 +447,37 @@ class ForceSubscribeHandler:
         if not self.is_enabled or not self.channel_id:
             return True
         
-        # التحقق من الكاش أولاً
-        cache_key = f"user_{user_id}"
-        if cache_key in self.membership_cache:
-            cached_data = self.membership_cache[cache_key]
-            if asyncio.get_event_loop().time() - cached_data['timestamp'] < self.cache_duration:
-                return cached_data['is_member']
-        
+        while True:
+            # التحقق من الكاش أولاً
+            cached = self.membership_cache.get(user_id)
+            if cached is not None:
+                return cached
+            
+            # مشاركة الفحص الجاري بدلاً من تكرار الطلب لنفس المستخدم
+            pending = self._inflight.get(user_id)
+            if pending is None:
+                break
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # أُلغي صاحب الفحص لا هذا المنتظر: إعادة المحاولة بفحص جديد
+                if not pending.cancelled():
+                    raise
+        
+        future = asyncio.get_event_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            is_member = await self._fetch_membership(user_id)
+            future.set_result(is_member)
+            return is_member
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(user_id, None)
+    
+    async def _fetch_membership(self, user_id: int) -> bool:
+        """طلب العضوية من تيليجرام وتخزين النتيجة في الكاش"""
         try:
             bot_client = tdlib_manager.bot_client
             if not bot_client or not bot_client.is_connected:
@@ -401,12 +492,7 @@ class ForceSubscribeHandler:
                 
                 # التحقق من حالة العضوية
                 status = member_info.get('status', {}).get('@type', '')
-                is_member = status in [
-                    'chatMemberStatusMember',
-                    'chatMemberStatusAdministrator',
-                    'chatMemberStatusCreator',
-                    'chatMemberStatusRestricted'  # عضو محدود لكن لا يزال عضو
-                ]
+                is_member = status in _MEMBER_STATUSES
                 
                 # فحص طلبات الانضمام إذا لم يكن عضو
                 if not is_member:
@@ -417,10 +503,7 @@ class ForceSubscribeHandler:
                 is_member = False
             
             # حفظ في الكاش
-            self.membership_cache[cache_key] = {
-                'is_member': is_member,
-                'timestamp': asyncio.get_event_loop().time()
-            }
+            self.membership_cache.set(user_id, is_member)
             
             return is_member
             
@@ -428,6 +511,30 @@ class ForceSubscribeHandler:
             LOGGER(__name__).error(f"خطأ في فحص اشتراك المستخدم {user_id}: {e}")
             return True  # السماح في حالة الخطأ
     
+    def on_chat_member_update(self, update: Dict):
+        """
+        تحديث الكاش من تحديثات القناة (updateChatMember / updateNewChatJoinRequest)
+        بحيث ينعكس الاشتراك أو المغادرة فوراً دون انتظار انتهاء الصلاحية.
+        """
+        if not self.channel_id:
+            return
+        try:
+            if int(update.get('chat_id', 0)) != int(self.channel_id):
+                return
+            if update.get('@type') == 'updateNewChatJoinRequest':
+                user_id = update.get('request', {}).get('user_id')
+                if user_id:
+                    self.membership_cache.set(int(user_id), True)
+                return
+            new_member = update.get('new_chat_member', {})
+            member_id = new_member.get('member_id', {})
+            if member_id.get('@type') != 'messageSenderUser':
+                return
+            status = new_member.get('status', {}).get('@type', '')
+            self.membership_cache.set(int(member_id['user_id']), status in _MEMBER_STATUSES)
+        except Exception as e:
+            LOGGER(__name__).debug(f"خطأ في معالجة تحديث عضوية القناة: {e}")
+    
     async def get_subscription_message(self, user_name: str = "العزيز") -> Dict:
         """الحصول على رسالة طلب الاشتراك"""
         if not self.channel_username or not self.channel_link:
@@ -469,9 +576,7 @@ class ForceSubscribeHandler:
     async def handle_subscription_check(self, user_id: int, user_name: str = "المستخدم") -> Dict:
         """معالجة فحص الاشتراك"""
         # مسح الكاش للمستخدم لفحص جديد
-        cache_key = f"user_{user_id}"
-        if cache_key in self.membership_cache:
-            del self.membership_cache[cache_key]
+        self.membership_cache.invalidate(user_id)
         
         is_subscribed = await self.check_user_subscription(user_id)
         
@@ -615,18 +720,7 @@ class ForceSubscribeHandler:
         
         try:
             # إحصائيات الكاش
-            cache_stats = {
-                'total_cached': len(self.membership_cache),
-                'cache_hits': 0,
-                'active_members': 0
-            }
-            
-            current_time = asyncio.get_event_loop().time()
-            for cache_data in self.membership_cache.values():
-                if current_time - cache_data['timestamp'] < self.cache_duration:
-                    cache_stats['cache_hits'] += 1
-                    if cache_data['is_member']:
-                        cache_stats['active_members'] += 1
+            cache_stats = self.membership_cache.get_stats()
             
             # معلومات القناة إن وجدت
             channel_stats = "غير متاح"
@@ -657,10 +751,11 @@ class ForceSubscribeHandler:
                 f"🤖 البوت مدير: `{'نعم' if self.bot_is_admin else 'لا'}`\n\n"
                 
                 f"💾 **إحصائيات الكاش:**\n"
-                f"📦 إجمالي المحفوظ: `{cache_stats['total_cached']}`\n"
-                f"✅ صالح للاستخدام: `{cache_stats['cache_hits']}`\n"
-                f"👤 أعضاء نشطين: `{cache_stats['active_members']}`\n"
-                f"⏱️ مدة الكاش: `{self.cache_duration // 60} دقائق`\n\n"
+                f"📦 إجمالي المحفوظ: `{cache_stats['total']}/{self.membership_cache.max_entries}`\n"
+                f"✅ صالح للاستخدام: `{cache_stats['valid']}`\n"
+                f"👤 أعضاء نشطين: `{cache_stats['members']}`\n"
+                f"🎯 إصابات/إخفاقات: `{cache_stats['hits']}/{cache_stats['misses']}`\n"
+                f"⏱️ مدة الكاش: `{FS_MEMBER_TTL // 60} دقائق` (غير المشترك: `{FS_NON_MEMBER_TTL} ث`)\n\n"
                 
                 f"🔧 **حالة النظام:**\n"
                 f"{'🟢 مُفعل ويعمل' if self.is_enabled else '🔴 مُعطل'}\n"
@@ -224,8 +224,8 @@ class OwnerPanel:
         try:
             # إضافة الحساب للنظام
             success = await tdlib_manager.add_assistant(
-                session['session_string'],
                 session['assistant_id'],
+                session['session_string'],
                 session['name']
             )
             
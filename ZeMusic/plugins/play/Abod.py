@@ -3,7 +3,6 @@ import asyncio
 import re
 import os
 import time
-import requests
 from config import START_IMG_URL, BOT_NAME
 from ZeMusic.pyrogram_compatibility import filters
 import random
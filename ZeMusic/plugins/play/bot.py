@@ -2,7 +2,6 @@ import asyncio
 from ZeMusic import app
 from config import OWNER_ID
 import os
-import requests
 import ZeMusic.pyrogram_compatibility as pyrogram
 from ZeMusic.pyrogram_compatibility import Client, filters, emoji
 from ZeMusic.pyrogram_compatibility.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup
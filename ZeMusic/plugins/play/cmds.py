@@ -1,6 +1,5 @@
 import asyncio
 import os
-import requests
 import ZeMusic.pyrogram_compatibility as pyrogram
 from ZeMusic.pyrogram_compatibility import Client, filters, emoji
 from strings.filters import command
@@ -32,14 +32,35 @@ from ZeMusic.pyrogram_compatibility.errors import FloodWait, RPCError, MessageId
 
 import config
 from ZeMusic import app, LOGGER
+from ZeMusic.core.http_client import http_client
+from ZeMusic.core.metrics import DOWNLOAD_BUCKETS, metrics
 from ZeMusic.platforms.Youtube import cookies
 from ZeMusic.plugins.play.filters import command
 from ZeMusic.utils.database import is_search_enabled, is_search_enabled1
+from ZeMusic.utils.media_cache import audio_cache_key, media_cache
 
 # --- إعدادات النظام الذكي ---
 REQUEST_TIMEOUT = 10
 DOWNLOAD_TIMEOUT = 120
-MAX_SESSIONS = 50  # عدد جلسات HTTP متوازية
+
+# المهلة القصوى لكل محرك بحث عند السباق (بالثواني)
+SEARCH_BACKEND_TIMEOUTS = {
+    'youtube_api': 4.0,
+    'invidious': 6.0,
+    'youtube_search': 8.0,
+}
+SEARCH_RACE_TIMEOUT = max(SEARCH_BACKEND_TIMEOUTS.values())
+
+# المقاييس المصدّرة على /metrics
+HYPER_REQUESTS = metrics.counter(
+    "zemusic_downloader_requests_total", "Hyper-speed downloader requests by outcome", ["outcome"])
+HYPER_SECONDS = metrics.histogram(
+    "zemusic_downloader_seconds", "Hyper-speed downloader latency by outcome", ["outcome"],
+    buckets=DOWNLOAD_BUCKETS)
+SEARCH_BACKEND = metrics.counter(
+    "zemusic_search_backend_total", "Search race results per backend", ["backend", "result"])
+SEARCH_BACKEND_SECONDS = metrics.histogram(
+    "zemusic_search_backend_seconds", "Search backend latency for successful lookups", ["backend"])
 
 # قناة التخزين الذكي (يوزر أو ID)
 SMART_CACHE_CHANNEL = config.CACHE_CHANNEL_ID
@@ -159,8 +180,7 @@ class HyperSpeedDownloader:
     """مدير التحميل فائق السرعة"""
     
     def __init__(self):
-        self.session_pool = []
-        self.executor_pool = None
+        self._executor_pool = None
         self.method_performance = {
             'cache': {'weight': 1000, 'active': True, 'avg_time': 0.001},
             'youtube_api': {'weight': 100, 'active': True, 'avg_time': 2.0},
@@ -169,38 +189,16 @@ class HyperSpeedDownloader:
             'ytdlp_no_cookies': {'weight': 60, 'active': True, 'avg_time': 8.0},
             'youtube_search': {'weight': 50, 'active': True, 'avg_time': 4.0}
         }
-        
-        # تهيئة النظام
-        asyncio.create_task(self.initialize())
     
-    async def initialize(self):
-        """تهيئة مجموعة الاتصالات الخارقة"""
-        try:
-            connector = aiohttp.TCPConnector(
-                limit=1000,
-                limit_per_host=200,
-                ttl_dns_cache=300,
-                use_dns_cache=True,
-                keepalive_timeout=30,
-                enable_cleanup_closed=True
-            )
-            
-            # إنشاء جلسات HTTP متعددة
-            for i in range(MAX_SESSIONS):
-                session = aiohttp.ClientSession(
-                    connector=connector,
-                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
-                    headers={'User-Agent': f'ZeMusic-{i}'}
-                )
-                self.session_pool.append(session)
-            
-            # مجموعة معالجات Thread عملاقة
-            self.executor_pool = concurrent.futures.ThreadPoolExecutor(max_workers=100)
-            
+    @property
+    def executor_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        """مجموعة المعالجات تُنشأ عند أول بحث/تحميل لا عند استيراد الوحدة"""
+        if self._executor_pool is None:
+            self._executor_pool = concurrent.futures.ThreadPoolExecutor(max_workers=100)
+            from ZeMusic.core.instrumentation import loop_monitor
+            loop_monitor.watch_executor("downloader", self._executor_pool)
             LOGGER(__name__).info("🚀 تم تهيئة نظام التحميل الخارق")
-            
-        except Exception as e:
-            LOGGER(__name__).error(f"خطأ في تهيئة النظام: {e}")
+        return self._executor_pool
     
     def normalize_text(self, text: str) -> str:
         """تطبيع النص للبحث"""
@@ -292,10 +290,8 @@ class HyperSpeedDownloader:
         return None
     
     async def get_session(self):
-        """الحصول على أقل جلسة مشغولة"""
-        if not self.session_pool:
-            await self.initialize()
-        return self.session_pool[0]  # تبسيط للآن
+        """الحصول على جلسة HTTP المشتركة"""
+        return await http_client.get_session()
     
     async def youtube_api_search(self, query: str) -> Optional[Dict]:
         """البحث عبر YouTube Data API"""
@@ -315,7 +311,11 @@ class HyperSpeedDownloader:
                     "key": key
                 }
                 
-                async with session.get("https://www.googleapis.com/youtube/v3/search", params=params) as resp:
+                async with session.get(
+                    "https://www.googleapis.com/youtube/v3/search",
+                    params=params,
+                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+                ) as resp:
                     if resp.status != 200:
                         continue
                     
@@ -355,7 +355,7 @@ class HyperSpeedDownloader:
                 url = f"{server}/api/v1/search"
                 params = {"q": query, "type": "video"}
                 
-                async with session.get(url, params=params) as resp:
+                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)) as resp:
                     if resp.status != 200:
                         continue
                     
@@ -385,7 +385,12 @@ class HyperSpeedDownloader:
     async def youtube_search_simple(self, query: str) -> Optional[Dict]:
         """البحث عبر youtube_search"""
         try:
-            results = YoutubeSearch(query, max_results=1).to_dict()
+            # YoutubeSearch متزامن، لذا يُنفذ في خيط منفصل حتى لا يوقف حلقة الأحداث
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(
+                self.executor_pool,
+                lambda: YoutubeSearch(query, max_results=1).to_dict()
+            )
             if not results:
                 return None
             
@@ -430,6 +435,7 @@ class HyperSpeedDownloader:
                         if os.path.exists(audio_path):
                             return {
                                 "audio_path": audio_path,
+                                "video_id": video_id,
                                 "title": info.get("title", video_info.get("title", ""))[:60],
                                 "artist": info.get("uploader", video_info.get("artist", "Unknown")),
                                 "duration": int(info.get("duration", 0)),
@@ -455,6 +461,7 @@ class HyperSpeedDownloader:
                 if os.path.exists(audio_path):
                     return {
                         "audio_path": audio_path,
+                        "video_id": video_id,
                         "title": info.get("title", video_info.get("title", ""))[:60],
                         "artist": info.get("uploader", video_info.get("artist", "Unknown")),
                         "duration": int(info.get("duration", 0)),
@@ -487,9 +494,9 @@ class HyperSpeedDownloader:
 🔍 {search_query}"""
             
             # رفع الملف للقناة
-            message = await app.send_audio(
-                chat_id=SMART_CACHE_CHANNEL,
-                audio=audio_path,
+            message = await media_cache.send_audio(
+                app, SMART_CACHE_CHANNEL, audio_path,
+                cache_key=audio_cache_key(audio_info.get("video_id")),
                 title=title,
                 performer=artist,
                 duration=duration,
@@ -527,43 +534,97 @@ class HyperSpeedDownloader:
         
         return None
     
+    async def _search_with_deadline(self, method: str, coro) -> Optional[Dict]:
+        """تشغيل محرك بحث واحد ضمن مهلته الخاصة"""
+        timeout = SEARCH_BACKEND_TIMEOUTS.get(method, SEARCH_RACE_TIMEOUT)
+        started = time.time()
+        try:
+            result = await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            SEARCH_BACKEND.labels(method, "timeout").inc()
+            LOGGER(__name__).warning(f"⏱️ انتهت مهلة {method} ({timeout}s)")
+            return None
+        
+        if isinstance(result, dict) and result.get("video_id"):
+            elapsed = time.time() - started
+            SEARCH_BACKEND.labels(method, "hit").inc()
+            SEARCH_BACKEND_SECONDS.labels(method).observe(elapsed)
+            # تحديث متوسط زمن المحرك لاستخدامه في الإحصائيات
+            perf = self.method_performance.get(method)
+            if perf:
+                perf['avg_time'] = (perf['avg_time'] + elapsed) / 2
+            return result
+        SEARCH_BACKEND.labels(method, "empty").inc()
+        return None
+    
+    async def race_search(self, query: str) -> Optional[Dict]:
+        """سباق محركات البحث: إرجاع أول video_id صالح وإلغاء البقية"""
+        search_tasks = {}
+        
+        if API_KEYS_CYCLE:
+            search_tasks['youtube_api'] = self.youtube_api_search(query)
+        if INVIDIOUS_CYCLE:
+            search_tasks['invidious'] = self.invidious_search(query)
+        search_tasks['youtube_search'] = self.youtube_search_simple(query)
+        
+        pending = {
+            asyncio.create_task(self._search_with_deadline(method, coro), name=f"search:{method}")
+            for method, coro in search_tasks.items()
+        }
+        
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=SEARCH_RACE_TIMEOUT,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                
+                for task in done:
+                    if task.cancelled() or task.exception():
+                        continue
+                    result = task.result()
+                    if result:
+                        return result
+        finally:
+            # إلغاء المحركات الأبطأ بمجرد وصول النتيجة
+            for task in pending:
+                task.cancel()
+        
+        return None
+    
     async def hyper_download(self, query: str) -> Optional[Dict]:
         """النظام الخارق للتحميل مع جميع الطرق"""
         start_time = time.time()
+        outcome = "cancelled"
         
+        try:
+            result, outcome = await self._hyper_download(query, start_time)
+            return result
+        finally:
+            HYPER_REQUESTS.labels(outcome).inc()
+            HYPER_SECONDS.labels(outcome).observe(time.time() - start_time)
+    
+    async def _hyper_download(self, query: str, start_time: float):
+        """مراحل التحميل الخارق؛ تُرجع (النتيجة، نوع النتيجة للمقاييس)"""
         try:
             # خطوة 1: البحث الفوري في الكاش
             cached_result = await self.lightning_search_cache(query)
             if cached_result:
                 LOGGER(__name__).info(f"⚡ كاش فوري: {query} ({time.time() - start_time:.3f}s)")
-                return cached_result
-            
-            # خطوة 2: البحث عن معلومات الفيديو بالتوازي
-            search_tasks = []
-            
-            if API_KEYS_CYCLE:
-                search_tasks.append(('youtube_api', self.youtube_api_search(query)))
-            if INVIDIOUS_CYCLE:
-                search_tasks.append(('invidious', self.invidious_search(query)))
-            search_tasks.append(('youtube_search', self.youtube_search_simple(query)))
-            
-            # تشغيل جميع عمليات البحث بالتوازي
-            search_results = await asyncio.gather(*[task for _, task in search_tasks], return_exceptions=True)
-            
-            # أخذ أول نتيجة ناجحة
-            video_info = None
-            for i, result in enumerate(search_results):
-                if isinstance(result, dict) and result.get("video_id"):
-                    video_info = result
-                    break
+                return cached_result, "cache"
             
+            # خطوة 2: سباق محركات البحث - أول نتيجة صالحة تفوز
+            video_info = await self.race_search(query)
             if not video_info:
-                return None
+                return None, "not_found"
             
             # خطوة 3: تحميل الصوت
             audio_info = await self.download_with_ytdlp(video_info)
             if not audio_info:
-                return None
+                return None, "download_failed"
             
             # خطوة 4: حفظ في التخزين الذكي (في الخلفية)
             if SMART_CACHE_CHANNEL:
@@ -573,16 +634,17 @@ class HyperSpeedDownloader:
             
             return {
                 'audio_path': audio_info['audio_path'],
+                'video_id': audio_info.get('video_id'),
                 'title': audio_info['title'],
                 'artist': audio_info['artist'],
                 'duration': audio_info['duration'],
                 'source': audio_info['source'],
                 'cached': False
-            }
+            }, "fresh"
             
         except Exception as e:
             LOGGER(__name__).error(f"خطأ في التحميل الخارق: {e}")
-            return None
+            return None, "error"
 
 # إنشاء مدير التحميل العالمي
 downloader = HyperSpeedDownloader()
@@ -605,12 +667,11 @@ async def download_thumbnail(url: str, title: str) -> Optional[str]:
         title_clean = re.sub(r'[\\/*?:"<>|]', "", title)
         thumb_path = f"downloads/thumb_{title_clean[:20]}.jpg"
         
-        session = await downloader.get_session()
-        async with session.get(url) as resp:
-            if resp.status == 200:
-                async with aiofiles.open(thumb_path, mode='wb') as f:
-                    await f.write(await resp.read())
-                return thumb_path
+        data = await http_client.fetch_bytes(url)
+        if data:
+            async with aiofiles.open(thumb_path, mode='wb') as f:
+                await f.write(data)
+            return thumb_path
     except Exception as e:
         LOGGER(__name__).warning(f"فشل تحميل الصورة: {e}")
     
@@ -667,8 +728,8 @@ async def smart_download_handler(client, message: Message):
         # إعداد الملف للإرسال
         if result.get('cached') and result.get('file_id'):
             # إرسال من الكاش
-            await message.reply_audio(
-                audio=result['file_id'],
+            await media_cache.reply_audio(
+                message, result['file_id'],
                 caption=f"🎵 **{result['title']}**\n🎤 **{result['artist']}**\n📡 **{source_text}**",
                 reply_markup=InlineKeyboardMarkup([[
                     InlineKeyboardButton("📢 قناة البوت", url=lnk)
@@ -681,8 +742,9 @@ async def smart_download_handler(client, message: Message):
                 thumb_path = await download_thumbnail(result['thumb'], result['title'])
             
             # إرسال الملف الجديد
-            await message.reply_audio(
-                audio=result['audio_path'],
+            await media_cache.reply_audio(
+                message, result['audio_path'],
+                cache_key=audio_cache_key(result.get('video_id')),
                 title=result['title'],
                 performer=result['artist'],
                 duration=result.get('duration', 0),
@@ -12,6 +12,7 @@ from ZeMusic.utils import ModyBin, get_channeplayCB, seconds_to_min
 from ZeMusic.utils.database import get_cmode, is_active_chat, is_music_playing
 from ZeMusic.utils.decorators.language import language, languageCB
 from ZeMusic.utils.inline import queue_back_markup, queue_markup
+from ZeMusic.utils.stream import clock
 from config import BANNED_USERS
 
 basic = {}
@@ -92,7 +93,7 @@ async def get_queue(client, message: Message, _):
             DUR,
             "c" if cplay else "g",
             videoid,
-            seconds_to_min(got[0]["played"]),
+            seconds_to_min(clock.played(got[0])),
             got[0]["dur"],
         )
     )
@@ -111,7 +112,7 @@ async def get_queue(client, message: Message, _):
                                     DUR,
                                     "c" if cplay else "g",
                                     videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
+                                    seconds_to_min(clock.played(db[chat_id][0])),
                                     db[chat_id][0]["dur"],
                                 )
                                 await mystic.edit_reply_markup(reply_markup=buttons)
@@ -232,7 +233,7 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
             DUR,
             cplay,
             videoid,
-            seconds_to_min(got[0]["played"]),
+            seconds_to_min(clock.played(got[0])),
             got[0]["dur"],
         )
     )
@@ -253,7 +254,7 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
                                     DUR,
                                     cplay,
                                     videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
+                                    seconds_to_min(clock.played(db[chat_id][0])),
                                     db[chat_id][0]["dur"],
                                 )
                                 await mystic.edit_reply_markup(reply_markup=buttons)
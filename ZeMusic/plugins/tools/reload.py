@@ -7,10 +7,10 @@ from ZeMusic.pyrogram_compatibility.types import CallbackQuery, Message
 
 from ZeMusic import app
 from ZeMusic.core.call import Mody
-from ZeMusic.misc import db
 from ZeMusic.utils.database import get_assistant, get_authuser_names, get_cmode
 from ZeMusic.utils.decorators import ActualAdminCB, AdminActual, language
 from ZeMusic.utils.formatters import alpha_to_int, get_readable_time
+from ZeMusic.utils.stream.queue import queue_service
 from config import BANNED_USERS, adminlist, lyrical
 
 rel = {}
@@ -52,7 +52,7 @@ async def restartbot(client, message: Message, _):
     mystic = await message.reply_text(_["reload_4"].format(app.mention))
     await asyncio.sleep(1)
     try:
-        db[message.chat.id] = []
+        await queue_service.clear(message.chat.id)
         await Mody.stop_stream_force(message.chat.id)
     except:
         pass
@@ -79,7 +79,7 @@ async def restartbot(client, message: Message, _):
         except:
             pass
         try:
-            db[chat_id] = []
+            await queue_service.clear(chat_id)
             await Mody.stop_stream_force(chat_id)
         except:
             pass
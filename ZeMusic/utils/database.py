@@ -1,9 +1,12 @@
-import random
-from typing import Dict, List, Union
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Set, Union
 
 # استخدام TDLib manager بدلاً من userbot
 from ZeMusic.core.tdlib_client import tdlib_manager
+from ZeMusic.core.assistant_scheduler import assistant_scheduler
 from ZeMusic.core.database import db
+from ZeMusic.logging import LOGGER
 
 # متغيرات الذاكرة للحالات المؤقتة (كما في الكود الأصلي)
 active = []
@@ -79,6 +82,20 @@ async def disable_search(chat_id):
 
 ########################################################
 
+async def is_progress_enabled(chat_id):
+    """التحقق من تفعيل شريط التقدم في المجموعة"""
+    return await db.get_temp_state(f"progressbar_{chat_id}", True)
+
+async def enable_progress(chat_id):
+    """تفعيل شريط التقدم في المجموعة"""
+    await db.set_temp_state(f"progressbar_{chat_id}", True)
+
+async def disable_progress(chat_id):
+    """إلغاء تفعيل شريط التقدم في المجموعة"""
+    await db.set_temp_state(f"progressbar_{chat_id}", False)
+
+########################################################
+
 async def get_assistant_number(chat_id: int) -> str:
     """الحصول على رقم المساعد"""
     assistant = assistantdict.get(chat_id)
@@ -93,16 +110,11 @@ async def get_assistant_number(chat_id: int) -> str:
 async def get_client(assistant: int):
     """الحصول على عميل المساعد - TDLib version"""
     try:
-        # الحصول على المساعد من TDLib manager
-        for tdlib_assistant in tdlib_manager.assistants:
-            if tdlib_assistant.assistant_id == assistant:
-                return tdlib_assistant
-        
-        # إذا لم يتم العثور على المساعد، إرجاع أول مساعد متاح
-        if tdlib_manager.assistants:
-            return tdlib_manager.assistants[0]
-        
-        return None
+        # الحصول على المساعد من فهرس TDLib manager
+        # وإن لم يوجد، إرجاع أول مساعد متاح
+        entry = tdlib_manager.get_assistant(assistant) or tdlib_manager.get_first_assistant()
+        # عناصر الفهرس هي مساعدو مجموعة المكالمات؛ المستدعون يحتاجون حساب المستخدم نفسه
+        return getattr(entry, 'userbot', entry)
     except Exception:
         return None
 
@@ -110,27 +122,17 @@ async def set_assistant_new(chat_id, number):
     """تعيين مساعد جديد"""
     number = int(number)
     assistantdict[chat_id] = number
+    assistant_scheduler.assign(chat_id, number)
     await db.update_chat_setting(chat_id, assistant_id=number)
 
 async def set_assistant(chat_id):
-    """تعيين مساعد عشوائي - TDLib version"""
+    """تعيين المساعد الأقل حملاً - TDLib version"""
     try:
-        # الحصول على قائمة المساعدين المتصلين
-        connected_assistants = [
-            assistant for assistant in tdlib_manager.assistants 
-            if assistant.is_connected
-        ]
-        
-        if not connected_assistants:
+        assistant_scheduler.release(chat_id)
+        assistant_id = assistant_scheduler.pick(chat_id)
+        if assistant_id is None:
             return None
-        
-        # اختيار مساعد عشوائي
-        selected_assistant = random.choice(connected_assistants)
-        
-        assistantdict[chat_id] = selected_assistant.assistant_id
-        await db.update_chat_setting(chat_id, assistant_id=selected_assistant.assistant_id)
-        
-        return selected_assistant
+        return await get_client(assistant_id)
     except Exception:
         return None
 
@@ -138,59 +140,54 @@ async def get_assistant(chat_id: int) -> str:
     """الحصول على المساعد - TDLib version"""
     try:
         assistant = assistantdict.get(chat_id)
-        if assistant:
+        if assistant is None:
+            settings = await db.get_chat_settings(chat_id)
+            assistant = settings.assistant_id
+        # التخصيص الثابت يُحترم ما دام المساعد سليماً وغير ممتلئ
+        picked = assistant_scheduler.pick(chat_id, preferred=assistant)
+        if picked is None and not assistant_scheduler.slots:
             return assistant
-        
-        settings = await db.get_chat_settings(chat_id)
-        got_assis = settings.assistant_id
-        if got_assis:
-            assistantdict[chat_id] = got_assis
-            return got_assis
-        else:
-            # اختيار مساعد متاح من TDLib
-            available_assistants = [
-                assistant.assistant_id for assistant in tdlib_manager.assistants 
-                if assistant.is_connected
-            ]
-            
-            if available_assistants:
-                ran_assistant = random.choice(available_assistants)
-                assistantdict[chat_id] = ran_assistant
-                await db.update_chat_setting(chat_id, assistant_id=ran_assistant)
-                return ran_assistant
-            else:
-                return None
+        return picked
     except Exception:
         return None
 
+async def group_assistant(self, chat_id: int):
+    """PyTgCalls الخاص بمساعد المحادثة (self هو كائن Call)"""
+    assistant_id = await get_assistant(chat_id)
+    return await self.get_tgcalls(assistant_id)
+
 async def get_assistant_details(chat_id: int) -> str:
     """الحصول على تفاصيل المساعد - TDLib version"""
+    return await get_assistant(chat_id)
+
+
+_assignment_writes: Set[asyncio.Task] = set()
+
+
+def _assignment_written(task: asyncio.Task):
+    _assignment_writes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        LOGGER(__name__).warning(f"تعذر حفظ تخصيص المساعد: {task.exception()}")
+
+
+def _sync_assignment(chat_id, assistant_id):
+    """مزامنة التخصيص الذي غيّرته الجدولة مع الكاش وقاعدة البيانات"""
+    if assistant_id is None:
+        assistantdict.pop(chat_id, None)
+    else:
+        assistantdict[chat_id] = assistant_id
     try:
-        assistant = assistantdict.get(chat_id)
-        if assistant:
-            return assistant
-        
-        settings = await db.get_chat_settings(chat_id)
-        got_assis = settings.assistant_id
-        if got_assis:
-            assistantdict[chat_id] = got_assis
-            return got_assis
-        else:
-            # اختيار مساعد متاح من TDLib
-            available_assistants = [
-                assistant.assistant_id for assistant in tdlib_manager.assistants 
-                if assistant.is_connected
-            ]
-            
-            if available_assistants:
-                ran_assistant = random.choice(available_assistants)
-                assistantdict[chat_id] = ran_assistant
-                await db.update_chat_setting(chat_id, assistant_id=ran_assistant)
-                return ran_assistant
-            else:
-                return None
-    except Exception:
-        return None
+        task = asyncio.get_running_loop().create_task(
+            db.update_chat_setting(chat_id, assistant_id=assistant_id)
+        )
+    except RuntimeError:
+        return
+    # الاحتفاظ بالمهمة حتى تنتهي كي لا تُجمع قبل اكتمال الكتابة
+    _assignment_writes.add(task)
+    task.add_done_callback(_assignment_written)
+
+
+assistant_scheduler.subscribe(_sync_assignment)
 
 # وظائف Skip Mode
 async def is_skipmode(chat_id: int) -> bool:
@@ -471,6 +468,61 @@ async def maintenance_on():
     maintenance.append(1)
     await db.set_temp_state("maintenance_mode", True)
 
+# سياق المحادثة: كل ما تحتاجه المزخرفات والأوامر في قراءة واحدة
+@dataclass
+class ChatContext:
+    """لقطة إعدادات المحادثة المستخدمة في معالجة تحديث واحد"""
+    chat_id: int
+    language: str
+    maintenance: bool
+    play_mode: str
+    play_type: str
+    cmode: str
+    nonadmin: bool
+    skipmode: bool
+    upvote_count: int
+
+
+async def get_chat_context(chat_id: int) -> ChatContext:
+    """
+    جمع اللغة ووضع الصيانة ووضع/نوع التشغيل وربط القناة ووضع عدم الإدارة
+    ووضع التخطي للمحادثة. القيم المحفوظة في الذاكرة تُستخدم مباشرة، والباقي
+    يُقرأ في رحلة واحدة لقاعدة البيانات بدلاً من استعلام لكل إعداد.
+    """
+    keys = ["maintenance_mode"]
+    if chat_id not in channelconnect:
+        keys.append(f"channelconnect_{chat_id}")
+    if chat_id not in nonadmin:
+        keys.append(f"nonadmin_{chat_id}")
+    if chat_id not in skipmode:
+        keys.append(f"skipmode_{chat_id}")
+    settings, values = await db.get_chat_snapshot(chat_id, keys)
+
+    for key, cache in (("nonadmin", nonadmin), ("skipmode", skipmode)):
+        if chat_id not in cache:
+            cache[chat_id] = values.get(f"{key}_{chat_id}", False)
+    langm.setdefault(chat_id, settings.language)
+    playmode.setdefault(chat_id, settings.play_mode)
+    playtype.setdefault(chat_id, settings.play_type)
+    count.setdefault(chat_id, settings.upvote_count)
+
+    if chat_id in channelconnect:
+        cmode = channelconnect[chat_id]["mode"]
+    else:
+        cmode = values.get(f"channelconnect_{chat_id}", "مباشر")
+
+    return ChatContext(
+        chat_id=chat_id,
+        language=langm[chat_id],
+        maintenance=bool(maintenance) or bool(values.get("maintenance_mode", False)),
+        play_mode=playmode[chat_id],
+        play_type=playtype[chat_id],
+        cmode=cmode,
+        nonadmin=nonadmin[chat_id],
+        skipmode=skipmode[chat_id],
+        upvote_count=count[chat_id],
+    )
+
 async def is_on_off(on_off: int) -> bool:
     """التحقق من حالة التشغيل/الإيقاف"""
     return await db.get_temp_state(f"on_off_{on_off}", True)
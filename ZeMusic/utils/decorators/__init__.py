@@ -1,3 +1,4 @@
 from .admins import *
 from .language import *
 from .asyncify import asyncify
+from .context import context_strings, update_context
@@ -3,25 +3,17 @@ from ZeMusic.pyrogram_compatibility.types import InlineKeyboardButton, InlineKey
 
 from ZeMusic import app
 from ZeMusic.misc import SUDOERS, db
-from ZeMusic.utils.database import (
-    get_authuser_names,
-    get_cmode,
-    get_lang,
-    get_upvote_count,
-    is_active_chat,
-    is_maintenance,
-    is_nonadmin_chat,
-    is_skipmode,
-)
+from ZeMusic.utils.database import get_authuser_names, get_upvote_count, is_active_chat
 from config import SUPPORT_CHAT, adminlist, confirmer
-from strings import get_string
 
 from ..formatters import int_to_alpha
+from .context import context_strings, update_context
 
 
 def AdminRightsCheck(mystic):
     async def wrapper(client, message):
-        if await is_maintenance() is False:
+        ctx = await update_context(message)
+        if ctx.maintenance is False:
             if message.from_user.id not in SUDOERS:
                 return await message.reply_text(
                     text=f"{app.mention} تحت الصيانة حالياً، زر <a href={SUPPORT_CHAT}>مجموعة الدعم</a> لمعرفة السبب.",
@@ -33,11 +25,7 @@ def AdminRightsCheck(mystic):
         except:
             pass
 
-        try:
-            language = await get_lang(message.chat.id)
-            _ = get_string(language)
-        except:
-            _ = get_string("en")
+        _ = context_strings(ctx)
         if message.sender_chat:
             upl = InlineKeyboardMarkup(
                 [
@@ -51,7 +39,7 @@ def AdminRightsCheck(mystic):
             )
             return await message.reply_text(_["general_3"], reply_markup=upl)
         if message.command[0][0] == "c":
-            chat_id = await get_cmode(message.chat.id)
+            chat_id = ctx.cmode
             if chat_id is None:
                 return await message.reply_text(_["setting_7"])
             try:
@@ -62,15 +50,14 @@ def AdminRightsCheck(mystic):
             chat_id = message.chat.id
         if not await is_active_chat(chat_id):
             return await message.reply_text(_["general_5"])
-        is_non_admin = await is_nonadmin_chat(message.chat.id)
-        if not is_non_admin:
+        if not ctx.nonadmin:
             if message.from_user.id not in SUDOERS:
                 admins = adminlist.get(message.chat.id)
                 if not admins:
                     return await message.reply_text(_["admin_13"])
                 else:
                     if message.from_user.id not in admins:
-                        if await is_skipmode(message.chat.id):
+                        if ctx.skipmode:
                             upvote = await get_upvote_count(chat_id)
                             text = f"""<b>ᴀᴅᴍɪɴ ʀɪɢʜᴛs ɴᴇᴇᴅᴇᴅ</b>
 
@@ -117,7 +104,8 @@ def AdminRightsCheck(mystic):
 
 def AdminActual(mystic):
     async def wrapper(client, message):
-        if await is_maintenance() is False:
+        ctx = await update_context(message)
+        if ctx.maintenance is False:
             if message.from_user.id not in SUDOERS:
                 return await message.reply_text(
                     text=f"{app.mention} تحت الصيانة حالياً، زر <a href={SUPPORT_CHAT}>مجموعة الدعم</a> لمعرفة السبب.",
@@ -129,11 +117,7 @@ def AdminActual(mystic):
         except:
             pass
 
-        try:
-            language = await get_lang(message.chat.id)
-            _ = get_string(language)
-        except:
-            _ = get_string("en")
+        _ = context_strings(ctx)
         if message.sender_chat:
             upl = InlineKeyboardMarkup(
                 [
@@ -162,21 +146,17 @@ def AdminActual(mystic):
 
 def ActualAdminCB(mystic):
     async def wrapper(client, CallbackQuery):
-        if await is_maintenance() is False:
+        ctx = await update_context(CallbackQuery)
+        if ctx.maintenance is False:
             if CallbackQuery.from_user.id not in SUDOERS:
                 return await CallbackQuery.answer(
                     f"{app.mention} تحت الصيانة حالياً، زر مجموعة الدعم لمعرفة السبب.",
                     show_alert=True,
                 )
-        try:
-            language = await get_lang(CallbackQuery.message.chat.id)
-            _ = get_string(language)
-        except:
-            _ = get_string("en")
+        _ = context_strings(ctx)
         if CallbackQuery.message.chat.type == ChatType.PRIVATE:
             return await mystic(client, CallbackQuery, _)
-        is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
-        if not is_non_admin:
+        if not ctx.nonadmin:
             try:
                 a = (
                     await app.get_chat_member(
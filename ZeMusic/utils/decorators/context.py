@@ -0,0 +1,35 @@
+from ZeMusic.utils.database import ChatContext, get_chat_context
+from strings import get_string
+
+_CONTEXT_ATTR = "_chat_context"
+
+
+def _update_chat_id(update) -> int:
+    chat = getattr(update, "chat", None)
+    if chat is None:
+        # CallbackQuery يحمل المحادثة داخل رسالته
+        chat = update.message.chat
+    return chat.id
+
+
+async def update_context(update) -> ChatContext:
+    """
+    سياق المحادثة للتحديث الحالي: يُجلب مرة واحدة ويُحفظ على كائن التحديث
+    فتتشاركه كل المزخرفات المتداخلة والمعالج نفسه.
+    """
+    ctx = getattr(update, _CONTEXT_ATTR, None)
+    if ctx is None:
+        ctx = await get_chat_context(_update_chat_id(update))
+        try:
+            setattr(update, _CONTEXT_ATTR, ctx)
+        except AttributeError:
+            pass
+    return ctx
+
+
+def context_strings(ctx: ChatContext) -> dict:
+    """نصوص لغة المحادثة مع الرجوع للإنجليزية"""
+    try:
+        return get_string(ctx.language)
+    except:
+        return get_string("en")
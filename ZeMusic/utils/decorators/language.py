@@ -1,13 +1,14 @@
-from strings import get_string
-
 from ZeMusic import app
 from ZeMusic.misc import SUDOERS
-from ZeMusic.utils.database import get_lang, is_maintenance
+from config import SUPPORT_CHAT
+
+from .context import context_strings, update_context
 
 
 def language(mystic):
     async def wrapper(_, message, **kwargs):
-        if await is_maintenance() is False:
+        ctx = await update_context(message)
+        if ctx.maintenance is False:
             if message.from_user.id not in SUDOERS:
                 return await message.reply_text(
                     text=f"{app.mention} ɪs ᴜɴᴅᴇʀ ᴍᴀɪɴᴛᴇɴᴀɴᴄᴇ, ᴠɪsɪᴛ <a href={SUPPORT_CHAT}>sᴜᴘᴘᴏʀᴛ ᴄʜᴀᴛ</a> ғᴏʀ ᴋɴᴏᴡɪɴɢ ᴛʜᴇ ʀᴇᴀsᴏɴ.",
@@ -18,11 +19,7 @@ def language(mystic):
         except:
             pass
 
-        try:
-            language = await get_lang(message.chat.id)
-            language = get_string(language)
-        except:
-            language = get_string("en")
+        language = context_strings(ctx)
         return await mystic(_, message, language)
 
     return wrapper
@@ -30,17 +27,14 @@ def language(mystic):
 
 def languageCB(mystic):
     async def wrapper(_, CallbackQuery, **kwargs):
-        if await is_maintenance() is False:
+        ctx = await update_context(CallbackQuery)
+        if ctx.maintenance is False:
             if CallbackQuery.from_user.id not in SUDOERS:
                 return await CallbackQuery.answer(
                     f"{app.mention} ɪs ᴜɴᴅᴇʀ ᴍᴀɪɴᴛᴇɴᴀɴᴄᴇ, ᴠɪsɪᴛ sᴜᴘᴘᴏʀᴛ ᴄʜᴀᴛ ғᴏʀ ᴋɴᴏᴡɪɴɢ ᴛʜᴇ ʀᴇᴀsᴏɴ.",
                     show_alert=True,
                 )
-        try:
-            language = await get_lang(CallbackQuery.message.chat.id)
-            language = get_string(language)
-        except:
-            language = get_string("en")
+        language = context_strings(ctx)
         return await mystic(_, CallbackQuery, language)
 
     return wrapper
@@ -48,11 +42,8 @@ def languageCB(mystic):
 
 def LanguageStart(mystic):
     async def wrapper(_, message, **kwargs):
-        try:
-            language = await get_lang(message.chat.id)
-            language = get_string(language)
-        except:
-            language = get_string("en")
+        ctx = await update_context(message)
+        language = context_strings(ctx)
         return await mystic(_, message, language)
 
     return wrapper
@@ -11,28 +11,21 @@ from ZeMusic.pyrogram_compatibility.types import InlineKeyboardButton, InlineKey
 
 from ZeMusic import YouTube, app
 from ZeMusic.misc import SUDOERS
-from ZeMusic.utils.database import (
-    get_assistant,
-    get_cmode,
-    get_lang,
-    get_playmode,
-    get_playtype,
-    is_active_chat,
-    is_maintenance,
-)
+from ZeMusic.utils.database import get_assistant, is_active_chat
 from ZeMusic.utils.inline import botplaylist_markup
 from config import PLAYLIST_IMG_URL, SUPPORT_CHAT, adminlist
-from strings import get_string
+
+from .context import context_strings, update_context
 
 links = {}
 
 
 def PlayWrapper(command):
     async def wrapper(client, message):
-        language = await get_lang(message.chat.id)
-        _ = get_string(language)
+        ctx = await update_context(message)
+        _ = context_strings(ctx)
 
-        if await is_maintenance() is False:
+        if ctx.maintenance is False:
             if message.from_user.id not in SUDOERS:
                 return await message.reply_text(
                     text=f"{app.mention} تحت الصيانة حالياً، زر <a href={SUPPORT_CHAT}>مجموعة الدعم</a> لمعرفة السبب.",
@@ -66,7 +59,7 @@ def PlayWrapper(command):
                     reply_markup=InlineKeyboardMarkup(buttons),
                 )
         if message.command[0][0] == "c":
-            chat_id = await get_cmode(message.chat.id)
+            chat_id = ctx.cmode
             if chat_id is None:
                 return await message.reply_text(_["setting_7"])
             try:
@@ -77,9 +70,8 @@ def PlayWrapper(command):
         else:
             chat_id = message.chat.id
             channel = None
-        playmode = await get_playmode(message.chat.id)
-        playty = await get_playtype(message.chat.id)
-        if playty != "Everyone":
+        playmode = ctx.play_mode
+        if ctx.play_type != "Everyone":
             if message.from_user.id not in SUDOERS:
                 admins = adminlist.get(message.chat.id)
                 if not admins:
@@ -2,22 +2,38 @@
 #▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒✯  T.me/ZThon   ✯▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒
 #▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒✯ T.me/Zelzal_Music ✯▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒
 
+import asyncio
 import os
-import requests
-import threading
 import json
 import subprocess
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
-def download_chunk(url, start, end, filename, session):
+from ZeMusic.core.http_client import http_client
+
+
+DOWNLOAD_TIMEOUT = 300  # مهلة تحميل الجزء الواحد (الملفات أكبر من مهلة العميل الافتراضية)
+
+
+async def download_chunk(url, start, end, filename):
     headers = {"Range": f"bytes={start}-{end}"}
-    response = session.get(url, headers=headers, stream=True)
-    with open(filename, "ab") as f:
-        for chunk in response.iter_content(1024 * 1024):
-            f.write(chunk)
+    async with http_client.get(
+        url, headers=headers, timeout=aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT)
+    ) as response:
+        data = await response.read()
 
+    def write():
+        with open(filename, "r+b") as f:
+            f.seek(start)
+            f.write(data)
 
-def download_file(vidid, audio=True, num_threads=10):
+    await asyncio.to_thread(write)
+
+
+async def download_file(vidid, audio=True, num_threads=10):
     link = "https://api.cobalt.tools/api/json"
     headers = {"Accept": "application/json", "Content-Type": "application/json"}
     if audio:
@@ -28,15 +44,15 @@ def download_file(vidid, audio=True, num_threads=10):
         }
     else:
         data = {"url": "https://www.youtube.com/watch?v=LLF3GMfNEYU", "vQuality": "240"}
-    url = requests.post(link, headers=headers, json=data).json()["url"]
-    session = requests.Session()
-    response = session.head(url)
+    async with http_client.post(link, headers=headers, json=data) as response:
+        url = (await response.json(content_type=None))["url"]
+    async with http_client.head(url, allow_redirects=True) as response:
+        total_size = response.headers.get("Content-Length")
     if audio:
         filename = os.path.join("downloads", f"{vidid}.mp3")
     else:
         filename = os.path.join("downloads", f"{vidid}.mp4")
 
-    total_size = response.headers.get("Content-Length")
     if total_size is None:
         if audio:
             total_size = 1024 * 1024 * 50
@@ -47,22 +63,19 @@ def download_file(vidid, audio=True, num_threads=10):
 
     total_size = int(total_size)
     chunk_size = total_size // num_threads
-    open(filename, "wb").close()
+    # كل جزء يُكتب في موضعه، فالترتيب لا يعتمد على ترتيب انتهاء الطلبات
+    with open(filename, "wb") as f:
+        f.truncate(total_size)
 
-    threads = []
+    chunks = []
     for i in range(num_threads):
         start = i * chunk_size
         end = (i + 1) * chunk_size - 1
         if i == num_threads - 1:
             end = total_size - 1
-        t = threading.Thread(
-            target=download_chunk, args=(url, start, end, filename, session)
-        )
-        threads.append(t)
-        t.start()
+        chunks.append(download_chunk(url, start, end, filename))
 
-    for t in threads:
-        t.join()
+    await asyncio.gather(*chunks)
     return filename
 
 
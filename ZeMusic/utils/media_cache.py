@@ -0,0 +1,178 @@
+import asyncio
+import os
+from typing import Dict, Optional, Set
+
+from ZeMusic.core.database import db
+from ZeMusic.core.metrics import metrics
+from ZeMusic.logging import LOGGER
+
+# أخطاء تعني أن file_id نفسه لم يعد صالحاً (أسماء pyrogram ورموز Telegram/TDLib)؛
+# غيرها (FloodWait، الشبكة، محادثة غير موجودة) يُعاد رفعه كما هو دون لمس الكاش
+STALE_FILE_ID_ERRORS = (
+    "FileIdInvalid", "FileReferenceExpired", "FileReferenceInvalid",
+    "MediaEmpty", "WebpageCurlFailed",
+)
+STALE_FILE_ID_CODES = (
+    "FILE_ID_INVALID", "FILE_REFERENCE_EXPIRED", "FILE_REFERENCE_INVALID",
+    "MEDIA_EMPTY", "WEBPAGE_CURL_FAILED", "WRONG REMOTE FILE IDENTIFIER",
+)
+
+
+def is_stale_file_id_error(error: Exception) -> bool:
+    if type(error).__name__ in STALE_FILE_ID_ERRORS:
+        return True
+    text = str(error).upper()
+    return any(code in text for code in STALE_FILE_ID_CODES)
+
+
+def audio_cache_key(video_id: Optional[str]) -> Optional[str]:
+    """مفتاح ثابت لصوت مقطع يوتيوب، فيُعاد استخدام رفعه حتى بعد حذف الملف المحلي"""
+    return f"audio:youtube:{video_id}" if video_id else None
+
+
+class MediaFileCache:
+    """كاش معرفات file_id للوسائط المرفوعة لتفادي إعادة رفع نفس الملف"""
+
+    def __init__(self):
+        self.file_ids: Dict[str, str] = {}
+        self.hits = 0
+        self.uploads = 0
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._writes: Set[asyncio.Task] = set()
+
+    def _persist(self, coro):
+        """كتابة في قاعدة البيانات بالخلفية مع الاحتفاظ بالمهمة حتى تنتهي"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._writes.add(task)
+        task.add_done_callback(self._write_done)
+
+    def _write_done(self, task: asyncio.Task):
+        self._writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            LOGGER(__name__).warning(f"تعذر حفظ كاش الوسائط: {task.exception()}")
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                self.file_ids.update(await db.get_media_file_ids())
+            except Exception as e:
+                LOGGER(__name__).warning(f"تعذر تحميل كاش الوسائط: {e}")
+            self._loaded = True
+            self._prune_missing_files()
+
+    def _prune_missing_files(self):
+        """حذف مفاتيح الملفات المحلية التي حُذفت أو تغيّرت منذ حفظها"""
+        stale = [
+            key for key in self.file_ids
+            if key.startswith("file:") and self.media_key(key[5:].rsplit(":", 2)[0]) != key
+        ]
+        for key in stale:
+            del self.file_ids[key]
+            self._persist(db.delete_media_file_id(key))
+        if stale:
+            LOGGER(__name__).info(f"🧹 حذف {len(stale)} معرف وسائط لملفات محلية لم تعد موجودة")
+
+    def forget_file(self, path: str):
+        """نسيان file_id لملف محلي قبل حذفه (مثل بطاقة أخرجها LRU المصغرات)"""
+        key = self.media_key(path)
+        if key is None or self.file_ids.pop(key, None) is None:
+            return
+        try:
+            self._persist(db.delete_media_file_id(key))
+        except RuntimeError:
+            pass
+
+    @staticmethod
+    def media_key(media) -> Optional[str]:
+        """مفتاح الوسائط: الرابط كما هو، أو المسار مع الحجم ووقت التعديل للملفات المحلية"""
+        if not isinstance(media, str) or not media:
+            return None
+        if media.startswith(("http://", "https://")):
+            return media
+        if os.path.isfile(media):
+            stat = os.stat(media)
+            return f"file:{os.path.abspath(media)}:{stat.st_size}:{int(stat.st_mtime)}"
+        # قيمة ليست رابطاً ولا ملفاً (غالباً file_id بالفعل)
+        return None
+
+    @staticmethod
+    def _extract_file_id(message, media_type: str) -> Optional[str]:
+        media = getattr(message, media_type, None)
+        if media_type == "photo" and isinstance(media, list) and media:
+            media = media[-1]
+        return getattr(media, "file_id", None)
+
+    async def _send(self, sender, media, media_type: str, cache_key: Optional[str] = None, **kwargs):
+        await self._ensure_loaded()
+        key = cache_key or self.media_key(media)
+        cached = self.file_ids.get(key) if key else None
+
+        if cached:
+            try:
+                message = await sender(**{media_type: cached}, **kwargs)
+                self.hits += 1
+                return message
+            except Exception as e:
+                if not is_stale_file_id_error(e):
+                    raise
+                # معرف منتهي أو غير صالح - نحذفه ونعيد الرفع
+                LOGGER(__name__).debug(f"file_id غير صالح لـ {key}: {e}")
+                self.file_ids.pop(key, None)
+                self._persist(db.delete_media_file_id(key))
+
+        message = await sender(**{media_type: media}, **kwargs)
+        self.uploads += 1
+
+        file_id = self._extract_file_id(message, media_type) if key else None
+        if file_id:
+            self.file_ids[key] = file_id
+            self._persist(db.set_media_file_id(key, file_id, media_type))
+        return message
+
+    async def send_photo(self, client, chat_id, photo, **kwargs):
+        """إرسال صورة مع إعادة استخدام file_id إن وُجد"""
+        return await self._send(
+            lambda **kw: client.send_photo(chat_id=chat_id, **kw), photo, "photo", **kwargs
+        )
+
+    async def reply_photo(self, message, photo, **kwargs):
+        """الرد بصورة مع إعادة استخدام file_id إن وُجد"""
+        return await self._send(message.reply_photo, photo, "photo", **kwargs)
+
+    async def send_audio(self, client, chat_id, audio, **kwargs):
+        """إرسال ملف صوتي مع إعادة استخدام file_id إن وُجد"""
+        return await self._send(
+            lambda **kw: client.send_audio(chat_id=chat_id, **kw), audio, "audio", **kwargs
+        )
+
+    async def reply_audio(self, message, audio, **kwargs):
+        """الرد بملف صوتي مع إعادة استخدام file_id إن وُجد"""
+        return await self._send(message.reply_audio, audio, "audio", **kwargs)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'cached_media': len(self.file_ids),
+            'reused': self.hits,
+            'uploads': self.uploads,
+        }
+
+
+media_cache = MediaFileCache()
+
+MEDIA_CACHE_ENTRIES = metrics.gauge("zemusic_media_cache_entries", "Uploaded media file_ids cached")
+MEDIA_CACHE_REUSED = metrics.counter("zemusic_media_cache_reused_total", "Uploads avoided by reusing a file_id")
+MEDIA_CACHE_UPLOADS = metrics.counter("zemusic_media_cache_uploads_total", "Media uploaded to Telegram")
+
+
+def _collect_media_cache():
+    MEDIA_CACHE_ENTRIES.set(len(media_cache.file_ids))
+    MEDIA_CACHE_REUSED.set(media_cache.hits)
+    MEDIA_CACHE_UPLOADS.set(media_cache.uploads)
+
+
+metrics.add_collector(_collect_media_cache)
@@ -1,16 +1,15 @@
-import aiohttp
+from ZeMusic.core.http_client import http_client
 
 BASE = "https://batbin.me/"
 
 
-async def post(url: str, *args, **kwargs):
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, *args, **kwargs) as resp:
-            try:
-                data = await resp.json()
-            except Exception:
-                data = await resp.text()
-        return data
+async def post(url: str, **kwargs):
+    async with http_client.post(url, **kwargs) as resp:
+        try:
+            data = await resp.json()
+        except Exception:
+            data = await resp.text()
+    return data
 
 
 async def ModyBin(text):
@@ -1,18 +1,41 @@
+import asyncio
 import os
+from collections import Counter
 
-from config import autoclean
+# عدد العناصر في جميع الطوابير التي تشير إلى نفس الملف
+file_refs = Counter()
 
+# مهلة قبل حذف ملف خرج من كل الطوابير، لأنه قد يُعاد إدراجه فوراً
+# (مثل تفريغ الطابور ثم تشغيل نفس المقطع من جديد)
+FILE_RELEASE_GRACE = 30
 
-async def auto_clean(popped):
+
+def track_file(file):
+    """تسجيل مرجع جديد لملف في الطابور"""
+    file_refs[file] += 1
+
+
+def release_file(file):
+    """إنقاص مرجع ملف خرج من الطابور، وحذفه إن لم يعد في أي طابور"""
+    if not isinstance(file, str) or file not in file_refs:
+        return
+    count = file_refs[file] - 1
+    if count > 0:
+        file_refs[file] = count
+        return
+    file_refs.pop(file, None)
+    if "vid_" in file or "live_" in file or "index_" in file:
+        return
+    try:
+        asyncio.get_running_loop().call_later(FILE_RELEASE_GRACE, _remove_if_unused, file)
+    except RuntimeError:
+        _remove_if_unused(file)
+
+
+def _remove_if_unused(file):
+    if file_refs.get(file):
+        return
     try:
-        rem = popped["file"]
-        autoclean.remove(rem)
-        count = autoclean.count(rem)
-        if count == 0:
-            if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
-                try:
-                    os.remove(rem)
-                except:
-                    pass
-    except:
+        os.remove(file)
+    except OSError:
         pass
@@ -0,0 +1,53 @@
+"""
+ساعة التشغيل: حساب موضع المقطع عند الطلب بدلاً من عدّاد يزداد كل ثانية.
+
+كل عنصر في الطابور يحمل:
+- played: الموضع (بالثواني) عند آخر نقطة ارتكاز (بدء/تقديم/تغيير سرعة)
+- started_at: وقت الارتكاز (time.monotonic) أو None إن لم يبدأ التشغيل
+- paused_at: وقت الإيقاف المؤقت الحالي أو None
+"""
+
+import time
+
+
+def start(entry, offset: int = 0):
+    """بدء ساعة المقطع من الموضع offset"""
+    entry["played"] = max(0, int(offset))
+    entry["started_at"] = time.monotonic()
+    entry["paused_at"] = None
+
+
+def played(entry) -> int:
+    """الموضع الحالي للمقطع بالثواني"""
+    base = entry.get("played", 0)
+    started_at = entry.get("started_at")
+    if started_at is None:
+        return int(base)
+    now = entry.get("paused_at") or time.monotonic()
+    position = int(base + (now - started_at))
+    seconds = int(entry.get("seconds") or 0)
+    if seconds and position > seconds:
+        return seconds
+    return position
+
+
+def pause(entry):
+    """إيقاف الساعة مؤقتاً"""
+    if entry.get("started_at") is not None and entry.get("paused_at") is None:
+        entry["paused_at"] = time.monotonic()
+
+
+def resume(entry):
+    """استئناف الساعة مع استبعاد مدة الإيقاف"""
+    paused_at = entry.get("paused_at")
+    if paused_at is not None:
+        entry["started_at"] += time.monotonic() - paused_at
+        entry["paused_at"] = None
+
+
+def seek(entry, position: int):
+    """نقل الموضع إلى position مع الحفاظ على حالة الإيقاف"""
+    paused = entry.get("paused_at") is not None
+    start(entry, position)
+    if paused:
+        entry["paused_at"] = entry["started_at"]
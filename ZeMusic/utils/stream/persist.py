@@ -0,0 +1,173 @@
+"""
+حفظ طوابير التشغيل: لقطات دورية لطابور كل محادثة في قاعدة البيانات
+واستعادتها عند بدء التشغيل بحيث لا تضيع الطوابير عند إعادة التشغيل أو الانهيار.
+"""
+
+import asyncio
+import os
+from typing import Dict, Optional, Set
+
+from ZeMusic.core.database import db as database
+from ZeMusic.core.task_supervisor import task_supervisor
+from ZeMusic.logging import LOGGER
+from ZeMusic.misc import db
+from ZeMusic.utils.formatters import seconds_to_min
+from ZeMusic.utils.stream import clock
+from ZeMusic.utils.stream.queue import ChatQueue, QueueItem, queue_service
+
+QUEUE_FLUSH_INTERVAL = 5         # الفاصل بين عمليات الحفظ الدورية
+QUEUE_POSITION_GRANULARITY = 15  # دقة حفظ موضع التشغيل بالثواني
+QUEUE_RESTORE_CONCURRENCY = 2    # أقصى عدد محادثات تُستعاد في وقت واحد
+QUEUE_RESTORE_DELAY = 3          # الفاصل بين بدء استعادة محادثتين
+QUEUE_RESTORE_MIN_SEEK = 10      # أقل موضع يستحق التقديم عند الاستعادة
+
+# حقول لا تُحفظ: كائنات رسائل وحالة ساعة مرتبطة بالعملية الحالية
+_TRANSIENT_FIELDS = ("mystic", "markup", "started_at", "paused_at")
+
+
+def _serialize(queue) -> list:
+    items = []
+    for item in queue:
+        data = item.to_dict() if isinstance(item, QueueItem) else dict(item)
+        for key in _TRANSIENT_FIELDS:
+            data.pop(key, None)
+        items.append(data)
+    return items
+
+
+class QueueStore:
+    """حفظ طوابير المحادثات دورياً واستعادتها عند بدء التشغيل"""
+
+    def __init__(self):
+        self.positions: Dict[int, int] = {}
+        self.dirty: Set[int] = set()
+        self.stats = {'flushes': 0, 'written': 0, 'removed': 0, 'restored': 0, 'restore_failed': 0}
+        self._flush_lock = asyncio.Lock()
+        queue_service.subscribe(self._on_change)
+
+    def _on_change(self, chat_id, event, items):
+        self.dirty.add(chat_id)
+
+    @staticmethod
+    def _position(queue) -> int:
+        """موضع الرأس مقرباً - يتغير فقط عندما يستحق الحفظ"""
+        return clock.played(queue[0]) // QUEUE_POSITION_GRANULARITY
+
+    async def flush(self):
+        """كتابة الطوابير التي تغيرت منذ آخر حفظ في معاملة واحدة"""
+        async with self._flush_lock:
+            dirty, self.dirty = self.dirty, set()
+            changed = {}
+            removed = []
+            for chat_id in dirty | set(self.positions):
+                queue = db.get(chat_id)
+                if not queue:
+                    if self.positions.pop(chat_id, None) is not None or chat_id in dirty:
+                        removed.append(chat_id)
+                    continue
+                position = self._position(queue)
+                if chat_id in dirty or self.positions.get(chat_id) != position:
+                    changed[chat_id] = (_serialize(queue), clock.played(queue[0]))
+                    self.positions[chat_id] = position
+
+            if not changed and not removed:
+                return
+            try:
+                await database.save_queue_snapshots(changed, removed)
+            except Exception:
+                # إعادة المحادثات للقائمة لتُكتب في المحاولة التالية
+                self.dirty |= dirty | set(changed)
+                raise
+            self.stats['flushes'] += 1
+            self.stats['written'] += len(changed)
+            self.stats['removed'] += len(removed)
+
+    def start(self):
+        task_supervisor.add("queue_flush", self.flush, QUEUE_FLUSH_INTERVAL)
+
+    async def restore(self):
+        """استعادة الطوابير المحفوظة مع توزيع إعادة الانضمام على الزمن"""
+        try:
+            snapshots = await database.get_queue_snapshots()
+        except Exception as e:
+            LOGGER(__name__).warning(f"تعذر تحميل طوابير التشغيل المحفوظة: {e}")
+            return
+        if not snapshots:
+            return
+
+        LOGGER(__name__).info(f"♻️ استعادة {len(snapshots)} طابور تشغيل محفوظ")
+        semaphore = asyncio.Semaphore(QUEUE_RESTORE_CONCURRENCY)
+        tasks = []
+        for chat_id, (items, position) in snapshots.items():
+            tasks.append(asyncio.create_task(self._restore_chat(semaphore, chat_id, items, position)))
+            await asyncio.sleep(QUEUE_RESTORE_DELAY)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        LOGGER(__name__).info(
+            f"✅ تمت استعادة {self.stats['restored']} طابور ({self.stats['restore_failed']} فشل)"
+        )
+
+    async def _restore_chat(self, semaphore, chat_id: int, items: list, position: int):
+        async with semaphore:
+            enqueued = False
+            try:
+                queue = ChatQueue(QueueItem.from_dict(data) for data in items)
+                # البث المباشر لا يمكن استئنافه من موضع سابق
+                while queue and str(queue[0].file).startswith("live_"):
+                    queue.popleft()
+                if not queue or db.get(chat_id):
+                    raise ValueError("لا يوجد ما يُستعاد")
+
+                head = queue[0]
+                link = await self._resolve(head)
+                if not link:
+                    raise ValueError(f"تعذر تجهيز الملف {head.file}")
+
+                from ZeMusic.core.call import Mody
+
+                await queue_service.enqueue_many(chat_id, queue)
+                enqueued = True
+                await Mody.join_call(
+                    chat_id, head.chat_id, link, video=str(head.streamtype) == "video"
+                )
+                position = int(position or 0)
+                if position >= QUEUE_RESTORE_MIN_SEEK and position < int(head.seconds or 0):
+                    await Mody.seek_stream(
+                        chat_id, link, seconds_to_min(position), head.dur, head.streamtype
+                    )
+                else:
+                    position = 0
+                clock.start(head, position)
+                self.positions[chat_id] = self._position(queue)
+                self.stats['restored'] += 1
+            except Exception as e:
+                self.stats['restore_failed'] += 1
+                # تعليم المحادثة ليحذف الحفظ التالي اللقطة القديمة
+                if enqueued:
+                    await queue_service.clear(chat_id)
+                else:
+                    self.dirty.add(chat_id)
+                LOGGER(__name__).debug(f"تعذر استعادة طابور {chat_id}: {e}")
+
+    @staticmethod
+    async def _resolve(item: QueueItem) -> Optional[str]:
+        """مسار قابل للتشغيل لرأس الطابور"""
+        file = str(item.file)
+        if file.startswith("vid_"):
+            from ZeMusic import YouTube
+
+            file_path, _ = await YouTube.download(
+                item.vidid,
+                None,
+                videoid=True,
+                video=str(item.streamtype) == "video",
+            )
+            return file_path
+        if file.startswith("index_"):
+            return item.vidid
+        return file if os.path.exists(file) else None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, 'tracked_chats': len(self.positions)}
+
+
+queue_store = QueueStore()
@@ -0,0 +1,149 @@
+"""
+مُحدّث شريط التقدم: يوزّع تعديلات أزرار "يتم التشغيل الآن" على الزمن
+ضمن ميزانية عامة للتعديلات في الثانية، مع تراجع لكل محادثة عند FloodWait.
+"""
+
+import random
+import time
+from typing import Dict, Set
+
+from ZeMusic.pyrogram_compatibility.errors import FloodWait
+from ZeMusic.pyrogram_compatibility.types import InlineKeyboardMarkup
+
+from ZeMusic.core.task_supervisor import task_supervisor
+from ZeMusic.logging import LOGGER
+from ZeMusic.misc import db
+from ZeMusic.utils.database import (
+    disable_progress,
+    enable_progress,
+    get_active_chats,
+    get_lang,
+    is_music_playing,
+    is_progress_enabled,
+)
+from ZeMusic.utils.formatters import seconds_to_min
+from ZeMusic.utils.inline import stream_markup_timer
+from ZeMusic.utils.stream import clock
+from strings import get_string
+
+PROGRESS_INTERVAL = 7           # الفاصل المطلوب بين تحديثين لنفس المحادثة
+PROGRESS_EDITS_PER_SECOND = 15  # الميزانية العامة لتعديلات الأزرار
+PROGRESS_TICK = 1.0             # دقة جدولة المُحدّث
+PROGRESS_MAX_BACKOFF = 300      # أقصى تراجع لمحادثة بعد أخطاء متتالية
+
+
+class ProgressUpdater:
+    """جدولة تحديث أشرطة التقدم لجميع المحادثات النشطة"""
+
+    def __init__(self):
+        self.due: Dict[int, float] = {}
+        self.last_label: Dict[int, str] = {}
+        self.backoff: Dict[int, float] = {}
+        self.disabled: Set[int] = set()
+        self.tokens = float(PROGRESS_EDITS_PER_SECOND)
+        self.stats = {'edits': 0, 'skipped': 0, 'flood_waits': 0, 'errors': 0}
+        self._last = time.monotonic()
+
+    async def disable(self, chat_id: int):
+        """إيقاف تحديث شريط التقدم لمحادثة (يُحفظ في إعداداتها)"""
+        self.disabled.add(chat_id)
+        self.due.pop(chat_id, None)
+        await disable_progress(chat_id)
+
+    async def enable(self, chat_id: int):
+        """إعادة تفعيل تحديث شريط التقدم لمحادثة"""
+        self.disabled.discard(chat_id)
+        await enable_progress(chat_id)
+
+    def is_enabled(self, chat_id: int) -> bool:
+        return chat_id not in self.disabled
+
+    def start(self):
+        task_supervisor.add("progress_updater", self._run_once, PROGRESS_TICK, jitter=0)
+
+    async def _run_once(self):
+        now = time.monotonic()
+        # إعادة ملء الدلو بحسب الزمن المنقضي
+        self.tokens = min(
+            float(PROGRESS_EDITS_PER_SECOND),
+            self.tokens + (now - self._last) * PROGRESS_EDITS_PER_SECOND
+        )
+        self._last = now
+        await self._tick(now)
+
+    async def _tick(self, now: float):
+        active = set(await get_active_chats())
+
+        # إزالة المحادثات المنتهية وجدولة الجديدة بإزاحة عشوائية لتوزيع الحمل
+        for chat_id in list(self.due):
+            if chat_id not in active:
+                self.due.pop(chat_id, None)
+                self.last_label.pop(chat_id, None)
+                self.backoff.pop(chat_id, None)
+        self.disabled &= active
+        for chat_id in active:
+            if chat_id not in self.due and chat_id not in self.disabled:
+                # الإعداد المحفوظ يُقرأ مرة واحدة عند بدء التشغيل في المحادثة
+                if not await is_progress_enabled(chat_id):
+                    self.disabled.add(chat_id)
+                    continue
+                self.due[chat_id] = now + random.uniform(0, PROGRESS_INTERVAL)
+
+        ready = sorted(
+            (due, chat_id) for chat_id, due in self.due.items() if due <= now
+        )
+        for _, chat_id in ready:
+            if self.tokens < 1:
+                break
+            await self._update(chat_id, now)
+
+    async def _update(self, chat_id: int, now: float):
+        self.due[chat_id] = now + PROGRESS_INTERVAL
+        playing = db.get(chat_id)
+        if not playing or not await is_music_playing(chat_id):
+            return
+        entry = playing[0]
+        if not int(entry.get("seconds") or 0):
+            return
+        mystic = entry.get("mystic")
+        if mystic is None:
+            return
+
+        played = seconds_to_min(clock.played(entry))
+        label = f"{id(mystic)}:{played}"
+        if self.last_label.get(chat_id) == label:
+            # القيمة المعروضة لم تتغير - لا داعي للتعديل
+            self.stats['skipped'] += 1
+            return
+
+        try:
+            _ = get_string(await get_lang(chat_id))
+        except:
+            _ = get_string("en")
+
+        self.tokens -= 1
+        try:
+            buttons = stream_markup_timer(_, chat_id, played, entry["dur"])
+            await mystic.edit_reply_markup(reply_markup=InlineKeyboardMarkup(buttons))
+            self.last_label[chat_id] = label
+            self.backoff.pop(chat_id, None)
+            self.stats['edits'] += 1
+        except FloodWait as e:
+            # تأخير هذه المحادثة فقط بالمدة التي طلبها تيليجرام
+            self.stats['flood_waits'] += 1
+            self.due[chat_id] = now + int(getattr(e, "value", PROGRESS_INTERVAL)) + PROGRESS_INTERVAL
+        except Exception:
+            self.stats['errors'] += 1
+            delay = min(self.backoff.get(chat_id, PROGRESS_INTERVAL) * 2, PROGRESS_MAX_BACKOFF)
+            self.backoff[chat_id] = delay
+            self.due[chat_id] = now + delay
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            'scheduled_chats': len(self.due),
+            'disabled_chats': len(self.disabled),
+        }
+
+
+progress_updater = ProgressUpdater()
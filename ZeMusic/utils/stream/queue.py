@@ -1,9 +1,265 @@
 import asyncio
-from typing import Union
+import random
+from collections import Counter, deque
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Union
 
+from ZeMusic.logging import LOGGER
+from ZeMusic.core.metrics import metrics
 from ZeMusic.misc import db
 from ZeMusic.utils.formatters import check_duration, seconds_to_min
-from config import autoclean, time_to_seconds
+from ZeMusic.utils.stream import clock
+from ZeMusic.utils.stream.autoclear import release_file, track_file
+from ZeMusic.utils.thumbnails import warm_thumb
+from config import time_to_seconds
+
+
+class QueueItem:
+    """عنصر طابور مضغوط (__slots__) مع واجهة شبيهة بالقاموس للتوافق"""
+
+    __slots__ = (
+        "title", "dur", "streamtype", "by", "user_id", "chat_id", "file",
+        "vidid", "seconds", "played", "started_at", "paused_at",
+        "old_dur", "old_second", "speed_path", "speed", "mystic", "markup",
+    )
+
+    # حقول تُعاد قيمتها None عبر get() إن لم تُضبط
+    _OPTIONAL = ("old_dur", "old_second", "speed_path", "speed", "mystic", "markup")
+
+    def __init__(self, title, dur, streamtype, by, chat_id, file, vidid, seconds, user_id=None):
+        self.title = title
+        self.dur = dur
+        self.streamtype = streamtype
+        self.by = by
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.file = file
+        self.vidid = vidid
+        self.seconds = seconds
+        self.played = 0
+        self.started_at = None
+        self.paused_at = None
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__ if hasattr(self, key)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QueueItem":
+        item = cls(
+            data.get("title"),
+            data.get("dur"),
+            data.get("streamtype"),
+            data.get("by"),
+            data.get("chat_id"),
+            data.get("file"),
+            data.get("vidid"),
+            data.get("seconds", 0),
+            user_id=data.get("user_id"),
+        )
+        for key in cls._OPTIONAL:
+            if data.get(key) is not None:
+                setattr(item, key, data[key])
+        return item
+
+    def __repr__(self):
+        return f"QueueItem({self.vidid!r}, {self.title!r})"
+
+
+class ChatQueue(deque):
+    """طابور محادثة مبني على deque: الإخراج من الرأس O(1)"""
+
+    __slots__ = ()
+
+    def pop(self, index: int = -1):
+        if index == 0:
+            return self.popleft()
+        if index == -1:
+            return super().pop()
+        item = self[index]
+        del self[index]
+        return item
+
+
+def get_queue(chat_id) -> ChatQueue:
+    """إرجاع طابور المحادثة مع إنشائه إن لم يوجد"""
+    queue = db.get(chat_id)
+    if queue is None:
+        queue = db[chat_id] = ChatQueue()
+    return queue
+
+
+class QueueService:
+    """
+    خدمة الطوابير الموحدة: كل تعديل على طوابير المحادثات يمر من هنا
+    ويُبلَّغ للمشتركين (التسخين المسبق، الحفظ، الإحصائيات) من مكان واحد.
+
+    التخزين هو misc.db نفسه، فالقراءة المباشرة منه تبقى صالحة.
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable] = []
+        self.stats = Counter()
+
+    def subscribe(self, callback: Callable):
+        """تسجيل مستمع يُستدعى بـ (chat_id, event, items) عند كل تغيير"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, chat_id, event: str, items=()):
+        self.stats[event] += 1
+        for callback in self._listeners:
+            try:
+                result = callback(chat_id, event, items)
+                if asyncio.iscoroutine(result):
+                    asyncio.create_task(result)
+            except Exception as e:
+                LOGGER(__name__).warning(f"خطأ في مستمع الطابور ({event}): {e}")
+
+    async def enqueue(self, chat_id, item: QueueItem, front: bool = False) -> int:
+        """إضافة عنصر لنهاية الطابور (أو لرأسه) وإرجاع موضعه"""
+        queue = get_queue(chat_id)
+        if front:
+            queue.appendleft(item)
+            position = 0
+        else:
+            queue.append(item)
+            position = len(queue) - 1
+        self._notify(chat_id, "enqueue", (item,))
+        return position
+
+    async def enqueue_many(self, chat_id, items: Iterable[QueueItem], index: Optional[int] = None) -> int:
+        """إضافة عدة عناصر دفعة واحدة في النهاية أو عند الموضع index"""
+        items = list(items)
+        if not items:
+            return 0
+        queue = get_queue(chat_id)
+        if index is None or index >= len(queue):
+            queue.extend(items)
+        else:
+            queue.rotate(-index)
+            queue.extendleft(reversed(items))
+            queue.rotate(index)
+        self._notify(chat_id, "enqueue", items)
+        return len(items)
+
+    async def dequeue(self, chat_id) -> Optional[QueueItem]:
+        """إخراج رأس الطابور"""
+        queue = db.get(chat_id)
+        if not queue:
+            return None
+        item = queue.popleft()
+        self._notify(chat_id, "dequeue", (item,))
+        return item
+
+    async def peek(self, chat_id, count: int = 1) -> List[QueueItem]:
+        """أول count عناصر دون إخراجها"""
+        queue = db.get(chat_id)
+        if not queue:
+            return []
+        return list(islice(queue, count))
+
+    async def move(self, chat_id, source: int, target: int) -> bool:
+        """نقل عنصر من الموضع source إلى الموضع target"""
+        queue = db.get(chat_id)
+        if not queue or not (0 <= source < len(queue)) or not (0 <= target < len(queue)):
+            return False
+        if source != target:
+            item = queue.pop(source)
+            queue.insert(target, item)
+            self._notify(chat_id, "move", (item,))
+        return True
+
+    async def remove(self, chat_id, index: int) -> Optional[QueueItem]:
+        """حذف العنصر عند الموضع index"""
+        queue = db.get(chat_id)
+        if not queue or not (0 <= index < len(queue)):
+            return None
+        item = queue.pop(index)
+        self._notify(chat_id, "remove", (item,))
+        return item
+
+    async def shuffle(self, chat_id, keep_head: bool = True) -> bool:
+        """خلط الطابور مع إبقاء المقطع الحالي في الرأس"""
+        queue = db.get(chat_id)
+        start = 1 if keep_head else 0
+        if not queue or len(queue) <= start:
+            return False
+        items = list(queue)
+        rest = items[start:]
+        random.shuffle(rest)
+        queue.clear()
+        queue.extend(items[:start] + rest)
+        self._notify(chat_id, "shuffle")
+        return True
+
+    async def clear(self, chat_id):
+        """تفريغ طابور المحادثة"""
+        queue = db.get(chat_id)
+        items = tuple(queue) if queue else ()
+        db[chat_id] = ChatQueue()
+        self._notify(chat_id, "clear", items)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            'chats': sum(1 for queue in db.values() if queue),
+            'items': sum(len(queue) for queue in db.values()),
+        }
+
+
+queue_service = QueueService()
+
+QUEUE_CHATS = metrics.gauge("zemusic_queue_chats", "Chats with a non-empty play queue")
+QUEUE_ITEMS = metrics.gauge("zemusic_queue_items", "Tracks queued across all chats")
+QUEUE_EVENTS = metrics.counter("zemusic_queue_events_total", "Queue operations by kind", ["event"])
+
+
+def _collect_queues():
+    stats = queue_service.get_stats()
+    QUEUE_CHATS.set(stats.pop('chats'))
+    QUEUE_ITEMS.set(stats.pop('items'))
+    for event, count in stats.items():
+        QUEUE_EVENTS.labels(event).set(count)
+
+
+metrics.add_collector(_collect_queues)
+
+
+def _on_queue_change(chat_id, event, items):
+    if event == "enqueue":
+        for item in items:
+            track_file(item.file)
+            # تجهيز بطاقة "يتم التشغيل الآن" قبل وصول دور المقطع
+            warm_thumb(item.vidid, title=item.title, duration=item.dur)
+    elif event in ("dequeue", "remove", "clear"):
+        # كل عنصر يخرج من الطابور يحرر مرجع ملفه، أياً كان من أخرجه
+        for item in items:
+            release_file(item.file)
+
+
+queue_service.subscribe(_on_queue_change)
 
 
 async def put_queue(
@@ -23,28 +279,20 @@ async def put_queue(
         duration_in_seconds = time_to_seconds(duration) - 3
     except:
         duration_in_seconds = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "user_id": user_id,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": duration_in_seconds,
-        "played": 0,
-    }
-    if forceplay:
-        check = db.get(chat_id)
-        if check:
-            check.insert(0, put)
-        else:
-            db[chat_id] = []
-            db[chat_id].append(put)
-    else:
-        db[chat_id].append(put)
-    autoclean.append(file)
+    put = QueueItem(
+        title,
+        duration,
+        stream,
+        user,
+        original_chat_id,
+        file,
+        vidid,
+        duration_in_seconds,
+        user_id=user_id,
+    )
+    if await queue_service.enqueue(chat_id, put, front=bool(forceplay)) == 0:
+        # المقطع في رأس الطابور يبدأ تشغيله الآن
+        clock.start(put)
 
 
 async def put_queue_index(
@@ -69,23 +317,16 @@ async def put_queue_index(
             dur = 0
     else:
         dur = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": dur,
-        "played": 0,
-    }
-    if forceplay:
-        check = db.get(chat_id)
-        if check:
-            check.insert(0, put)
-        else:
-            db[chat_id] = []
-            db[chat_id].append(put)
-    else:
-        db[chat_id].append(put)
+    put = QueueItem(
+        title,
+        duration,
+        stream,
+        user,
+        original_chat_id,
+        file,
+        vidid,
+        dur,
+    )
+    if await queue_service.enqueue(chat_id, put, front=bool(forceplay)) == 0:
+        # المقطع في رأس الطابور يبدأ تشغيله الآن
+        clock.start(put)
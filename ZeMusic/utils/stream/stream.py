@@ -13,8 +13,9 @@ from ZeMusic.misc import db
 from ZeMusic.utils.database import add_active_video_chat, is_active_chat
 from ZeMusic.utils.exceptions import AssistantErr
 from ZeMusic.utils.inline import aq_markup, close_markup, stream_markup
+from ZeMusic.utils.media_cache import media_cache
 from ZeMusic.utils.pastebin import ModyBin
-from ZeMusic.utils.stream.queue import put_queue, put_queue_index
+from ZeMusic.utils.stream.queue import put_queue, put_queue_index, queue_service
 from ZeMusic.utils.thumbnails import get_thumb
 
 
@@ -73,7 +74,7 @@ async def stream(
                 msg += f"{_['play_20']} {position}\n\n"
             else:
                 if not forceplay:
-                    db[chat_id] = []
+                    await queue_service.clear(chat_id)
                 status = True if video else None
                 try:
                     file_path, direct = await YouTube.download(
@@ -100,9 +101,10 @@ async def stream(
                     "video" if video else "audio",
                     forceplay=forceplay,
                 )
-                img = await get_thumb(vidid)
+                img = await get_thumb(vidid, title=title, duration=duration_min)
                 button = stream_markup(_, chat_id)
-                run = await app.send_photo(
+                run = await media_cache.send_photo(
+                    app,
                     original_chat_id,
                     photo=img,
                     caption=_["stream_1"].format(
@@ -166,7 +168,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                await queue_service.clear(chat_id)
             await Mody.join_call(
                 chat_id,
                 original_chat_id,
@@ -186,9 +188,10 @@ async def stream(
                 "video" if video else "audio",
                 forceplay=forceplay,
             )
-            img = await get_thumb(vidid)
+            img = await get_thumb(vidid, title=title, duration=duration_min)
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await media_cache.send_photo(
+                app,
                 original_chat_id,
                 photo=img,
                 caption=_["stream_1"].format(
@@ -226,7 +229,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                await queue_service.clear(chat_id)
             await Mody.join_call(chat_id, original_chat_id, file_path, video=None)
             await put_queue(
                 chat_id,
@@ -241,7 +244,8 @@ async def stream(
                 forceplay=forceplay,
             )
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await media_cache.send_photo(
+                app,
                 original_chat_id,
                 photo=config.SOUNCLOUD_IMG_URL,
                 caption=_["stream_1"].format(
@@ -278,7 +282,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                await queue_service.clear(chat_id)
             await Mody.join_call(chat_id, original_chat_id, file_path, video=status)
             await put_queue(
                 chat_id,
@@ -295,7 +299,8 @@ async def stream(
             if video:
                 await add_active_video_chat(chat_id)
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await media_cache.send_photo(
+                app,
                 original_chat_id,
                 photo=config.TELEGRAM_VIDEO_URL if video else config.TELEGRAM_AUDIO_URL,
                 caption=_["stream_1"].format(link, title[:23], duration_min, user_name),
@@ -331,7 +336,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                await queue_service.clear(chat_id)
             n, file_path = await YouTube.video(link)
             if n == 0:
                 raise AssistantErr(_["str_3"])
@@ -354,9 +359,10 @@ async def stream(
                 "video" if video else "audio",
                 forceplay=forceplay,
             )
-            img = await get_thumb(vidid)
+            img = await get_thumb(vidid, title=title, duration=duration_min)
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await media_cache.send_photo(
+                app,
                 original_chat_id,
                 photo=img,
                 caption=_["stream_1"].format(
@@ -392,7 +398,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                await queue_service.clear(chat_id)
             await Mody.join_call(
                 chat_id,
                 original_chat_id,
@@ -411,7 +417,8 @@ async def stream(
                 forceplay=forceplay,
             )
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await media_cache.send_photo(
+                app,
                 original_chat_id,
                 photo=config.STREAM_IMG_URL,
                 caption=_["stream_2"].format(user_name),
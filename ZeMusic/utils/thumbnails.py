@@ -3,14 +3,21 @@ import os
 import random
 import re
 import textwrap
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Dict, Optional
+
 import aiofiles
-import aiohttp
 
 from PIL import (Image, ImageDraw, ImageEnhance, ImageFilter,
                  ImageFont, ImageOps)
 from youtubesearchpython.__future__ import VideosSearch
 import numpy as np
 from config import YOUTUBE_IMG_URL
+from ZeMusic.core.http_client import http_client
+from ZeMusic.logging import LOGGER
 A = "De"
 B = "v : @"
 D = "F"
@@ -19,6 +26,27 @@ V = "A_6"
 DEV = A+B+D+E+V
 YOUTUBE_IMG = "https://telegra.ph/file/f995c36145125aa44bd37.jpg"
 
+# --- إعدادات خدمة الصور المصغرة ---
+THUMB_CACHE_DIR = "cache/thumbs"
+THUMB_CACHE_LIMIT = 500         # الحد الأقصى للبطاقات المحفوظة على القرص
+THUMB_RENDER_WORKERS = 2        # عدد عمليات الرسم المنفصلة
+THUMB_WARMUP_CONCURRENCY = 2    # عدد البطاقات المسبقة التي تُرسم في نفس الوقت
+THUMB_WARMUP_INTERVAL = 600     # الفاصل بين دورات تسخين الأكثر تشغيلاً (ثانية)
+THUMB_WARMUP_TOP = 20           # عدد المقاطع الأكثر تشغيلاً التي تُسخّن
+THUMB_PLAY_TRACK_LIMIT = 1000   # عدد المقاطع التي تُحفظ عداداتها بعد التقليم
+
+os.makedirs(THUMB_CACHE_DIR, exist_ok=True)
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_inflight: Dict[str, asyncio.Future] = {}
+_card_index: Optional["OrderedDict[str, None]"] = None
+_warmup_semaphore: Optional[asyncio.Semaphore] = None
+_play_counts: Counter = Counter()
+_known_meta: Dict[str, tuple] = {}
+
+_VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
 def make_col():
     return (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
 
@@ -43,88 +71,281 @@ def truncate(text):
     text2 = text2.strip()
     return [text1, text2]
 
-async def get_thumb(videoid):
+
+def _clean_title(title: str) -> str:
+    title = re.sub(r"\W+", " ", title)
+    return title.title()
+
+
+# --- دوال الرسم (تعمل داخل عملية منفصلة) ---
+@lru_cache(maxsize=1)
+def _load_fonts():
+    """تحميل الخطوط مرة واحدة لكل عملية"""
+    return (
+        ImageFont.truetype("ZeMusic/assets/font.ttf", 30),
+        ImageFont.truetype("ZeMusic/assets/font2.ttf", 70),
+        ImageFont.truetype("ZeMusic/assets/font2.ttf", 40),
+        ImageFont.truetype("ZeMusic/assets/font2.ttf", 35),
+    )
+
+
+@lru_cache(maxsize=1)
+def _circle_mask():
+    """قناع الدائرة ثابت، لذا يُرسم مرة واحدة لكل عملية"""
+    lum_img = Image.new("L", [720, 720], 0)
+    draw = ImageDraw.Draw(lum_img)
+    draw.pieslice([(0, 0), (720, 720)], 0, 360, fill=255, outline="white")
+    return np.array(lum_img)
+
+
+def _render_card(source_path, output_path, title, duration, views, channel):
+    """رسم بطاقة "يتم التشغيل الآن" وحفظها (دالة متزامنة)"""
+    youtube = Image.open(source_path)
+    image1 = changeImageSize(1280, 720, youtube)
+    image2 = image1.convert("RGBA")
+    background = image2.filter(filter=ImageFilter.BoxBlur(30))
+    enhancer = ImageEnhance.Brightness(background)
+    background = enhancer.enhance(0.6)
+    image2 = background
+
+    # Create circular thumbnail
+    img_arr = np.array(image1.crop((280, 0, 1000, 720)))
+    final_img_arr = np.dstack((img_arr, _circle_mask()))
+    circular_thumb = Image.fromarray(final_img_arr).resize((600, 600))
+
+    image2.paste(circular_thumb, (50, 70), mask=circular_thumb)
+
+    # fonts
+    font1, font2, font3, font4 = _load_fonts()
+
+    image4 = ImageDraw.Draw(image2)
+    image4.text((20, 10), f" {DEV}", fill="white", font=font1, align="left")
+    image4.text((680, 150), "زي ميوزك", fill="white", font=font2, stroke_width=2, stroke_fill="white", align="left")
+
+    # title
+    title1 = truncate(title)
+    image4.text((680, 300), text=title1[0], fill="white", stroke_width=1, stroke_fill="white", font=font3, align="left")
+    image4.text((680, 350), text=title1[1], fill="white", stroke_width=1, stroke_fill="white", font=font3, align="left")
+
+    # description
+    views_text = f"المشاهدات : {views}"
+    duration_text = f"المدة : {duration} دقيقة"
+    channel_text = f"القناة : @F_A_6"
+
+    image4.text((680, 450), text=views_text, fill="white", font=font4, align="left")
+    image4.text((680, 500), text=duration_text, fill="white", font=font4, align="left")
+    image4.text((680, 550), text=channel_text, fill="white", font=font4, align="left")
+
+    image2 = ImageOps.expand(image2, border=6, fill=make_col())
+    image2 = image2.convert("RGB")
+    image2.save(output_path)
+    return output_path
+
+
+# --- إدارة الكاش والعمليات ---
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=THUMB_RENDER_WORKERS)
+    return _render_pool
+
+
+def _card_path(videoid: str) -> str:
+    return f"{THUMB_CACHE_DIR}/{videoid}.jpg"
+
+
+def _get_card_index() -> "OrderedDict[str, None]":
+    """فهرس LRU للبطاقات المحفوظة (يُبنى من القرص عند أول استخدام)"""
+    global _card_index
+    if _card_index is None:
+        _card_index = OrderedDict()
+        entries = []
+        for name in os.listdir(THUMB_CACHE_DIR):
+            if name.endswith(".jpg"):
+                path = os.path.join(THUMB_CACHE_DIR, name)
+                entries.append((os.path.getmtime(path), name[:-4]))
+        for _, videoid in sorted(entries):
+            _card_index[videoid] = None
+    return _card_index
+
+
+def _touch_card(videoid: str):
+    index = _get_card_index()
+    index[videoid] = None
+    index.move_to_end(videoid)
+    while len(index) > THUMB_CACHE_LIMIT:
+        old_id, _ = index.popitem(last=False)
+        path = _card_path(old_id)
+        # مفتاح البطاقة في كاش الوسائط مرتبط بحجمها ووقت تعديلها، فيُنسى معها
+        from ZeMusic.utils.media_cache import media_cache
+        media_cache.forget_file(path)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def get_cached_thumb(videoid: str) -> Optional[str]:
+    """إرجاع مسار البطاقة إن كانت جاهزة مسبقاً"""
+    path = _card_path(videoid)
+    if os.path.isfile(path):
+        _touch_card(videoid)
+        return path
+    return None
+
+
+async def _fetch_metadata(videoid: str) -> Dict[str, str]:
+    """جلب بيانات الفيديو من البحث (فقط عندما لا تتوفر من الطابور)"""
+    meta = {
+        "title": "عنوان غير مدعوم",
+        "duration": "مدة غير معروفة",
+        "views": "مشاهدات غير معروفة",
+        "channel": "قناة غير معروفة",
+    }
+    url = f"https://www.youtube.com/watch?v={videoid}"
+    results = VideosSearch(url, limit=1)
+    for result in (await results.next())["result"]:
+        try:
+            meta["title"] = _clean_title(result["title"])
+        except:
+            pass
+        try:
+            meta["duration"] = result["duration"]
+        except:
+            pass
+        try:
+            meta["views"] = result["viewCount"]["short"]
+        except:
+            pass
+        try:
+            meta["channel"] = result["channel"]["name"]
+        except:
+            pass
+    return meta
+
+
+async def _build_thumb(videoid, title, duration, views, channel):
+    if title and duration:
+        meta = {
+            "title": _clean_title(str(title)),
+            "duration": duration,
+            "views": views or "مشاهدات غير معروفة",
+            "channel": channel or "قناة غير معروفة",
+        }
+    else:
+        meta = await _fetch_metadata(videoid)
+
+    source_path = f"cache/thumb{videoid}.jpg"
+    data = await http_client.fetch_bytes(f"http://img.youtube.com/vi/{videoid}/maxresdefault.jpg")
+    if data:
+        f = await aiofiles.open(source_path, mode="wb")
+        await f.write(data)
+        await f.close()
+
+    output_path = _card_path(videoid)
+    args = (source_path, output_path, meta["title"], meta["duration"], meta["views"], meta["channel"])
+    loop = asyncio.get_running_loop()
     try:
-        if os.path.isfile(f"cache/{videoid}.jpg"):
-            return f"cache/{videoid}.jpg"
-        url = f"https://www.youtube.com/watch?v={videoid}"
-        results = VideosSearch(url, limit=1)
-        for result in (await results.next())["result"]:
-            try:
-                title = result["title"]
-                title = re.sub("\W+", " ", title)
-                title = title.title()
-            except:
-                title = "عنوان غير مدعوم"
-            try:
-                duration = result["duration"]
-            except:
-                duration = "مدة غير معروفة"
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-            try:
-                views = result["viewCount"]["short"]
-            except:
-                views = "مشاهدات غير معروفة"
-            try:
-                channel = result["channel"]["name"]
-            except:
-                channel = "قناة غير معروفة"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://img.youtube.com/vi/{videoid}/maxresdefault.jpg") as resp:
-                if resp.status == 200:
-                    f = await aiofiles.open(f"cache/thumb{videoid}.jpg", mode="wb")
-                    await f.write(await resp.read())
-                    await f.close()
-
-        youtube = Image.open(f"cache/thumb{videoid}.jpg")
-        image1 = changeImageSize(1280, 720, youtube)
-        image2 = image1.convert("RGBA")
-        background = image2.filter(filter=ImageFilter.BoxBlur(30))
-        enhancer = ImageEnhance.Brightness(background)
-        background = enhancer.enhance(0.6)
-        image2 = background
-
-        # Create circular thumbnail
-        lum_img = Image.new("L", [720, 720], 0)
-        draw = ImageDraw.Draw(lum_img)
-        draw.pieslice([(0, 0), (720, 720)], 0, 360, fill=255, outline="white")
-        img_arr = np.array(image1.crop((280, 0, 1000, 720)))
-        lum_img_arr = np.array(lum_img)
-        final_img_arr = np.dstack((img_arr, lum_img_arr))
-        circular_thumb = Image.fromarray(final_img_arr).resize((600, 600))
-
-        image2.paste(circular_thumb, (50, 70), mask=circular_thumb)
-
-        # fonts
-        font1 = ImageFont.truetype("ZeMusic/assets/font.ttf", 30)
-        font2 = ImageFont.truetype("ZeMusic/assets/font2.ttf", 70)
-        font3 = ImageFont.truetype("ZeMusic/assets/font2.ttf", 40)
-        font4 = ImageFont.truetype("ZeMusic/assets/font2.ttf", 35)
-
-        image4 = ImageDraw.Draw(image2)
-        image4.text((20, 10), f" {DEV}", fill="white", font=font1, align="left")
-        image4.text((680, 150), "زي ميوزك", fill="white", font=font2, stroke_width=2, stroke_fill="white", align="left")
-
-        # title
-        title1 = truncate(title)
-        image4.text((680, 300), text=title1[0], fill="white", stroke_width=1, stroke_fill="white", font=font3, align="left")
-        image4.text((680, 350), text=title1[1], fill="white", stroke_width=1, stroke_fill="white", font=font3, align="left")
-
-        # description
-        views_text = f"المشاهدات : {views}"
-        duration_text = f"المدة : {duration} دقيقة"
-        channel_text = f"القناة : @F_A_6"
-
-        image4.text((680, 450), text=views_text, fill="white", font=font4, align="left")
-        image4.text((680, 500), text=duration_text, fill="white", font=font4, align="left")
-        image4.text((680, 550), text=channel_text, fill="white", font=font4, align="left")
-
-        image2 = ImageOps.expand(image2, border=6, fill=make_col())
-        image2 = image2.convert("RGB")
-        image2.save(f"cache/{videoid}.jpg")
-        file = f"cache/{videoid}.jpg"
-        return file
+        await loop.run_in_executor(_get_render_pool(), _render_card, *args)
+    except BrokenProcessPool:
+        # إعادة إنشاء مجموعة العمليات والرسم في خيط كحل احتياطي
+        global _render_pool
+        _render_pool = None
+        await loop.run_in_executor(None, _render_card, *args)
+    finally:
+        try:
+            os.remove(source_path)
+        except OSError:
+            pass
+
+    _touch_card(videoid)
+    return output_path
+
+
+async def get_thumb(videoid, title=None, duration=None, views=None, channel=None):
+    """بطاقة "يتم التشغيل الآن" - تُعاد من الكاش أو تُرسم خارج حلقة الأحداث
+
+    تمرير title و duration من عنصر الطابور يوفر رحلة البحث في يوتيوب.
+    """
+    try:
+        cached = get_cached_thumb(videoid)
+        if cached:
+            return cached
+
+        # مشاركة نفس عملية الرسم بين المحادثات التي تطلب نفس الفيديو
+        future = _inflight.get(videoid)
+        if future is None:
+            future = asyncio.ensure_future(_build_thumb(videoid, title, duration, views, channel))
+            _inflight[videoid] = future
+            future.add_done_callback(lambda _: _inflight.pop(videoid, None))
+        return await asyncio.shield(future)
     except Exception as e:
-        print(e)
+        LOGGER(__name__).warning(f"فشل إنشاء الصورة المصغرة {videoid}: {e}")
         return YOUTUBE_IMG
+
+
+# --- التسخين المسبق للبطاقات ---
+def is_renderable(videoid) -> bool:
+    """هل المعرف لفيديو يوتيوب يمكن رسم بطاقة له؟"""
+    return bool(videoid) and bool(_VIDEO_ID_RE.match(str(videoid)))
+
+
+def record_play(videoid, title=None, duration=None):
+    """تسجيل طلب تشغيل لاستخدامه في تسخين الأكثر تشغيلاً"""
+    if not is_renderable(videoid):
+        return
+    _play_counts[videoid] += 1
+    if title and duration:
+        _known_meta[videoid] = (title, duration)
+    if len(_play_counts) > THUMB_PLAY_TRACK_LIMIT * 2:
+        _trim_play_counts()
+
+
+def _trim_play_counts():
+    """الإبقاء على الأكثر تشغيلاً فقط حتى لا تنمو العدادات طوال عمر العملية"""
+    global _play_counts
+    _play_counts = Counter(dict(_play_counts.most_common(THUMB_PLAY_TRACK_LIMIT)))
+    for videoid in [v for v in _known_meta if v not in _play_counts]:
+        del _known_meta[videoid]
+
+
+async def _warm(videoid, title, duration):
+    global _warmup_semaphore
+    if _warmup_semaphore is None:
+        _warmup_semaphore = asyncio.Semaphore(THUMB_WARMUP_CONCURRENCY)
+    async with _warmup_semaphore:
+        if get_cached_thumb(videoid) or videoid in _inflight:
+            return
+        await get_thumb(videoid, title=title, duration=duration)
+
+
+def warm_thumb(videoid, title=None, duration=None):
+    """جدولة رسم البطاقة في الخلفية قبل أن يصل دور المقطع"""
+    if not is_renderable(videoid):
+        return
+    record_play(videoid, title, duration)
+    if os.path.isfile(_card_path(videoid)) or videoid in _inflight:
+        return
+    try:
+        asyncio.get_running_loop().create_task(_warm(videoid, title, duration))
+    except RuntimeError:
+        pass
+
+
+async def warmup_trending(limit: int = THUMB_WARMUP_TOP):
+    """رسم بطاقات المقاطع الأكثر تشغيلاً التي لم تعد في الكاش"""
+    warmed = 0
+    for videoid, _ in _play_counts.most_common(limit):
+        if os.path.isfile(_card_path(videoid)):
+            continue
+        title, duration = _known_meta.get(videoid, (None, None))
+        await _warm(videoid, title, duration)
+        warmed += 1
+    return warmed
+
+
+async def thumb_warmup_job():
+    """دورة واحدة لتسخين بطاقات المقاطع الرائجة (تُجدول كل THUMB_WARMUP_INTERVAL)"""
+    warmed = await warmup_trending()
+    if warmed:
+        LOGGER(__name__).info(f"🖼️ تم تسخين {warmed} بطاقة مسبقاً")
@@ -0,0 +1,8 @@
+"""
+قياسات أداء تعمل دون اتصال (بدائل محلية لتيليجرام ويوتيوب وبيانات اصطناعية).
+
+    python -m benchmarks                      # كل المجموعات بأحجام 1k,100k
+    python -m benchmarks -s database --sizes 1k,100k,1m
+    python -m benchmarks --save-baseline      # تحديث baselines.json
+    python -m benchmarks.load_sim             # محاكاة حمل بعدد محادثات متصاعد
+"""
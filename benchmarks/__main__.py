@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+from benchmarks.fakes import data_path
+from benchmarks.harness import (
+    BASELINES_PATH, DEFAULT_TOLERANCE, format_results, load_baselines,
+    parse_sizes, regressions, save_baselines,
+)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="قياسات المسارات الساخنة")
+    parser.add_argument("-s", "--suite", action="append", help="مجموعة محددة (يمكن تكرارها)")
+    parser.add_argument("--sizes", default="1k,100k", help="أحجام البيانات: 1k,10k,100k,1m")
+    parser.add_argument("-n", "--iterations", type=int, default=1000, help="تكرارات كل قياس")
+    parser.add_argument("--baseline", default=BASELINES_PATH, help="ملف خطوط الأساس")
+    parser.add_argument("--save-baseline", action="store_true", help="حفظ النتائج كخط أساس")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--fail-on-regression", action="store_true", help="رمز خروج 1 عند أي تراجع")
+    parser.add_argument("-v", "--verbose", action="store_true", help="إبقاء سجلات البوت")
+    return parser.parse_args()
+
+
+async def _run(args) -> int:
+    from benchmarks.hot_paths import SUITES
+
+    sizes = parse_sizes(args.sizes)
+    names = args.suite or list(SUITES)
+    unknown = [n for n in names if n not in SUITES]
+    if unknown:
+        print(f"مجموعات غير معروفة: {', '.join(unknown)} (المتاح: {', '.join(SUITES)})")
+        return 2
+
+    results = []
+    for name in names:
+        print(f"▶ {name}")
+        started = time.perf_counter()
+        try:
+            results.extend(await SUITES[name](sizes, args.iterations))
+        except ImportError as e:
+            print(f"  ⏭ تم التخطي: تبعية غير مثبتة ({e.name or e})")
+            continue
+        print(f"  ✓ {time.perf_counter() - started:.1f}s")
+
+    if not results:
+        return 0
+    baselines = load_baselines(args.baseline)
+    print()
+    print(format_results(results, baselines))
+
+    if args.save_baseline:
+        save_baselines(results, args.baseline)
+        print(f"\n💾 حُفظ خط الأساس في {args.baseline}")
+        return 0
+
+    found = regressions(results, baselines, args.tolerance)
+    if found:
+        print(f"\n⚠️ تراجعات (> {args.tolerance:.0%}):")
+        for line in found:
+            print(f"  • {line}")
+    return 1 if found and args.fail_on_regression else 0
+
+
+def main():
+    args = _parse_args()
+    # المسارات النسبية في البوت (الخطوط، downloads/) تفترض جذر المشروع
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    # قاعدة بيانات مؤقتة للقياسات بدل zemusic.db (يُقرأ عند استيراد config)
+    os.environ.setdefault("DATABASE_PATH", data_path("bench.db"))
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    sys.exit(asyncio.run(_run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+بدائل محلية للخدمات الخارجية (عميل تيليجرام، yt-dlp، بحث يوتيوب) ومولدات
+بيانات اصطناعية لقاعدة البيانات، حتى تعمل القياسات دون شبكة أو حسابات.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import os
+import random
+import sqlite3
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), ".data")
+
+_WORDS = (
+    "حبيبي", "يا", "ليل", "قلبي", "عمري", "سلام", "نور", "بحر", "وطن", "شوق",
+    "love", "night", "remix", "live", "official", "song", "dream", "heart", "fire", "rain",
+)
+_ARTISTS = (
+    "عمرو دياب", "فيروز", "ماجد المهندس", "أم كلثوم", "راشد الماجد",
+    "Adele", "Drake", "Coldplay", "Eminem", "Shakira",
+)
+
+
+def synthetic_tracks(count: int, seed: int = 0) -> Iterator[Tuple[str, str]]:
+    """(عنوان، فنان) حتمية لنفس البذرة، بخليط عربي/إنجليزي كالطلبات الحقيقية"""
+    rng = random.Random(seed)
+    for i in range(count):
+        words = rng.sample(_WORDS, rng.randint(2, 4))
+        yield f"{' '.join(words)} {i}", rng.choice(_ARTISTS)
+
+
+def video_id_for(text: str) -> str:
+    """معرف بطول معرفات يوتيوب (11 حرفاً) مشتق من النص"""
+    return hashlib.sha1(text.encode()).hexdigest()[:11]
+
+
+def data_path(name: str) -> str:
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
+
+
+# ---- بيانات SQLite اصطناعية ----
+
+def _bulk_insert(path: str, sql: str, rows, batch: int = 50_000):
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        while True:
+            chunk = list(itertools.islice(rows, batch))
+            if not chunk:
+                break
+            conn.executemany(sql, chunk)
+            conn.commit()
+    finally:
+        conn.close()
+
+
+def fill_bot_database(path: str, rows: int):
+    """
+    ملء جداول DatabaseManager (إعدادات المحادثات، المستخدمين، الحالات المؤقتة)
+    بـ rows صف لكل جدول. يفترض أن المخطط أُنشئ مسبقاً.
+    """
+    languages = ("ar", "en", "tr")
+    _bulk_insert(
+        path,
+        "INSERT OR IGNORE INTO chat_settings (chat_id, language, play_mode, upvote_count) VALUES (?, ?, ?, ?)",
+        ((-(1_000_000 + i), languages[i % 3], "Direct" if i % 2 else "Inline", 3) for i in range(rows)),
+    )
+    _bulk_insert(
+        path,
+        "INSERT OR IGNORE INTO users (user_id, first_name, username) VALUES (?, ?, ?)",
+        ((10_000 + i, f"user{i}", f"u{i}") for i in range(rows)),
+    )
+    _bulk_insert(
+        path,
+        "INSERT OR IGNORE INTO temp_states (key, value) VALUES (?, ?)",
+        ((f"skipmode_{-(1_000_000 + i)}", "true") for i in range(0, rows, 2)),
+    )
+
+
+def fill_channel_index(path: str, rows: int, normalize: Callable[[str], str],
+                       search_hash: Callable[[str], str]):
+    """ملء فهرس قناة التخزين الذكي بمقاطع اصطناعية بنفس دوال التطبيع والهاش"""
+    def generate():
+        for i, (title, artist) in enumerate(synthetic_tracks(rows)):
+            normalized = normalize(title)
+            yield (
+                i + 1, f"file_{i}", search_hash(normalized), normalized,
+                normalize(artist), f"{normalized} {normalize(artist)}", title, artist, 200,
+            )
+
+    _bulk_insert(
+        path,
+        "INSERT OR IGNORE INTO channel_index (message_id, file_id, search_hash, title_normalized, "
+        "artist_normalized, keywords_vector, original_title, original_artist, duration) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        generate(),
+    )
+
+
+# ---- عميل تيليجرام ----
+
+class FakeMessage:
+    """رسالة مرسلة عبر العميل البديل؛ التعديل والحذف يمران بنفس تأخير الشبكة"""
+
+    def __init__(self, client: "FakeTelegramClient", chat_id, message_id: int, text: str = ""):
+        self._client = client
+        self.id = message_id
+        self.chat = SimpleNamespace(id=chat_id, title=f"chat {chat_id}", username=None)
+        self.text = text
+        self.photo = SimpleNamespace(file_id=f"photo_{message_id}")
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            await self._client._roundtrip(f"message.{name}")
+            return self
+        return method
+
+
+class FakeTelegramClient:
+    """
+    بديل لعميل البوت في TDLib: نفس واجهة bot_client (client.call_method،
+    send_message...) مع تأخير شبكة مصطنع وعدّ لكل طلب.
+    """
+
+    def __init__(self, latency: float = 0.0, username: str = "ZeMusicBot"):
+        self.latency = latency
+        self.username = username
+        self.is_connected = True
+        self.client = self
+        self.calls = Counter()
+        self._message_ids = itertools.count(1)
+
+    async def _roundtrip(self, method: str):
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def call_method(self, method: str, params: Dict = None) -> Dict:
+        params = params or {}
+        await self._roundtrip(method)
+        if method == "getUser":
+            return {"@type": "user", "id": params.get("user_id"), "first_name": "User"}
+        if method == "getChatMember":
+            return {"@type": "chatMember", "status": {"@type": "chatMemberStatusMember"}}
+        return {"@type": "message", "id": next(self._message_ids), "chat_id": params.get("chat_id")}
+
+    async def send_message(self, chat_id=None, text="", **kwargs) -> FakeMessage:
+        await self._roundtrip("sendMessage")
+        return FakeMessage(self, chat_id, next(self._message_ids), text)
+
+    async def get_chat_member(self, chat_id, user_id):
+        await self._roundtrip("getChatMember")
+        return SimpleNamespace(status="member", user=SimpleNamespace(id=user_id))
+
+    @property
+    def mention(self) -> str:
+        return f"@{self.username}"
+
+    def __getattr__(self, name):
+        # أي طريقة أخرى (send_photo، edit_message...) تُسجل وتُرجع رسالة
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def method(*args, chat_id=None, **kwargs):
+            await self._roundtrip(name)
+            return FakeMessage(self, chat_id if chat_id is not None else (args[0] if args else None),
+                               next(self._message_ids))
+        return method
+
+
+# ---- المكالمات الصوتية ----
+
+class FakeTgCalls:
+    """بديل PyTgCalls لمساعد واحد: يتتبع المكالمات النشطة دون صوت فعلي"""
+
+    def __init__(self, assistant_id: int, latency: float = 0.0, participants: int = 3):
+        self.assistant_id = assistant_id
+        self.latency = latency
+        self.participants = participants
+        self.active: Dict[int, object] = {}
+        self.calls = Counter()
+
+    async def _roundtrip(self, method: str):
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def join_group_call(self, chat_id, stream, **kwargs):
+        await self._roundtrip("join_group_call")
+        self.active[chat_id] = stream
+
+    async def change_stream(self, chat_id, stream):
+        await self._roundtrip("change_stream")
+        self.active[chat_id] = stream
+
+    async def leave_group_call(self, chat_id):
+        await self._roundtrip("leave_group_call")
+        self.active.pop(chat_id, None)
+
+    async def get_participants(self, chat_id):
+        await self._roundtrip("get_participants")
+        return [SimpleNamespace(user_id=i) for i in range(self.participants)]
+
+    def __getattr__(self, name):
+        # pause_stream، resume_stream، mute_stream...
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            await self._roundtrip(name)
+        return method
+
+
+# ---- يوتيوب ----
+
+class FakeYouTube:
+    """بديل منصة YouTube (ZeMusic.platforms.Youtube) بما تستخدمه مسارات التشغيل"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.downloads = 0
+
+    async def url(self, message):
+        return None
+
+    async def details(self, link, videoid=None):
+        video_id = video_id_for(str(link))
+        return f"Track {video_id}", "03:20", 200, "https://i.ytimg.com/vi/x/hqdefault.jpg", video_id
+
+    async def download(self, link, mystic=None, video=None, videoid=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.downloads += 1
+        return f"downloads/{str(link)[-11:]}.mp3", True
+
+    async def video(self, link, videoid=None):
+        return 1, f"https://example.invalid/{link}.m3u8"
+
+    def result(self, query: str) -> Dict:
+        """نتيجة بحث بصيغة stream(streamtype="youtube")"""
+        video_id = video_id_for(query)
+        return {
+            "link": f"https://www.youtube.com/watch?v={video_id}",
+            "vidid": video_id,
+            "title": query,
+            "duration_min": "03:20",
+            "thumb": "https://i.ytimg.com/vi/x/hqdefault.jpg",
+        }
+
+
+class FakeYoutubeSearch:
+    """بديل youtube_search.YoutubeSearch بنتيجة حتمية وتأخير مصطنع"""
+
+    latency = 0.0
+
+    def __init__(self, query: str, max_results: int = 1):
+        self.query = query
+        self.max_results = max_results
+
+    def to_dict(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return [{
+            "id": video_id_for(self.query),
+            "title": self.query.title(),
+            "duration": "3:20",
+            "channel": "Fake Channel",
+            "views": "1M",
+        }]
+
+
+class FakeYoutubeDL:
+    """بديل yt_dlp.YoutubeDL: «يحمّل» ملفاً صغيراً باسم المعرف في downloads/"""
+
+    latency = 0.0
+    payload = b"\0" * 1024
+
+    def __init__(self, opts: Dict = None):
+        self.opts = opts or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url: str, download: bool = True) -> Dict:
+        if self.latency:
+            time.sleep(self.latency)
+        video_id = url.rstrip("/").rsplit("/", 1)[-1].split("=")[-1][:11]
+        if download:
+            os.makedirs("downloads", exist_ok=True)
+            with open(f"downloads/{video_id}.mp3", "wb") as f:
+                f.write(self.payload)
+        return {"id": video_id, "title": f"Track {video_id}", "uploader": "Fake", "duration": 200}
@@ -0,0 +1,145 @@
+"""
+أدوات القياس المشتركة: تشغيل دالة غير متزامنة N مرة (مع تزامن اختياري)،
+حساب الإنتاجية و p50/p99، وحفظ خطوط الأساس ومقارنتها.
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_TOLERANCE = 0.25   # تراجع أكبر من 25% في p50 أو الإنتاجية يُعدّ تراجعاً
+WARMUP_RATIO = 0.05        # نسبة التكرارات التي تُستبعد للإحماء
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def parse_sizes(spec: str) -> List[str]:
+    names = [s.strip().lower() for s in spec.split(",") if s.strip()]
+    unknown = [s for s in names if s not in SIZES]
+    if unknown:
+        raise ValueError(f"أحجام غير معروفة: {', '.join(unknown)} (المتاح: {', '.join(SIZES)})")
+    return names
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+@dataclass
+class BenchResult:
+    """نتيجة قياس واحد (الأزمنة بالثواني)"""
+    name: str
+    latencies: List[float] = field(repr=False)
+    wall: float
+    error: Optional[str] = None
+
+    @property
+    def ops(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        return self.ops / self.wall if self.wall > 0 else 0.0
+
+    def quantile(self, q: float) -> float:
+        return percentile(sorted(self.latencies), q)
+
+    def to_dict(self) -> Dict:
+        ordered = sorted(self.latencies)
+        return {
+            'ops': self.ops,
+            'throughput': round(self.throughput, 1),
+            'p50_ms': round(percentile(ordered, 0.5) * 1000, 4),
+            'p99_ms': round(percentile(ordered, 0.99) * 1000, 4),
+            'max_ms': round(ordered[-1] * 1000, 4) if ordered else 0.0,
+        }
+
+
+async def measure(name: str, func: Callable[[int], Awaitable], *, iterations: int,
+                  concurrency: int = 1) -> BenchResult:
+    """
+    تشغيل func(i) لـ iterations مرة عبر concurrency عامل، بعد إحماء قصير
+    لا يدخل في النتيجة. أي استثناء يوقف القياس ويُسجل في النتيجة.
+    """
+    for i in range(max(1, int(iterations * WARMUP_RATIO))):
+        await func(i)
+
+    latencies: List[float] = []
+    counter = iter(range(iterations))
+
+    async def worker():
+        for i in counter:
+            started = time.perf_counter()
+            await func(i)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    except Exception as e:
+        return BenchResult(name, latencies, time.perf_counter() - started, error=f"{type(e).__name__}: {e}")
+    return BenchResult(name, latencies, time.perf_counter() - started)
+
+
+# ---- خطوط الأساس ----
+
+def load_baselines(path: str = BASELINES_PATH) -> Dict[str, Dict]:
+    try:
+        with open(path, encoding="utf8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baselines(results: List[BenchResult], path: str = BASELINES_PATH):
+    """دمج النتائج الحالية في ملف خطوط الأساس (تُستبدل المفاتيح المقاسة فقط)"""
+    baselines = load_baselines(path)
+    for result in results:
+        if not result.error:
+            baselines[result.name] = result.to_dict()
+    with open(path, "w", encoding="utf8") as f:
+        json.dump(dict(sorted(baselines.items())), f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def regressions(results: List[BenchResult], baselines: Dict[str, Dict],
+                tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """وصف نصي لكل قياس تراجع عن خط أساسه بأكثر من tolerance"""
+    found = []
+    for result in results:
+        base = baselines.get(result.name)
+        if not base or result.error:
+            continue
+        now = result.to_dict()
+        if base['p50_ms'] and now['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+            found.append(f"{result.name}: p50 {base['p50_ms']}ms → {now['p50_ms']}ms")
+        if base['throughput'] and now['throughput'] < base['throughput'] * (1 - tolerance):
+            found.append(f"{result.name}: throughput {base['throughput']}/s → {now['throughput']}/s")
+    return found
+
+
+def format_results(results: List[BenchResult], baselines: Dict[str, Dict] = None) -> str:
+    baselines = baselines or {}
+    width = max([len(r.name) for r in results] + [9])
+    lines = [f"{'benchmark':<{width}}  {'ops':>8}  {'ops/s':>11}  {'p50 ms':>10}  {'p99 ms':>10}  {'vs base':>8}"]
+    for result in results:
+        if result.error:
+            lines.append(f"{result.name:<{width}}  ✗ {result.error}")
+            continue
+        now = result.to_dict()
+        base = baselines.get(result.name)
+        delta = ""
+        if base and base.get('p50_ms'):
+            delta = f"{(now['p50_ms'] / base['p50_ms'] - 1) * 100:+.0f}%"
+        lines.append(
+            f"{result.name:<{width}}  {now['ops']:>8}  {now['throughput']:>11,.1f}  "
+            f"{now['p50_ms']:>10.4f}  {now['p99_ms']:>10.4f}  {delta:>8}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,261 @@
+"""
+قياسات المسارات الساخنة: DatabaseManager، بحث الكاش الخاطف، تطبيع النص،
+الطوابير، بطاقات get_thumb، ومسار التحميل الكامل ببدائل yt-dlp والبحث.
+
+كل مجموعة تُرجع قائمة BenchResult، وما يتعذر استيراده يُتخطى مع ذكر السبب.
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import types
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.fakes import (
+    FakeYoutubeDL, FakeYoutubeSearch, data_path, fill_bot_database,
+    fill_channel_index, synthetic_tracks,
+)
+from benchmarks.harness import SIZES, BenchResult, measure
+
+SAMPLE_SIZE = 2_000          # عدد المفاتيح العشوائية المستخدمة في كل قياس
+SCAN_ITERATIONS_CAP = 50     # حد تكرارات الاستعلامات التي تمسح الجدول كاملاً
+WARM_KEYS = 100              # محادثات تُحمّل مسبقاً في الكاش لقياس المسار الدافئ
+
+
+@contextmanager
+def patched(target, **attrs):
+    """استبدال خصائص وحدة/كائن مؤقتاً ثم إرجاعها"""
+    saved = {name: getattr(target, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(target, name, value)
+    try:
+        yield target
+    finally:
+        for name, value in saved.items():
+            setattr(target, name, value)
+
+
+def _row_count(path: str, table: str) -> int:
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return 0
+
+
+# ---- قاعدة البيانات ----
+
+async def bench_database(sizes: List[str], iterations: int) -> List[BenchResult]:
+    from ZeMusic.core.database import DatabaseManager
+
+    results = []
+    for size in sizes:
+        rows = SIZES[size]
+        path = data_path(f"bot_{size}.db")
+        cold = DatabaseManager(path)
+        if _row_count(path, "chat_settings") < rows:
+            print(f"  … توليد {rows:,} صف لقاعدة البوت")
+            fill_bot_database(path, rows)
+        cold.cache_enabled = False
+        warm = DatabaseManager(path)
+
+        rng = random.Random(size)
+        chats = [-(1_000_000 + rng.randrange(rows)) for _ in range(SAMPLE_SIZE)]
+        users = [10_000 + rng.randrange(rows) for _ in range(SAMPLE_SIZE)]
+        keys = lambda chat: ["maintenance_mode", f"channelconnect_{chat}",
+                             f"nonadmin_{chat}", f"skipmode_{chat}"]
+
+        hot = chats[:WARM_KEYS]
+        for chat_id in hot:
+            await warm.get_chat_settings(chat_id)
+
+        cases: Dict[str, Callable[[int], Awaitable]] = {
+            "chat_settings.cold": lambda i: cold.get_chat_settings(chats[i % SAMPLE_SIZE]),
+            "chat_settings.warm": lambda i: warm.get_chat_settings(hot[i % WARM_KEYS]),
+            "chat_snapshot.cold": lambda i: cold.get_chat_snapshot(chats[i % SAMPLE_SIZE], keys(chats[i % SAMPLE_SIZE])),
+            "temp_state.cold": lambda i: cold.get_temp_state(f"skipmode_{chats[i % SAMPLE_SIZE]}"),
+            "is_banned": lambda i: cold.is_banned(users[i % SAMPLE_SIZE]),
+        }
+        for name, func in cases.items():
+            results.append(await measure(f"db.{name}[{size}]", func, iterations=iterations))
+        # تنافس العمال على قفل الاتصال الواحد
+        results.append(await measure(
+            f"db.chat_snapshot.cold.c16[{size}]", cases["chat_snapshot.cold"],
+            iterations=iterations, concurrency=16,
+        ))
+    return results
+
+
+# ---- بحث الكاش الخاطف ----
+
+async def bench_search_cache(sizes: List[str], iterations: int) -> List[BenchResult]:
+    from ZeMusic.plugins.play import download
+
+    downloader = download.downloader
+    results = []
+    for size in sizes:
+        rows = SIZES[size]
+        path = data_path(f"channel_index_{size}.db")
+        with patched(download, DB_FILE=path):
+            download.init_database()
+            if _row_count(path, "channel_index") < rows:
+                print(f"  … توليد {rows:,} صف لفهرس القناة")
+                fill_channel_index(path, rows, downloader.normalize_text,
+                                   downloader.create_search_hash)
+
+            rng = random.Random(size)
+            wanted = set(rng.sample(range(rows), min(SAMPLE_SIZE, rows)))
+            hits = [title for i, (title, _) in enumerate(synthetic_tracks(rows)) if i in wanted]
+            rng.shuffle(hits)
+
+            results.append(await measure(
+                f"search_cache.hit[{size}]",
+                lambda i: downloader.lightning_search_cache(hits[i % len(hits)]),
+                iterations=iterations,
+            ))
+            # عدم التطابق ينزل إلى LIKE '%...%' أي مسح الجدول كاملاً
+            results.append(await measure(
+                f"search_cache.miss[{size}]",
+                lambda i: downloader.lightning_search_cache(f"غير موجود {i}"),
+                iterations=min(iterations, SCAN_ITERATIONS_CAP),
+            ))
+    return results
+
+
+# ---- تطبيع النص ----
+
+async def bench_normalize(sizes: List[str], iterations: int) -> List[BenchResult]:
+    from ZeMusic.plugins.play.download import downloader
+
+    titles = [f"{title} - {artist}" for title, artist in synthetic_tracks(SAMPLE_SIZE)]
+
+    async def normalize(i):
+        downloader.normalize_text(titles[i % SAMPLE_SIZE])
+
+    async def search_hash(i):
+        downloader.create_search_hash(titles[i % SAMPLE_SIZE])
+
+    return [
+        await measure("normalize_text", normalize, iterations=iterations * 10),
+        await measure("create_search_hash", search_hash, iterations=iterations * 10),
+    ]
+
+
+# ---- الطوابير ----
+
+async def bench_queue(sizes: List[str], iterations: int) -> List[BenchResult]:
+    from ZeMusic.misc import db as queues
+    from ZeMusic.utils.stream.queue import QueueItem, put_queue, queue_service
+
+    chats = [-(2_000_000 + i) for i in range(500)]
+
+    async def enqueue(i):
+        chat_id = chats[i % len(chats)]
+        # المعرف "telegram" لا يطلب تسخين بطاقة من الشبكة
+        await put_queue(chat_id, chat_id, f"downloads/bench_{i}.mp3", f"track {i}",
+                        "03:20", "bench", "telegram", 1, "audio")
+
+    async def cycle(i):
+        chat_id = chats[i % len(chats)]
+        await queue_service.enqueue(chat_id, QueueItem(
+            f"track {i}", "03:20", "audio", "bench", chat_id, "downloads/x.mp3", "telegram", 200))
+        await queue_service.dequeue(chat_id)
+
+    async def peek(i):
+        await queue_service.peek(chats[i % len(chats)], 5)
+
+    try:
+        return [
+            await measure("queue.put_queue", enqueue, iterations=iterations),
+            await measure("queue.enqueue_dequeue", cycle, iterations=iterations),
+            await measure("queue.peek5", peek, iterations=iterations),
+        ]
+    finally:
+        for chat_id in chats:
+            queues.pop(chat_id, None)
+
+
+# ---- بطاقات التشغيل ----
+
+class _FakeHTTP:
+    """بديل http_client.fetch_bytes يُرجع صورة مصغرة محلية"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def fetch_bytes(self, url, **kwargs):
+        return self.data
+
+
+async def bench_thumbnails(sizes: List[str], iterations: int) -> List[BenchResult]:
+    from io import BytesIO
+
+    from PIL import Image
+
+    from ZeMusic.utils import thumbnails
+
+    cache_dir = data_path("thumbs")
+    os.makedirs(cache_dir, exist_ok=True)
+    buffer = BytesIO()
+    Image.new("RGB", (1280, 720), (40, 90, 160)).save(buffer, "JPEG")
+    source = data_path("thumb_source.jpg")
+    with open(source, "wb") as f:
+        f.write(buffer.getvalue())
+
+    render_iterations = max(5, iterations // 50)
+    with patched(thumbnails, THUMB_CACHE_DIR=cache_dir, _card_index=None,
+                 http_client=_FakeHTTP(buffer.getvalue())):
+        async def render(i):
+            await asyncio.get_running_loop().run_in_executor(
+                None, thumbnails._render_card, source, os.path.join(cache_dir, "render.jpg"),
+                "Benchmark Track", "3:20", "1M", "bench",
+            )
+
+        async def build(i):
+            await thumbnails.get_thumb(f"bench{i:06d}", title="Benchmark Track", duration="3:20")
+
+        async def cached(i):
+            await thumbnails.get_thumb(f"bench{i % render_iterations:06d}")
+
+        return [
+            await measure("thumb.render", render, iterations=render_iterations),
+            await measure("thumb.get_thumb.build", build, iterations=render_iterations),
+            await measure("thumb.get_thumb.cached", cached, iterations=iterations),
+        ]
+
+
+# ---- مسار التحميل الكامل ----
+
+async def bench_downloader(sizes: List[str], iterations: int) -> List[BenchResult]:
+    from ZeMusic.plugins.play import download
+
+    path = data_path(f"channel_index_{sizes[0]}.db")
+    fakes = dict(
+        DB_FILE=path, YoutubeSearch=FakeYoutubeSearch,
+        yt_dlp=types.SimpleNamespace(YoutubeDL=FakeYoutubeDL),
+        API_KEYS_CYCLE=None, INVIDIOUS_CYCLE=None, COOKIES_CYCLE=None, SMART_CACHE_CHANNEL=None,
+    )
+    with patched(download, **fakes):
+        download.init_database()
+        return [
+            await measure(
+                "downloader.hyper_download.miss",
+                lambda i: download.downloader.hyper_download(f"bench query {i}"),
+                iterations=max(10, iterations // 10), concurrency=8,
+            ),
+        ]
+
+
+SUITES: Dict[str, Callable[[List[str], int], Awaitable[List[BenchResult]]]] = {
+    "database": bench_database,
+    "search_cache": bench_search_cache,
+    "normalize": bench_normalize,
+    "queue": bench_queue,
+    "thumbnails": bench_thumbnails,
+    "downloader": bench_downloader,
+}
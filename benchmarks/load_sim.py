@@ -0,0 +1,620 @@
+"""
+محاكاة حمل: تدفق تحديثات TDLib (تشغيل، تخطي، إيقاف، أزرار، كلام عادي) من
+آلاف المحادثات عبر مسار الأوامر الحقيقي، مع بدائل لعميل البوت وPyTgCalls ويوتيوب.
+يقيس زمن كل عملية من لحظة وصولها المفترضة حتى انتهائها، وتأخر حلقة الأحداث
+ونمو الذاكرة، ويرفع عدد المحادثات مرحلة بعد مرحلة حتى يُكسر حد الخدمة.
+
+    python -m benchmarks.load_sim --chats 100,500,2000 --duration 20
+    python -m benchmarks.load_sim --path stream --chats 200,1000
+    python -m benchmarks.load_sim --chats 1000 --record updates.jsonl
+    python -m benchmarks.load_sim --replay updates.jsonl --speed 2
+
+--path pipeline: كل تحديث يمر عبر TDLibCommandHandler كما يصل من TDLib.
+--path stream: التشغيل عبر PlayWrapper ثم stream()، والتخطي عبر Call.change_stream،
+               وبقية التحديثات عبر TDLibCommandHandler.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from benchmarks.fakes import (
+    FakeMessage, FakeTelegramClient, FakeTgCalls, FakeYouTube, data_path, synthetic_tracks,
+)
+from benchmarks.harness import BenchResult, format_results, percentile
+from benchmarks.hot_paths import patched
+
+DEFAULT_MIX = {
+    "play": 0.15, "skip": 0.08, "pause": 0.04, "resume": 0.04,
+    "queue": 0.04, "callback": 0.10, "chatter": 0.55,
+}
+COMMAND_OPS = ("play", "skip", "pause", "resume", "queue")
+CALLBACK_DATA = ("stats_main", "stats_refresh")
+CHAT_BASE = -3_000_000       # معرفات مجموعات المحاكاة (بعيدة عن بيانات القياسات الأخرى)
+USER_BASE = 50_000
+DRAIN_TIMEOUT = 30.0         # انتظار العمليات المعلقة بعد آخر تحديث في المرحلة
+MEMORY_SAMPLE_INTERVAL = 1.0
+ERROR_SAMPLES = 3            # أمثلة الأخطاء المحفوظة لكل عملية
+
+Event = Tuple[float, Dict]   # (ثانية الوصول من بداية المرحلة، تحديث TDLib)
+
+
+@dataclass
+class Scenario:
+    """وصف الحمل الاصطناعي لمرحلة واحدة"""
+    chats: int
+    duration: float = 20.0
+    rate: float = 0.05               # تحديثات لكل محادثة في الثانية
+    users_per_chat: int = 20
+    mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: int = 0
+
+
+@dataclass
+class SLO:
+    """حدود الخدمة التي يُعد تجاوزها انهياراً"""
+    p99_ms: float = 2000.0
+    loop_lag_ms: float = 250.0
+    error_rate: float = 0.01
+    max_behind: float = 1.0          # أقصى تأخر لموزع التحديثات عن جدوله
+
+
+# ---- التحديثات ----
+
+def message_update(chat_id: int, user_id: int, message_id: int, text: str) -> Dict:
+    return {
+        '@type': 'updateNewMessage',
+        'message': {
+            'id': message_id,
+            'chat_id': chat_id,
+            'sender_id': {'@type': 'messageSenderUser', 'user_id': user_id},
+            'content': {'@type': 'messageText', 'text': {'@type': 'formattedText', 'text': text}},
+        },
+    }
+
+
+def callback_update(chat_id: int, user_id: int, message_id: int, data: str) -> Dict:
+    return {
+        '@type': 'updateNewCallbackQuery',
+        'callback_query': {
+            'id': str(message_id),
+            'data': data,
+            'sender_user_id': user_id,
+            'message': {'id': message_id, 'chat_id': chat_id},
+        },
+    }
+
+
+def classify(update: Dict) -> Tuple[str, int, int, str]:
+    """(العملية، المحادثة، المستخدم، النص أو بيانات الزر) لتحديث TDLib"""
+    if update.get('@type') == 'updateNewCallbackQuery':
+        query = update.get('callback_query', {})
+        return "callback", query.get('message', {}).get('chat_id'), query.get('sender_user_id'), query.get('data', '')
+    message = update.get('message', {})
+    text = message.get('content', {}).get('text', {}).get('text', '')
+    chat_id = message.get('chat_id')
+    user_id = message.get('sender_id', {}).get('user_id')
+    if text.startswith('/'):
+        command = text[1:].split(None, 1)[0].split('@', 1)[0].lower() if len(text) > 1 else ""
+        return (command if command in COMMAND_OPS else "command"), chat_id, user_id, text
+    return "chatter", chat_id, user_id, text
+
+
+def synthetic_updates(scenario: Scenario) -> Iterator[Event]:
+    """
+    وصول بوسون بمعدل chats × rate: كل تحديث لمحادثة عشوائية ومستخدم عشوائي
+    منها، والعملية حسب أوزان mix. حتمي لنفس البذرة.
+    """
+    rng = random.Random(scenario.seed)
+    ops, weights = zip(*scenario.mix.items())
+    queries = [f"{title} {artist}" for title, artist in synthetic_tracks(1_000, scenario.seed)]
+    message_ids = itertools.count(1)
+    total_rate = scenario.chats * scenario.rate
+    at = rng.expovariate(total_rate)
+    while at < scenario.duration:
+        index = rng.randrange(scenario.chats)
+        chat_id = CHAT_BASE - index
+        user_id = USER_BASE + index * scenario.users_per_chat + rng.randrange(scenario.users_per_chat)
+        op = rng.choices(ops, weights)[0]
+        message_id = next(message_ids)
+        if op == "callback":
+            update = callback_update(chat_id, user_id, message_id, rng.choice(CALLBACK_DATA))
+        elif op == "play":
+            update = message_update(chat_id, user_id, message_id, f"/play {rng.choice(queries)}")
+        elif op in COMMAND_OPS:
+            update = message_update(chat_id, user_id, message_id, f"/{op}")
+        else:
+            update = message_update(chat_id, user_id, message_id, rng.choice(queries))
+        yield at, update
+        at += rng.expovariate(total_rate)
+
+
+def load_updates(path: str) -> List[Event]:
+    """تدفق مسجل: سطر JSON لكل تحديث {"at": ثوانٍ من البداية، "update": {...}}"""
+    events = []
+    with open(path, encoding="utf8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                events.append((float(record["at"]), record["update"]))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def save_updates(events: List[Event], path: str):
+    with open(path, "w", encoding="utf8") as f:
+        for at, update in events:
+            f.write(json.dumps({"at": round(at, 4), "update": update}, ensure_ascii=False))
+            f.write("\n")
+
+
+# ---- المسارات ----
+
+class PipelineDriver:
+    """كل تحديث يمر عبر TDLibCommandHandler مع عميل بوت بديل"""
+
+    name = "pipeline"
+
+    def __init__(self, client: FakeTelegramClient):
+        self.client = client
+
+    def install(self, stack: ExitStack):
+        from ZeMusic.core.command_handler import tdlib_command_handler
+        from ZeMusic.core.tdlib_client import tdlib_manager
+
+        self.handler = tdlib_command_handler
+        # bot_client لا يُعيَّن قبل اتصال البوت فعلياً
+        previous = getattr(tdlib_manager, "bot_client", None)
+        tdlib_manager.bot_client = self.client
+        stack.callback(setattr, tdlib_manager, "bot_client", previous)
+
+    async def handle(self, op: str, update: Dict, chat_id: int, user_id: int, payload: str):
+        if op == "callback":
+            await self.handler.handle_callback_query(update)
+        else:
+            await self.handler.handle_message(update)
+
+    def cleanup(self, chat_ids):
+        pass
+
+
+class StreamDriver(PipelineDriver):
+    """
+    التشغيل عبر PlayWrapper → stream()، والتخطي عبر Call.change_stream مع PyTgCalls
+    بديل لكل مساعد؛ بقية التحديثات عبر مسار الأوامر.
+    """
+
+    name = "stream"
+
+    def __init__(self, client: FakeTelegramClient, assistants: int, calls_latency: float,
+                 download_latency: float):
+        super().__init__(client)
+        self.youtube = FakeYouTube(download_latency)
+        self.tgcalls = {aid: FakeTgCalls(aid, calls_latency) for aid in range(1, assistants + 1)}
+
+    def install(self, stack: ExitStack):
+        super().install(stack)
+        from ZeMusic.core import call
+        from ZeMusic.core.assistant_scheduler import assistant_scheduler
+        from ZeMusic.utils.decorators import play
+        from ZeMusic.utils.decorators.play import PlayWrapper
+        from ZeMusic.utils.stream import stream as stream_module
+
+        async def get_tgcalls(assistant_id):
+            return self.tgcalls.get(assistant_id) or self.tgcalls[1]
+
+        async def get_thumb(videoid, **kwargs):
+            return f"https://i.ytimg.com/vi/{videoid}/hqdefault.jpg"
+
+        for module in (call, stream_module, play):
+            stack.enter_context(patched(module, app=self.client, YouTube=self.youtube))
+        for module in (call, stream_module):
+            stack.enter_context(patched(module, get_thumb=get_thumb))
+        stack.enter_context(patched(call.Mody, get_tgcalls=get_tgcalls))
+
+        for aid in self.tgcalls:
+            assistant_scheduler.register(aid)
+        stack.callback(lambda: [assistant_scheduler.unregister(aid) for aid in self.tgcalls])
+
+        self.mody = call.Mody
+        self.stream = stream_module.stream
+        self.play = PlayWrapper(self._play_command)
+
+    async def _play_command(self, client, message, _, chat_id, video, channel, playmode, url, fplay):
+        mystic = await message.reply_text(_["play_1"])
+        query = message.text.split(None, 1)[1]
+        await self.stream(
+            _, mystic, message.from_user.id, self.youtube.result(query), chat_id,
+            message.from_user.first_name, message.chat.id, video=video,
+            streamtype="youtube", forceplay=fplay,
+        )
+
+    def _command_message(self, chat_id: int, user_id: int, text: str) -> FakeMessage:
+        message = FakeMessage(self.client, chat_id, 0, text)
+        message.from_user = SimpleNamespace(id=user_id, first_name=f"user{user_id}",
+                                            mention=f"user{user_id}")
+        message.command = text.lstrip('/').split()
+        message.reply_to_message = None
+        return message
+
+    async def handle(self, op: str, update: Dict, chat_id: int, user_id: int, payload: str):
+        from ZeMusic.utils.database import group_assistant
+
+        if op == "play":
+            await self.play(self.client, self._command_message(chat_id, user_id, payload))
+        elif op == "skip":
+            await self.mody.change_stream(await group_assistant(self.mody, chat_id), chat_id)
+        elif op == "pause":
+            await self.mody.pause_stream(chat_id)
+        elif op == "resume":
+            await self.mody.resume_stream(chat_id)
+        else:
+            await super().handle(op, update, chat_id, user_id, payload)
+
+    def cleanup(self, chat_ids):
+        from ZeMusic.misc import db as queues
+
+        for chat_id in chat_ids:
+            queues.pop(chat_id, None)
+        for calls in self.tgcalls.values():
+            calls.active.clear()
+
+
+# ---- القياس ----
+
+class _ErrorLog(logging.Handler):
+    """عدّ الأخطاء التي تبتلعها المعالجات وتكتفي بتسجيلها"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.counts = Counter()
+
+    def emit(self, record):
+        self.counts[f"{record.name}: {record.getMessage()[:120]}"] += 1
+
+
+@contextmanager
+def capture_errors(quiet: bool):
+    """التقاط سجلات الأخطاء، مع إسكات مخرجات البوت (الطرفية وlog.txt) إن طُلب"""
+    root = logging.getLogger()
+    counter = _ErrorLog()
+    saved = root.handlers[:]
+    if quiet:
+        root.handlers = []
+    root.addHandler(counter)
+    try:
+        yield counter
+    finally:
+        root.removeHandler(counter)
+        if quiet:
+            root.handlers = saved
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass
+class StageResult:
+    label: str
+    chats: int
+    events: int
+    wall: float
+    results: List[BenchResult]
+    errors: Counter
+    error_samples: Dict[str, List[str]]
+    logged_errors: Counter
+    loop: Dict
+    stalls: List[Dict]
+    rss_start: int
+    rss_peak: int
+    rss_end: int
+    traced_peak: int = 0
+    peak_in_flight: int = 0
+    behind: float = 0.0
+    timed_out: int = 0
+
+    @property
+    def latencies(self) -> List[float]:
+        return sorted(itertools.chain.from_iterable(r.latencies for r in self.results))
+
+    @property
+    def error_rate(self) -> float:
+        # الأخطاء التي تبتلعها المعالجات فشلٌ يراه المستخدم أيضاً
+        failed = sum(self.errors.values()) + sum(self.logged_errors.values()) + self.timed_out
+        return min(1.0, failed / self.events) if self.events else 0.0
+
+    def violations(self, slo: SLO) -> List[str]:
+        found = []
+        p99 = percentile(self.latencies, 0.99) * 1000
+        if p99 > slo.p99_ms:
+            found.append(f"p99 {p99:.0f}ms > {slo.p99_ms:.0f}ms")
+        if self.error_rate > slo.error_rate:
+            found.append(f"errors {self.error_rate:.1%} > {slo.error_rate:.1%}")
+        if self.loop.get('p99_ms', 0) > slo.loop_lag_ms:
+            found.append(f"loop lag p99 {self.loop['p99_ms']:.0f}ms > {slo.loop_lag_ms:.0f}ms")
+        if self.behind > slo.max_behind:
+            found.append(f"dispatcher {self.behind:.1f}s behind schedule")
+        return found
+
+    def to_dict(self, slo: SLO) -> Dict:
+        latencies = self.latencies
+        return {
+            'label': self.label,
+            'chats': self.chats,
+            'events': self.events,
+            'events_per_s': round(self.events / self.wall, 1) if self.wall else 0.0,
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'error_rate': round(self.error_rate, 4),
+            'errors': dict(self.errors),
+            'error_samples': self.error_samples,
+            'logged_errors': dict(self.logged_errors.most_common(10)),
+            'loop': self.loop,
+            'stalls': [{k: s[k] for k in ('blocked_ms', 'where')} for s in self.stalls],
+            'rss_mb': {
+                'start': round(self.rss_start / 2**20, 1),
+                'peak': round(self.rss_peak / 2**20, 1),
+                'end': round(self.rss_end / 2**20, 1),
+            },
+            'traced_peak_mb': round(self.traced_peak / 2**20, 1),
+            'peak_in_flight': self.peak_in_flight,
+            'behind_s': round(self.behind, 3),
+            'timed_out': self.timed_out,
+            'ops': {r.name: r.to_dict() for r in self.results},
+            'violations': self.violations(slo),
+        }
+
+
+async def run_stage(driver: PipelineDriver, events: List[Event], *, label: str, chats: int,
+                    speed: float = 1.0, quiet: bool = True) -> StageResult:
+    """
+    إرسال التحديثات في مواعيدها دون انتظار ما قبلها (كما يدفعها تيليجرام)،
+    فيتضمن الزمن المقاس أي تأخر في الجدولة أو طوابير الحلقة.
+    """
+    from ZeMusic.core.instrumentation import LatencyHistogram, loop_monitor
+
+    loop = asyncio.get_running_loop()
+    latencies: Dict[str, List[float]] = {}
+    errors = Counter()
+    samples: Dict[str, List[str]] = {}
+    in_flight = set()
+    peak_in_flight = 0
+    behind = 0.0
+    chat_ids = set()
+
+    async def dispatch(op, update, chat_id, user_id, payload, scheduled):
+        try:
+            await driver.handle(op, update, chat_id, user_id, payload)
+        except Exception as e:
+            errors[op] += 1
+            bucket = samples.setdefault(op, [])
+            if len(bucket) < ERROR_SAMPLES:
+                bucket.append(f"{type(e).__name__}: {e}"[:200])
+            return
+        latencies.setdefault(op, []).append(loop.time() - scheduled)
+
+    memory = {'peak': rss_bytes()}
+
+    async def sample_memory():
+        while True:
+            memory['peak'] = max(memory['peak'], rss_bytes())
+            await asyncio.sleep(MEMORY_SAMPLE_INTERVAL)
+
+    loop_monitor.lag = LatencyHistogram()
+    loop_monitor.stalls.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    rss_start = memory['peak']
+    sampler = asyncio.create_task(sample_memory())
+
+    with capture_errors(quiet) as logged:
+        started = loop.time()
+        for at, update in events:
+            scheduled = started + at / speed
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                behind = max(behind, -delay)
+            op, chat_id, user_id, payload = classify(update)
+            chat_ids.add(chat_id)
+            task = loop.create_task(dispatch(op, update, chat_id, user_id, payload, scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            peak_in_flight = max(peak_in_flight, len(in_flight))
+        timed_out = 0
+        if in_flight:
+            _, pending = await asyncio.wait(set(in_flight), timeout=DRAIN_TIMEOUT)
+            timed_out = len(pending)
+            for task in pending:
+                task.cancel()
+        wall = loop.time() - started
+
+    sampler.cancel()
+    rss_end = rss_bytes()
+    result = StageResult(
+        label=label, chats=chats, events=len(events), wall=wall,
+        results=[BenchResult(f"{driver.name}.{op}", values, wall) for op, values in sorted(latencies.items())],
+        errors=errors, error_samples=samples, logged_errors=logged.counts,
+        loop=loop_monitor.lag.snapshot(), stalls=loop_monitor.slowest_stalls(3),
+        rss_start=rss_start, rss_peak=max(memory['peak'], rss_end), rss_end=rss_end,
+        traced_peak=tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0,
+        peak_in_flight=peak_in_flight, behind=behind, timed_out=timed_out,
+    )
+    driver.cleanup(chat_ids)
+    return result
+
+
+# ---- التقرير ----
+
+def format_stages(stages: List[StageResult], slo: SLO) -> str:
+    lines = [
+        f"{'stage':<14}  {'events':>7}  {'ev/s':>7}  {'p50 ms':>8}  {'p99 ms':>8}  {'err':>6}  "
+        f"{'lag p99':>8}  {'stalls':>6}  {'rss MB':>13}  {'inflight':>8}  verdict"
+    ]
+    for stage in stages:
+        row = stage.to_dict(slo)
+        rss = row['rss_mb']
+        verdict = "✗ " + "; ".join(row['violations']) if row['violations'] else "✓"
+        lines.append(
+            f"{stage.label:<14}  {row['events']:>7}  {row['events_per_s']:>7}  {row['p50_ms']:>8.1f}  "
+            f"{row['p99_ms']:>8.1f}  {row['error_rate']:>6.1%}  {row['loop']['p99_ms']:>8.1f}  "
+            f"{len(stage.stalls):>6}  {rss['start']:>5.0f}→{rss['peak']:<6.0f}  {stage.peak_in_flight:>8}  {verdict}"
+        )
+    return "\n".join(lines)
+
+
+def format_details(stage: StageResult) -> str:
+    lines = [f"— {stage.label}", format_results(stage.results)]
+    for op, count in stage.errors.most_common():
+        lines.append(f"  ✗ {op}: {count} × {stage.error_samples.get(op, ['?'])[0]}")
+    if stage.timed_out:
+        lines.append(f"  ⏱ {stage.timed_out} عملية لم تنتهِ خلال {DRAIN_TIMEOUT:.0f}s")
+    for message, count in stage.logged_errors.most_common(3):
+        lines.append(f"  📝 {count} × {message}")
+    for stall in stage.stalls:
+        lines.append(f"  🐢 {stall['blocked_ms']}ms عند {stall['where']}")
+    return "\n".join(lines)
+
+
+# ---- التشغيل ----
+
+def _parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_sim", description="محاكاة حمل مسار الأوامر")
+    parser.add_argument("--path", choices=("pipeline", "stream"), default="pipeline")
+    parser.add_argument("--chats", default="100,500,1000,2000,5000", help="مراحل عدد المحادثات")
+    parser.add_argument("--duration", type=float, default=20.0, help="ثواني كل مرحلة")
+    parser.add_argument("--rate", type=float, default=0.05, help="تحديثات لكل محادثة في الثانية")
+    parser.add_argument("--users", type=int, default=20, help="مستخدمون لكل محادثة")
+    parser.add_argument("--mix", help="أوزان العمليات: play=0.2,skip=0.1,...")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay", help="إعادة تدفق مسجل (JSONL) بدل المراحل الاصطناعية")
+    parser.add_argument("--speed", type=float, default=1.0, help="مضاعف سرعة الإعادة")
+    parser.add_argument("--record", help="حفظ التدفق الاصطناعي للمرحلة الأولى في JSONL")
+    parser.add_argument("--assistants", type=int, default=5)
+    parser.add_argument("--tg-latency", type=float, default=0.02, help="تأخر طلبات عميل البوت (ث)")
+    parser.add_argument("--calls-latency", type=float, default=0.05, help="تأخر PyTgCalls (ث)")
+    parser.add_argument("--download-latency", type=float, default=0.5, help="تأخر التحميل (ث)")
+    parser.add_argument("--slo-p99", type=float, default=SLO.p99_ms, help="حد p99 بالملي ثانية")
+    parser.add_argument("--slo-lag", type=float, default=SLO.loop_lag_ms, help="حد تأخر الحلقة p99")
+    parser.add_argument("--slo-errors", type=float, default=SLO.error_rate, help="أقصى نسبة أخطاء")
+    parser.add_argument("--keep-going", action="store_true", help="إكمال المراحل بعد أول انهيار")
+    parser.add_argument("--tracemalloc", action="store_true", help="تتبع ذروة ذاكرة بايثون (أبطأ)")
+    parser.add_argument("--json", help="حفظ النتائج الكاملة في ملف JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="إبقاء سجلات البوت")
+    return parser.parse_args()
+
+
+def _parse_mix(spec: Optional[str]) -> Dict[str, float]:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(","):
+        op, _, weight = part.partition("=")
+        op = op.strip()
+        if op not in DEFAULT_MIX:
+            raise ValueError(f"عملية غير معروفة: {op} (المتاح: {', '.join(DEFAULT_MIX)})")
+        mix[op] = float(weight)
+    return mix
+
+
+async def _run(args) -> int:
+    from ZeMusic.core.instrumentation import loop_monitor
+
+    slo = SLO(p99_ms=args.slo_p99, loop_lag_ms=args.slo_lag, error_rate=args.slo_errors)
+    client = FakeTelegramClient(args.tg_latency)
+    if args.path == "stream":
+        driver = StreamDriver(client, args.assistants, args.calls_latency, args.download_latency)
+    else:
+        driver = PipelineDriver(client)
+
+    if args.replay:
+        events = load_updates(args.replay)
+        chats = len({classify(update)[1] for _, update in events})
+        plan = [(f"replay×{args.speed:g}", chats, events)]
+    else:
+        mix = _parse_mix(args.mix)
+        plan = []
+        for chats in (int(c) for c in args.chats.split(",") if c.strip()):
+            scenario = Scenario(chats, args.duration, args.rate, args.users, mix, args.seed)
+            plan.append((f"{chats} chats", chats, list(synthetic_updates(scenario))))
+        if args.record:
+            save_updates(plan[0][2], args.record)
+            print(f"💾 حُفظ تدفق المرحلة الأولى في {args.record}")
+
+    stages: List[StageResult] = []
+    broken: Optional[StageResult] = None
+    with ExitStack() as stack:
+        try:
+            driver.install(stack)
+        except ImportError as e:
+            print(f"⏭ تعذر تشغيل مسار {args.path}: تبعية غير مثبتة ({e.name or e})")
+            return 2
+        loop_monitor.start()
+        stack.callback(loop_monitor.stop)
+        if args.tracemalloc:
+            tracemalloc.start()
+            stack.callback(tracemalloc.stop)
+
+        for label, chats, events in plan:
+            print(f"▶ {label}: {len(events)} تحديث خلال {events[-1][0] / args.speed if events else 0:.0f}s")
+            stage = await run_stage(driver, events, label=label, chats=chats,
+                                    speed=args.speed, quiet=not args.verbose)
+            stages.append(stage)
+            violations = stage.violations(slo)
+            print(f"  {'✗ ' + '; '.join(violations) if violations else '✓'}")
+            if violations and broken is None:
+                broken = stage
+                if not args.keep_going:
+                    break
+
+    print()
+    print(format_stages(stages, slo))
+    print()
+    for stage in stages:
+        print(format_details(stage))
+        print()
+
+    if broken is None:
+        print(f"✅ لم يُكسر حد الخدمة حتى {stages[-1].chats} محادثة")
+    else:
+        healthy = [s.chats for s in stages if s is not broken and not s.violations(slo)]
+        since = f"بعد {max(healthy)} محادثة سليمة" if healthy else "من المرحلة الأولى"
+        print(f"💥 نقطة الانهيار: {broken.chats} محادثة ({since})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf8") as f:
+            json.dump([s.to_dict(slo) for s in stages], f, indent=2, ensure_ascii=False)
+        print(f"💾 النتائج في {args.json}")
+    return 1 if broken else 0
+
+
+def main():
+    args = _parse_args()
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    # قاعدة بيانات مؤقتة للمحاكاة بدل zemusic.db (يُقرأ عند استيراد config)
+    os.environ.setdefault("DATABASE_PATH", data_path("loadsim.db"))
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    sys.exit(asyncio.run(_run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -54,6 +54,8 @@ ASSISTANT_MANAGEMENT_ENABLED = True
 MAX_ASSISTANTS = int(getenv("MAX_ASSISTANTS", "10"))
 MIN_ASSISTANTS = int(getenv("MIN_ASSISTANTS", "0"))  # 0 = اختياري
 ENABLE_ASSISTANT_AUTO_MANAGEMENT = getenv("ENABLE_ASSISTANT_AUTO_MANAGEMENT", "True").lower() == "true"
+ASSISTANT_CALL_CAPACITY = int(getenv("ASSISTANT_CALL_CAPACITY", "10"))  # المكالمات لكل مساعد بوزن 1
+ASSISTANT_PROFILES = getenv("ASSISTANT_PROFILES", "")  # وزن/سعة لكل مساعد: "1=2/20,2=0.5"
 
 # للتوافق مع الكود القديم (اختياري)
 STRING1 = getenv("STRING_SESSION", None)
@@ -285,6 +287,13 @@ ASSISTANT_NOT_FOUND_MESSAGE = """
 🔧 سيتم حل المشكلة في أقرب وقت ممكن
 """
 
+# ============================================
+# إعدادات المراقبة والقياس
+# ============================================
+METRICS_HOST = getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(getenv("METRICS_PORT", "9464"))  # 0 = تعطيل نقطة المقاييس المحلية
+LOOP_STALL_THRESHOLD = float(getenv("LOOP_STALL_THRESHOLD", "0.25"))  # ثوانٍ تُعدّ توقفاً للحلقة
+
 # ============================================
 # إعدادات إضافية للإحصائيات والإذاعة
 # ============================================
@@ -1,9 +1,77 @@
 import os
-from typing import List
+import pickle
+from typing import Dict, List, Tuple
 
 import yaml
 
-languages = {}
+LANGS_DIR = os.path.join(os.path.dirname(__file__), "langs")
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache")
+DEFAULT_LANG = "en"
+
+# المحلل المكتوب بـ C أسرع بكثير عند إعادة البناء، مع الرجوع للمحلل الافتراضي
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _signature(*paths: str) -> Tuple:
+    return tuple((os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths)
+
+
+def _lang_path(lang: str) -> str:
+    return os.path.join(LANGS_DIR, f"{lang}.yml")
+
+
+def _read_cache(name: str):
+    try:
+        with open(os.path.join(CACHE_DIR, name), "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _write_cache(name: str, data):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = os.path.join(CACHE_DIR, name)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+def _compile(lang: str) -> Dict[str, str]:
+    """
+    جدول اللغة مدمجاً مع الإنجليزية للمفاتيح الناقصة. يُقرأ من النسخة المجمّعة
+    (pickle) ما دامت ملفات YAML لم تتغير، وإلا يُعاد بناؤه وحفظه.
+    """
+    sources = [_lang_path(lang)]
+    if lang != DEFAULT_LANG:
+        sources.append(_lang_path(DEFAULT_LANG))
+    signature = _signature(*sources)
+
+    cached = _read_cache(f"{lang}.pickle")
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(sources[0], encoding="utf8") as f:
+        table = yaml.load(f, Loader=_Loader)
+    if lang != DEFAULT_LANG:
+        table = {**languages[DEFAULT_LANG], **table}
+    _write_cache(f"{lang}.pickle", (signature, table))
+    return table
+
+
+class _Languages(dict):
+    """قاموس اللغات: كل لغة تُحمّل عند أول استخدام لها فقط"""
+
+    def __missing__(self, lang: str):
+        if lang not in languages_present and lang not in _available():
+            raise KeyError(lang)
+        table = self[lang] = _compile(lang)
+        return table
+
+
+languages = _Languages()
 languages_present = {}
 
 
@@ -11,24 +79,30 @@ def get_string(lang: str):
     return languages[lang]
 
 
-for filename in os.listdir(r"./strings/langs/"):
-    if "en" not in languages:
-        languages["en"] = yaml.safe_load(
-            open(r"./strings/langs/en.yml", encoding="utf8")
-        )
-        languages_present["en"] = languages["en"]["name"]
-    if filename.endswith(".yml"):
-        language_name = filename[:-4]
-        if language_name == "en":
-            continue
-        languages[language_name] = yaml.safe_load(
-            open(r"./strings/langs/" + filename, encoding="utf8")
-        )
-        for item in languages["en"]:
-            if item not in languages[language_name]:
-                languages[language_name][item] = languages["en"][item]
-    try:
-        languages_present[language_name] = languages[language_name]["name"]
-    except:
-        print("There is some issue with the language file inside bot.")
-        exit()
+def _available() -> List[str]:
+    return sorted(f[:-4] for f in os.listdir(LANGS_DIR) if f.endswith(".yml"))
+
+
+def _load_index():
+    """أسماء اللغات المتاحة دون تحميل جداولها (من فهرس مخزن مع توقيع الملفات)"""
+    available = _available()
+    signature = _signature(*map(_lang_path, available))
+    cached = _read_cache("index.pickle")
+    if cached and cached[0] == signature:
+        languages_present.update(cached[1])
+        return
+
+    names = {}
+    for lang in available:
+        try:
+            # قراءة الاسم فقط؛ الجدول نفسه يبقى خارج الذاكرة حتى يُطلب
+            names[lang] = (languages.get(lang) or _compile(lang))["name"]
+        except Exception:
+            print("There is some issue with the language file inside bot.")
+            exit()
+    languages_present.update(names)
+    _write_cache("index.pickle", (signature, names))
+
+
+languages[DEFAULT_LANG] = _compile(DEFAULT_LANG)
+_load_index()